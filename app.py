@@ -7,6 +7,8 @@ import streamlit as st
 import sys
 import os
 import pandas as pd
+from collections import Counter
+from html import escape
 from pathlib import Path
 import plotly.graph_objects as go
 import tempfile
@@ -31,83 +33,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CSS personnalisé
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 3rem;
-        font-weight: bold;
-        background: linear-gradient(90deg, #4CAF50, #2196F3);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        padding: 1rem 0;
-    }
-    
-    .metric-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 1.5rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-    }
-    
-    .course-card {
-        border: 2px solid #e0e0e0;
-        border-radius: 10px;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        background: white;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    .stButton>button {
-        width: 100%;
-        background-color: #4CAF50;
-        color: white;
-        border-radius: 5px;
-        border: none;
-        padding: 0.75rem;
-        font-weight: bold;
-        transition: all 0.3s;
-    }
-    
-    .stButton>button:hover {
-        background-color: #45a049;
-        transform: translateY(-2px);
-        box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-    }
-    
-    .chat-message {
-        padding: 1rem;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-    }
-    
-    .level-badge {
-        display: inline-block;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-weight: bold;
-        font-size: 0.85rem;
-    }
-    
-    .level-debutant {
-        background-color: #4CAF50;
-        color: white;
-    }
-    
-    .level-intermediaire {
-        background-color: #FFC107;
-        color: black;
-    }
-    
-    .level-avance {
-        background-color: #F44336;
-        color: white;
-    }
-</style>
-""", unsafe_allow_html=True)
+# CSS personnalisé (fichier statique lu une seule fois)
+@st.cache_data
+def _css():
+    """Contenu de la feuille de style de l'application"""
+    return Path(__file__).parent.joinpath('static/app.css').read_text(encoding='utf-8')
+
+st.html(f"<style>{_css()}</style>")
 
 # ==================== INITIALISATION ====================
 
@@ -125,23 +57,470 @@ def init_backend():
 # Charger le backend
 backend = init_backend()
 
-# Test de connexion
-if not backend.test_connection():
+# Test de connexion (une seule fois par session, refait via "Rafraîchir")
+if 'fuseki_ok' not in st.session_state:
+    st.session_state.fuseki_ok = backend.test_connection()
+
+if not st.session_state.fuseki_ok:
+    del st.session_state.fuseki_ok
     st.error("❌ Impossible de se connecter à Fuseki")
     st.info("Vérifiez que Fuseki tourne sur http://localhost:3030")
     st.code("docker compose up -d")
     st.stop()
 
+# ==================== DONNÉES EN CACHE ====================
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _all_courses():
+    """Tous les cours (mis en cache entre les reruns)"""
+    return backend.get_all_courses()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _statistics():
+    """Statistiques globales (mises en cache entre les reruns)"""
+    return backend.get_statistics()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _all_prerequisites():
+    """Toutes les relations de prérequis (mises en cache entre les reruns)"""
+    return backend.get_all_prerequisites()
+
+
+class _UncachedResponse(Exception):
+    """Réponse en échec : remontée en exception pour que st.cache_data ne la garde pas"""
+    def __init__(self, result):
+        super().__init__(result.get('response'))
+        self.result = result
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _chat_response_for(text, data_version):
+    """Réponse du backend pour un texte fixe, par version des données de la KB"""
+    result = backend.process_chat_message(text)
+    if not result['success']:
+        raise _UncachedResponse(result)
+    return result
+
+
+def _cached_chat_response(text):
+    """Réponse du backend pour un texte fixe (boutons de suggestion)"""
+    try:
+        return _chat_response_for(text, backend.kb.data_version)
+    except _UncachedResponse as e:
+        return e.result
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _courses_df():
+    """DataFrame de tous les cours, construit une seule fois par rafraîchissement"""
+    return pd.DataFrame(_all_courses())
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _search_df():
+    """DataFrame des cours avec colonnes minuscules pré-calculées pour la recherche"""
+    df = _courses_df()
+    df['_nom_l'] = df['nom'].str.lower()
+    df['_code_l'] = df['code'].str.lower()
+    df['_desc_l'] = df['description'].fillna('').str.lower()
+    return df
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _course_index():
+    """Index code → cours pour éviter les requêtes par cours"""
+    return {c['code']: c for c in _all_courses()}
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _prereqs_index():
+    """Index code → codes des prérequis directs"""
+    index = {}
+    for target, source in _all_prerequisites():
+        index.setdefault(target, []).append(source)
+    return index
+
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def _graph_data(domain, show_isolated):
+    """Cours et prérequis du graphe après application des filtres"""
+    courses = _all_courses()
+    prerequisites = _all_prerequisites()
+
+    if domain != "Tous":
+        courses = [c for c in courses if c['domaine'] == domain]
+        course_codes = {c['code'] for c in courses}
+        prerequisites = [(t, s) for t, s in prerequisites
+                         if t in course_codes and s in course_codes]
+
+    if not show_isolated:
+        # Exclure les cours sans prérequis
+        courses_with_prereqs = set()
+        for target, source in prerequisites:
+            courses_with_prereqs.add(target)
+            courses_with_prereqs.add(source)
+        courses = [c for c in courses if c['code'] in courses_with_prereqs]
+
+    return courses, prerequisites
+
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner=False)
+def _graph_metrics(domain="Tous", show_isolated=True):
+    """Nombre de prérequis par cours, points d'entrée et maximum de prérequis"""
+    courses, prerequisites = _graph_data(domain, show_isolated)
+    prereq_count = Counter(target for target, _ in prerequisites)
+    entry_points = {c['code'] for c in courses} - prereq_count.keys()
+    return {
+        'prereq_count': prereq_count,
+        'entry_points': entry_points,
+        'max_prereqs': max(prereq_count.values(), default=0)
+    }
+
+
+@st.cache_data(ttl=600, max_entries=16, show_spinner="🎨 Génération du graphe interactif...")
+def _graph_html(domain, show_isolated):
+    """HTML du graphe PyVis, régénéré uniquement quand les filtres changent"""
+    courses, prerequisites = _graph_data(domain, show_isolated)
+    return create_prerequisites_graph(courses, prerequisites)
+
+
+def _figure_html(fig):
+    """HTML autonome d'une figure Plotly (bundle JS chargé depuis le CDN)"""
+    return fig.to_html(include_plotlyjs='cdn', full_html=False, config={'responsive': True})
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fig_domain_html():
+    return _figure_html(create_domain_chart(_all_courses()))
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fig_level_html():
+    return _figure_html(create_level_pie_chart(_all_courses()))
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fig_credits_html():
+    return _figure_html(create_credits_distribution(_all_courses()))
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _fig_difficulty_html():
+    """Histogramme des niveaux de difficulté (page Statistiques)"""
+    diff_counts = _courses_df()['difficulte'].value_counts().sort_index()
+    colors = ['#4CAF50', '#8BC34A', '#FFC107', '#FF9800', '#F44336']
+    fig = go.Figure(data=[
+        go.Bar(
+            x=[f"Niveau {i}" for i in diff_counts.index],
+            y=diff_counts.values,
+            marker_color=[colors[i-1] for i in diff_counts.index],
+            text=diff_counts.values,
+            textposition='auto'
+        )
+    ])
+    fig.update_layout(
+        template="plotly_dark",
+        showlegend=False,
+        height=400
+    )
+    return _figure_html(fig)
+
+
+def _filter_courses(domain="Tous", level="Tous", sort_key=None):
+    """Cours filtrés par domaine / niveau et triés (tableau du Dashboard)"""
+    df = _courses_df()
+    mask = pd.Series(True, index=df.index)
+    if domain != "Tous":
+        mask &= df['domaine'] == domain
+    if level != "Tous":
+        mask &= df['niveau'] == level
+    df = df[mask]
+    if sort_key:
+        df = df.sort_values(sort_key, kind='stable')
+    return df
+
+
+@st.cache_data(ttl=600, max_entries=32, show_spinner=False)
+def _courses_csv(domain="Tous", level="Tous", sort_key=None) -> bytes:
+    """Export CSV encodé une seule fois par combinaison de filtres"""
+    return _filter_courses(domain, level, sort_key).to_csv(index=False).encode()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _prereqs_csv() -> bytes:
+    """Export CSV des relations de prérequis"""
+    prereq_df = pd.DataFrame(_all_prerequisites(), columns=['Cours', 'Prérequis'])
+    return prereq_df.to_csv(index=False).encode()
+
+
+def _prerequisites_for(code):
+    """Prérequis directs d'un cours, résolus depuis les index en cache"""
+    index = _course_index()
+    return [index[p] for p in _prereqs_index().get(code, []) if p in index]
+
 # ==================== FONCTIONS UTILITAIRES ====================
 
+# Nombre de messages du chat rendus directement (les plus anciens sont repliés)
+CHAT_HISTORY_WINDOW = 20
+
+# Libellé du tri -> colonne du DataFrame des cours
+SORT_COLUMNS = {'Code': 'code', 'Nom': 'nom', 'Crédits': 'credits', 'Difficulté': 'difficulte'}
+
+# Icônes et badges HTML par niveau
+LEVEL_ICON = {'Débutant': '🟢', 'Intermédiaire': '🟡', 'Avancé': '🔴'}
+LEVEL_BADGE_HTML = {
+    'Débutant': '<span class="level-badge level-debutant">🟢 Débutant</span>',
+    'Intermédiaire': '<span class="level-badge level-intermediaire">🟡 Intermédiaire</span>',
+    'Avancé': '<span class="level-badge level-avance">🔴 Avancé</span>'
+}
+
+
+def render_chat_message(msg):
+    """Affiche un message du chat (texte brut pour l'utilisateur, Markdown pour l'assistant)"""
+    with st.chat_message(msg["role"]):
+        if msg["role"] == "user":
+            st.text(msg["content"])
+        else:
+            st.markdown(msg["content"])
+
+
 def format_course_badge(niveau):
     """Génère un badge HTML pour le niveau"""
-    if niveau == "Débutant":
-        return '<span class="level-badge level-debutant">🟢 Débutant</span>'
-    elif niveau == "Intermédiaire":
-        return '<span class="level-badge level-intermediaire">🟡 Intermédiaire</span>'
+    return LEVEL_BADGE_HTML.get(niveau, LEVEL_BADGE_HTML['Avancé'])
+
+def render_progress_bars(bars):
+    """
+    Construit le HTML d'une liste de barres de progression
+    
+    Args:
+        bars: Liste de tuples (titre, fraction entre 0 et 1, texte)
+    """
+    rows = "".join(
+        f'<div class="progress-row">'
+        f'<div class="progress-title">{escape(str(title))}</div>'
+        f'<div class="progress-track"><div class="progress-fill" '
+        f'style="width: {max(0.0, min(1.0, fraction)) * 100:.1f}%"></div></div>'
+        f'<div class="progress-text">{escape(text)}</div>'
+        f'</div>'
+        for title, fraction, text in bars
+    )
+    return f'<div class="progress-list">{rows}</div>'
+
+
+def render_course_cards(courses):
+    """Construit le HTML de la grille de cartes (prérequis dans un <details> natif)"""
+    cards = []
+    for course in courses:
+        prereqs = _prerequisites_for(course['code'])
+        if prereqs:
+            prereq_html = "<p><strong>📋 Prérequis:</strong></p><ul>" + "".join(
+                f"<li><strong>{escape(p['code'])}</strong>: {escape(p['nom'])}</li>"
+                for p in prereqs
+            ) + "</ul>"
+        else:
+            prereq_html = "<p>✅ Aucun prérequis</p>"
+        
+        cards.append(
+            f'<div class="course-card">'
+            f'<h3>{LEVEL_ICON.get(course["niveau"], "")} {escape(course["code"])}</h3>'
+            f'<p><strong>{escape(course["nom"])}</strong></p>'
+            f'<p class="course-card-caption">📚 {escape(course["domaine"])}</p>'
+            f'<p class="course-card-caption">⭐ {course["credits"]} crédits • '
+            f'⏱️ {course["duree"]}h • 📈 Difficulté {course["difficulte"]}/5</p>'
+            f'<details><summary>📄 Plus d\'informations</summary>'
+            f'<p>{escape(course.get("description") or "Pas de description disponible")}</p>'
+            f'{prereq_html}</details>'
+            f'</div>'
+        )
+    return f'<div class="course-grid">{"".join(cards)}</div>'
+
+
+# ==================== FRAGMENTS ====================
+
+@st.fragment
+def dashboard_course_table(domain_options):
+    """Tableau filtrable du Dashboard (réexécuté seul lors d'un changement de filtre)"""
+    # Filtres rapides
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        filter_domain = st.selectbox(
+            "Filtrer par domaine",
+            ["Tous"] + domain_options
+        )
+    with col2:
+        filter_level = st.selectbox(
+            "Filtrer par niveau",
+            ["Tous", "Débutant", "Intermédiaire", "Avancé"]
+        )
+    with col3:
+        sort_option = st.selectbox(
+            "Trier par",
+            list(SORT_COLUMNS)
+        )
+
+    # Appliquer filtres et tri
+    sort_key = SORT_COLUMNS[sort_option]
+    df = _filter_courses(filter_domain, filter_level, sort_key)
+
+    # Afficher
+    st.dataframe(
+        df[['code', 'nom', 'domaine', 'niveau', 'credits', 'duree', 'difficulte']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "code": "Code",
+            "nom": "Nom du cours",
+            "domaine": "Domaine",
+            "niveau": "Niveau",
+            "credits": st.column_config.NumberColumn("Crédits", format="%d ⭐"),
+            "duree": st.column_config.NumberColumn("Durée", format="%d h"),
+            "difficulte": st.column_config.ProgressColumn("Difficulté", min_value=1, max_value=5)
+        }
+    )
+
+    # Export
+    st.download_button(
+        "📥 Télécharger en CSV",
+        _courses_csv(filter_domain, filter_level, sort_key),
+        "courses_export.csv",
+        "text/csv",
+        use_container_width=False
+    )
+
+
+@st.fragment
+def explorer_results():
+    """Recherche, filtres et résultats de l'Explorer (réexécutés sans le reste de la page)"""
+    # Barre de recherche principale
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        search = st.text_input(
+            "🔎 Rechercher un cours",
+            placeholder="Entrez un nom, code ou mot-clé...",
+            label_visibility="collapsed"
+        )
+    
+    with col2:
+        sort_by = st.selectbox(
+            "Trier par",
+            ["code", "nom", "credits", "difficulte"],
+            label_visibility="collapsed"
+        )
+    
+    # Filtres avancés
+    with st.expander("🎛️ Filtres Avancés", expanded=True):
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            stats = _statistics()
+            domains = st.multiselect(
+                "🏷️ Domaines",
+                list(stats['domains'].keys())
+            )
+    
+        with col2:
+            levels = st.multiselect(
+                "🎯 Niveaux",
+                ["Débutant", "Intermédiaire", "Avancé"]
+            )
+    
+        with col3:
+            credits = st.slider(
+                "⭐ Crédits",
+                min_value=0,
+                max_value=10,
+                value=(0, 10)
+            )
+    
+        with col4:
+            difficulte = st.slider(
+                "📈 Difficulté",
+                min_value=1,
+                max_value=5,
+                value=(1, 5)
+            )
+    
+    # Appliquer les filtres (masque booléen vectorisé)
+    df = _search_df()
+    mask = (df['credits'].between(*credits) &
+            df['difficulte'].between(*difficulte))
+    
+    if search:
+        search_lower = search.lower()
+        mask &= (df['_nom_l'].str.contains(search_lower, regex=False) |
+                 df['_code_l'].str.contains(search_lower, regex=False) |
+                 df['_desc_l'].str.contains(search_lower, regex=False))
+    
+    if domains:
+        mask &= df['domaine'].isin(domains)
+    
+    if levels:
+        mask &= df['niveau'].isin(levels)
+    
+    # Trier
+    filtered_df = df[mask].sort_values(sort_by, kind='stable')
+    filtered = filtered_df.to_dict('records')
+    
+    # Affichage des résultats
+    st.markdown(f"### 📊 {len(filtered)} cours trouvés sur {len(df)}")
+    
+    if not filtered:
+        st.warning("❌ Aucun cours ne correspond à vos critères. Essayez d'élargir votre recherche.")
     else:
-        return '<span class="level-badge level-avance">🔴 Avancé</span>'
+        # Mode d'affichage
+        view_mode = st.radio(
+            "Mode d'affichage",
+            ["🎴 Cartes", "📋 Tableau", "📝 Liste détaillée"],
+            horizontal=True
+        )
+    
+        if view_mode == "🎴 Cartes":
+            # Affichage en cartes (2 colonnes), rendu en un seul bloc HTML
+            st.html(render_course_cards(filtered))
+    
+        elif view_mode == "📋 Tableau":
+        # Affichage en tableau
+            st.dataframe(
+                filtered_df[['code', 'nom', 'domaine', 'niveau', 'credits', 'duree', 'difficulte']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "code": "Code",
+                    "nom": "Nom",
+                    "domaine": "Domaine",
+                    "niveau": "Niveau",
+                    "credits": st.column_config.NumberColumn("Crédits", format="%d ⭐"),
+                    "duree": st.column_config.NumberColumn("Durée (h)"),
+                    "difficulte": st.column_config.ProgressColumn("Difficulté", min_value=1, max_value=5)
+                }
+            )
+    
+        else:  # Liste détaillée
+            for course in filtered:
+                with st.expander(f"**{course['code']}** - {course['nom']}", expanded=False):
+                    col1, col2 = st.columns([2, 1])
+    
+                    with col1:
+                        st.markdown(f"**Description:**")
+                        st.write(course.get('description', 'Pas de description'))
+    
+                        prereqs = _prerequisites_for(course['code'])
+                        if prereqs:
+                            st.markdown("**Prérequis:**")
+                            for p in prereqs:
+                                st.write(f"→ {p['code']}: {p['nom']}")
+    
+                    with col2:
+                        st.markdown("**Détails:**")
+                        st.write(f"🏷️ Domaine: {course['domaine']}")
+                        st.write(f"🎯 Niveau: {course['niveau']}")
+                        st.write(f"⭐ Crédits: {course['credits']}")
+                        st.write(f"⏱️ Durée: {course['duree']}h")
+                        st.write(f"📈 Difficulté: {course['difficulte']}/5")
+
 
 # ==================== SIDEBAR ====================
 
@@ -165,14 +544,21 @@ with st.sidebar:
     
     st.markdown("---")
     
-    # Statut système
-    with st.expander("⚙️ Statut Système", expanded=False):
-        stats = backend.get_statistics()
+    # Statut système (statistiques chargées seulement à la demande)
+    st.session_state.setdefault('show_status', False)
+    if st.checkbox("⚙️ Statut Système", key='show_status'):
+        stats = _statistics()
         st.metric("📚 Cours", stats['total_courses'])
         st.metric("🔗 Relations", stats['total_prerequisites'])
         st.metric("🏷️ Domaines", len(stats['domains']))
         st.success("✅ Fuseki connecté")
     
+    if st.button("🔄 Rafraîchir les données", use_container_width=True):
+        st.cache_data.clear()
+        backend.kb.clear_cache()
+        st.session_state.pop('fuseki_ok', None)
+        st.rerun()
+    
     # Aide rapide
     with st.expander("❓ Aide Rapide"):
         st.markdown("""
@@ -191,7 +577,7 @@ with st.sidebar:
 # ==================== PAGE 1: CHATBOT ====================
 
 if page == "💬 Chatbot":
-    st.markdown('<p class="main-header">💬 Assistant Intelligent</p>', unsafe_allow_html=True)
+    st.html('<p class="main-header">💬 Assistant Intelligent</p>')
     
     col1, col2 = st.columns([2, 1])
     
@@ -216,41 +602,48 @@ if page == "💬 Chatbot":
             ]
         
         # Conteneur de chat
-chat_container = st.container()
-
-# Afficher l'historique des messages
-with chat_container:
-    for msg in st.session_state.chat_history:
-        with st.chat_message(msg["role"]):
-            st.markdown(msg["content"])
-
-# **Placer `st.chat_input()` ici en dehors de tout autre bloc restrictif**
-user_input = st.chat_input("💬 Posez votre question...", key="chat_input")
-
-if user_input:
-    # Ajouter le message utilisateur
-    st.session_state.chat_history.append({
-        "role": "user",
-        "content": user_input
-    })
-
-    # Traiter avec le backend
-    with st.spinner("🤔 Analyse de votre question..."):
-        result = backend.process_chat_message(user_input)
-
-    if result['success']:
-        response = result['response']
-    else:
-        response = f"❌ **Erreur:** {result['response']}\n\nVeuillez réessayer ou reformuler votre question."
-
-    # Ajouter la réponse de l'assistant
-    st.session_state.chat_history.append({
-        "role": "assistant",
-        "content": response
-    })
-
-    st.rerun()
-
+        chat_container = st.container()
+        
+        # Afficher l'historique (seuls les derniers messages sont rendus)
+        history = st.session_state.chat_history
+        older_count = len(history) - CHAT_HISTORY_WINDOW
+        with chat_container:
+            if older_count > 0:
+                with st.expander(f"Afficher {older_count} messages précédents"):
+                    for msg in history[:older_count]:
+                        render_chat_message(msg)
+            for msg in history[-CHAT_HISTORY_WINDOW:]:
+                render_chat_message(msg)
+    
+    # L'input doit rester HORS des colonnes
+    user_input = st.chat_input("💬 Posez votre question...", key="chat_input")
+    
+    if user_input:
+        # Ajouter le message utilisateur
+        st.session_state.chat_history.append({
+            "role": "user",
+            "content": user_input
+        })
+        
+        # Traiter avec le backend
+        with st.spinner("🤔 Analyse de votre question..."):
+            result = backend.process_chat_message(user_input)
+        
+        if result['success']:
+            response = result['response']
+        else:
+            response = f"❌ **Erreur:** {result['response']}\n\nVeuillez réessayer ou reformuler votre question."
+        
+        # Ajouter la réponse de l'assistant
+        st.session_state.chat_history.append({
+            "role": "assistant",
+            "content": response
+        })
+        
+        # Afficher le nouvel échange sans forcer un rerun complet
+        with chat_container:
+            for msg in st.session_state.chat_history[-2:]:
+                render_chat_message(msg)
     
     with col2:
         st.markdown("### 🎯 Actions Rapides")
@@ -297,12 +690,14 @@ if user_input:
                     "role": "user",
                     "content": text
                 })
-                result = backend.process_chat_message(text)
+                result = _cached_chat_response(text)
                 st.session_state.chat_history.append({
                     "role": "assistant",
                     "content": result['response'] if result['success'] else f"Erreur: {result['response']}"
                 })
-                st.rerun()
+                with chat_container:
+                    for msg in st.session_state.chat_history[-2:]:
+                        render_chat_message(msg)
         
         st.markdown("---")
         st.markdown("### 📊 Statistiques Session")
@@ -313,11 +708,11 @@ if user_input:
 # ==================== PAGE 2: DASHBOARD ====================
 
 elif page == "📊 Dashboard":
-    st.markdown('<p class="main-header">📊 Tableau de Bord</p>', unsafe_allow_html=True)
+    st.html('<p class="main-header">📊 Tableau de Bord</p>')
     
     # Récupérer les données
-    courses = backend.get_all_courses()
-    stats = backend.get_statistics()
+    courses = _all_courses()
+    stats = _statistics()
     
     # Métriques principales
     col1, col2, col3, col4 = st.columns(4)
@@ -358,22 +753,22 @@ elif page == "📊 Dashboard":
     
     with tab1:
         st.markdown("### Répartition des cours par domaine")
-        fig_domain = create_domain_chart(courses)
-        st.plotly_chart(fig_domain, use_container_width=True)
+        st.components.v1.html(_fig_domain_html(), height=420)
         
         # Détails par domaine
         st.markdown("#### Détails")
-        for domain, count in stats['domains'].items():
-            percentage = (count / stats['total_courses']) * 100
-            st.write(f"**{domain}:** {count} cours ({percentage:.1f}%)")
+        total = stats['total_courses']
+        st.markdown("\n".join(
+            f"- **{domain}:** {count} cours ({count * 100 / total:.1f}%)"
+            for domain, count in stats['domains'].items()
+        ))
     
     with tab2:
         col_a, col_b = st.columns(2)
         
         with col_a:
             st.markdown("### Distribution")
-            fig_level = create_level_pie_chart(courses)
-            st.plotly_chart(fig_level, use_container_width=True)
+            st.components.v1.html(_fig_level_html(), height=420)
         
         with col_b:
             st.markdown("### Progression par niveau")
@@ -387,11 +782,10 @@ elif page == "📊 Dashboard":
     
     with tab3:
         st.markdown("### Distribution des crédits ECTS")
-        fig_credits = create_credits_distribution(courses)
-        st.plotly_chart(fig_credits, use_container_width=True)
+        st.components.v1.html(_fig_credits_html(), height=420)
         
         # Stats crédits
-        df = pd.DataFrame(courses)
+        df = _courses_df()
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("Crédits moyen", f"{df['credits'].mean():.1f}")
@@ -405,237 +799,21 @@ elif page == "📊 Dashboard":
     # Tableau récapitulatif
     st.markdown("### 📋 Liste Complète des Cours")
     
-    # Filtres rapides
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        filter_domain = st.selectbox(
-            "Filtrer par domaine",
-            ["Tous"] + list(stats['domains'].keys())
-        )
-    with col2:
-        filter_level = st.selectbox(
-            "Filtrer par niveau",
-            ["Tous", "Débutant", "Intermédiaire", "Avancé"]
-        )
-    with col3:
-        sort_option = st.selectbox(
-            "Trier par",
-            ["Code", "Nom", "Crédits", "Difficulté"]
-        )
-    
-    # Appliquer filtres
-    filtered_courses = courses
-    if filter_domain != "Tous":
-        filtered_courses = [c for c in filtered_courses if c['domaine'] == filter_domain]
-    if filter_level != "Tous":
-        filtered_courses = [c for c in filtered_courses if c['niveau'] == filter_level]
-    
-    # Trier
-    sort_key = sort_option.lower()
-    filtered_courses = sorted(filtered_courses, key=lambda x: x.get(sort_key, ''))
-    
-    # Afficher
-    df = pd.DataFrame(filtered_courses)
-    st.dataframe(
-        df[['code', 'nom', 'domaine', 'niveau', 'credits', 'duree', 'difficulte']],
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "code": "Code",
-            "nom": "Nom du cours",
-            "domaine": "Domaine",
-            "niveau": "Niveau",
-            "credits": st.column_config.NumberColumn("Crédits", format="%d ⭐"),
-            "duree": st.column_config.NumberColumn("Durée", format="%d h"),
-            "difficulte": st.column_config.ProgressColumn("Difficulté", min_value=1, max_value=5)
-        }
-    )
-    
-    # Export
-    csv = df.to_csv(index=False)
-    st.download_button(
-        "📥 Télécharger en CSV",
-        csv,
-        "courses_export.csv",
-        "text/csv",
-        use_container_width=False
-    )
+    dashboard_course_table(list(stats['domains'].keys()))
+
 
 # ==================== PAGE 3: EXPLORER ====================
 
 elif page == "🔍 Explorer les cours":
-    st.markdown('<p class="main-header">🔍 Explorer les Cours</p>', unsafe_allow_html=True)
-    
-    courses = backend.get_all_courses()
-    
-    # Barre de recherche principale
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        search = st.text_input(
-            "🔎 Rechercher un cours",
-            placeholder="Entrez un nom, code ou mot-clé...",
-            label_visibility="collapsed"
-        )
+    st.html('<p class="main-header">🔍 Explorer les Cours</p>')
     
-    with col2:
-        sort_by = st.selectbox(
-            "Trier par",
-            ["code", "nom", "credits", "difficulte"],
-            label_visibility="collapsed"
-        )
-    
-    # Filtres avancés
-    with st.expander("🎛️ Filtres Avancés", expanded=True):
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            stats = backend.get_statistics()
-            domains = st.multiselect(
-                "🏷️ Domaines",
-                list(stats['domains'].keys())
-            )
-        
-        with col2:
-            levels = st.multiselect(
-                "🎯 Niveaux",
-                ["Débutant", "Intermédiaire", "Avancé"]
-            )
-        
-        with col3:
-            credits = st.slider(
-                "⭐ Crédits",
-                min_value=0,
-                max_value=10,
-                value=(0, 10)
-            )
-        
-        with col4:
-            difficulte = st.slider(
-                "📈 Difficulté",
-                min_value=1,
-                max_value=5,
-                value=(1, 5)
-            )
-    
-    # Appliquer les filtres
-    filtered = courses
-    
-    if search:
-        search_lower = search.lower()
-        filtered = [c for c in filtered if 
-                   search_lower in c['nom'].lower() or 
-                   search_lower in c['code'].lower() or
-                   search_lower in c.get('description', '').lower()]
-    
-    if domains:
-        filtered = [c for c in filtered if c['domaine'] in domains]
-    
-    if levels:
-        filtered = [c for c in filtered if c['niveau'] in levels]
-    
-    filtered = [c for c in filtered if 
-               credits[0] <= c['credits'] <= credits[1] and
-               difficulte[0] <= c['difficulte'] <= difficulte[1]]
-    
-    # Trier
-    filtered = sorted(filtered, key=lambda x: x.get(sort_by, ''))
-    
-    # Affichage des résultats
-    st.markdown(f"### 📊 {len(filtered)} cours trouvés sur {len(courses)}")
-    
-    if not filtered:
-        st.warning("❌ Aucun cours ne correspond à vos critères. Essayez d'élargir votre recherche.")
-    else:
-        # Mode d'affichage
-        view_mode = st.radio(
-            "Mode d'affichage",
-            ["🎴 Cartes", "📋 Tableau", "📝 Liste détaillée"],
-            horizontal=True
-        )
-        
-        if view_mode == "🎴 Cartes":
-            # Affichage en cartes (2 colonnes)
-
-
-            cols_per_row = 2
-            rows = [filtered[i:i+cols_per_row] for i in range(0, len(filtered), cols_per_row)]
-
-            for row in rows:
-                cols = st.columns(cols_per_row)
-                for idx, course in enumerate(row):
-                    with cols[idx]:
-                        with st.container():
-                            # En-tête de carte
-                            level_icons = {'Débutant': '🟢', 'Intermédiaire': '🟡', 'Avancé': '🔴'}
-                            st.markdown(f"### {level_icons.get(course['niveau'])} {course['code']}")
-                            st.markdown(f"**{course['nom']}**")
-                            
-                            # Badges
-                            st.caption(f"📚 {course['domaine']}")
-                            st.caption(f"⭐ {course['credits']} crédits • ⏱️ {course['duree']}h • 📈 Difficulté {course['difficulte']}/5")
-                            
-                            # Description expandable
-                            with st.expander("📄 Plus d'informations"):
-                                st.write(course.get('description', 'Pas de description disponible'))
-                                
-                                # Prérequis
-                                prereqs = backend.get_prerequisites_for_course(course['code'])
-                                if prereqs:
-                                    st.markdown("**📋 Prérequis:**")
-                                    for p in prereqs:
-                                        st.write(f"→ **{p['code']}**: {p['nom']}")
-                                else:
-                                    st.success("✅ Aucun prérequis")
-                            
-                            st.markdown("---")
-    
-        elif view_mode == "📋 Tableau":
-        # Affichage en tableau
-            df = pd.DataFrame(filtered)
-            st.dataframe(
-                df[['code', 'nom', 'domaine', 'niveau', 'credits', 'duree', 'difficulte']],
-                use_container_width=True,
-                hide_index=True,
-                column_config={
-                    "code": "Code",
-                    "nom": "Nom",
-                    "domaine": "Domaine",
-                    "niveau": "Niveau",
-                    "credits": st.column_config.NumberColumn("Crédits", format="%d ⭐"),
-                    "duree": st.column_config.NumberColumn("Durée (h)"),
-                    "difficulte": st.column_config.ProgressColumn("Difficulté", min_value=1, max_value=5)
-                }
-            )
-        
-        else:  # Liste détaillée
-            for course in filtered:
-                with st.expander(f"**{course['code']}** - {course['nom']}", expanded=False):
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        st.markdown(f"**Description:**")
-                        st.write(course.get('description', 'Pas de description'))
-                        
-                        prereqs = backend.get_prerequisites_for_course(course['code'])
-                        if prereqs:
-                            st.markdown("**Prérequis:**")
-                            for p in prereqs:
-                                st.write(f"→ {p['code']}: {p['nom']}")
-                    
-                    with col2:
-                        st.markdown("**Détails:**")
-                        st.write(f"🏷️ Domaine: {course['domaine']}")
-                        st.write(f"🎯 Niveau: {course['niveau']}")
-                        st.write(f"⭐ Crédits: {course['credits']}")
-                        st.write(f"⏱️ Durée: {course['duree']}h")
-                        st.write(f"📈 Difficulté: {course['difficulte']}/5")
+    explorer_results()
 
 
 # ==================== PAGE 4: GRAPHE RDF ====================
 
 elif page == "🗺️ Graphe RDF":
-    st.markdown('<p class="main-header">🗺️ Graphe des Prérequis</p>', unsafe_allow_html=True)
+    st.html('<p class="main-header">🗺️ Graphe des Prérequis</p>')
 
 
     st.info("📖 **Mode d'emploi:** Cliquez et faites glisser les nœuds pour explorer. Survolez pour voir les détails. Zoomez avec la molette.")
@@ -656,7 +834,7 @@ elif page == "🗺️ Graphe RDF":
         col1, col2 = st.columns(2)
         
         with col1:
-            stats = backend.get_statistics()
+            stats = _statistics()
             filter_domain = st.selectbox(
                 "Filtrer par domaine",
                 ["Tous"] + list(stats['domains'].keys())
@@ -668,28 +846,9 @@ elif page == "🗺️ Graphe RDF":
                 value=True
             )
 
-    # Récupérer données
-    courses = backend.get_all_courses()
-    prerequisites = backend.get_all_prerequisites()
-
-    # Appliquer filtres
-    if filter_domain != "Tous":
-        courses = [c for c in courses if c['domaine'] == filter_domain]
-        course_codes = {c['code'] for c in courses}
-        prerequisites = [(t, s) for t, s in prerequisites 
-                        if t in course_codes and s in course_codes]
-
-    if not show_isolated:
-        # Exclure les cours sans prérequis
-        courses_with_prereqs = set()
-        for target, source in prerequisites:
-            courses_with_prereqs.add(target)
-            courses_with_prereqs.add(source)
-        courses = [c for c in courses if c['code'] in courses_with_prereqs]
-
-    # Générer le graphe
-    with st.spinner("🎨 Génération du graphe interactif..."):
-        graph_html = create_prerequisites_graph(courses, prerequisites)
+    # Récupérer les données filtrées et le graphe (en cache par filtre)
+    courses, prerequisites = _graph_data(filter_domain, show_isolated)
+    graph_html = _graph_html(filter_domain, show_isolated)
 
     # Afficher le graphe
     st.components.v1.html(graph_html, height=750)
@@ -706,34 +865,29 @@ elif page == "🗺️ Graphe RDF":
     with col2:
         st.metric("Arêtes (Relations)", len(prerequisites))
 
+    graph_metrics = _graph_metrics(filter_domain, show_isolated)
+
     with col3:
         # Cours sans prérequis
-        courses_with_prereqs = {target for target, _ in prerequisites}
-        isolated = len([c for c in courses if c['code'] not in courses_with_prereqs])
-        st.metric("Sans prérequis", isolated)
+        st.metric("Sans prérequis", len(graph_metrics['entry_points']))
 
     with col4:
         # Cours avec le plus de prérequis
-        prereq_count = {}
-        for target, _ in prerequisites:
-            prereq_count[target] = prereq_count.get(target, 0) + 1
-        max_prereqs = max(prereq_count.values()) if prereq_count else 0
-        st.metric("Max prérequis", max_prereqs)
+        st.metric("Max prérequis", graph_metrics['max_prereqs'])
 
     # Liste des prérequis
     with st.expander("📋 Liste détaillée des prérequis"):
         if prerequisites:
-            prereq_data = []
-            for target, source in prerequisites:
-                target_course = backend.get_course_by_code(target)
-                source_course = backend.get_course_by_code(source)
-                if target_course and source_course:
-                    prereq_data.append({
-                        'Cours': f"{target} - {target_course['nom']}",
-                        'Prérequis': f"{source} - {source_course['nom']}"
-                    })
-            
-            df_prereqs = pd.DataFrame(prereq_data)
+            # Jointure vectorisée arêtes / noms (les arêtes vers un cours inconnu sont écartées)
+            edges_df = pd.DataFrame(prerequisites, columns=['target', 'source'])
+            names = _courses_df().set_index('code')['nom']
+            edges_df = (edges_df
+                        .join(names.rename('nom_t'), on='target', how='inner')
+                        .join(names.rename('nom_s'), on='source', how='inner'))
+            df_prereqs = pd.DataFrame({
+                'Cours': edges_df['target'] + ' - ' + edges_df['nom_t'],
+                'Prérequis': edges_df['source'] + ' - ' + edges_df['nom_s']
+            })
             st.dataframe(df_prereqs, use_container_width=True, hide_index=True)
         else:
             st.info("Aucun prérequis pour les cours affichés")
@@ -742,11 +896,12 @@ elif page == "🗺️ Graphe RDF":
 # ==================== PAGE 5: STATISTIQUES ====================
 
 elif page == "📈 Statistiques":
-    st.markdown('<p class="main-header">📈 Statistiques Avancées</p>', unsafe_allow_html=True)
+    st.html('<p class="main-header">📈 Statistiques Avancées</p>')
 
-    courses = backend.get_all_courses()
-    prerequisites = backend.get_all_prerequisites()
-    df = pd.DataFrame(courses)
+    courses = _all_courses()
+    prerequisites = _all_prerequisites()
+    stats = _statistics()
+    df = _courses_df()
 
     # Section 1: Analyse de Complexité
     st.markdown("## 🎯 Analyse de Complexité")
@@ -756,41 +911,26 @@ elif page == "📈 Statistiques":
     with col1:
         # Distribution par difficulté
         st.markdown("### Distribution par difficulté")
-        diff_counts = df['difficulte'].value_counts().sort_index()
-        
-        colors = ['#4CAF50', '#8BC34A', '#FFC107', '#FF9800', '#F44336']
-        fig = go.Figure(data=[
-            go.Bar(
-                x=[f"Niveau {i}" for i in diff_counts.index],
-                y=diff_counts.values,
-                marker_color=[colors[i-1] for i in diff_counts.index],
-                text=diff_counts.values,
-                textposition='auto'
-            )
-        ])
-        fig.update_layout(
-            template="plotly_dark",
-            showlegend=False,
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.components.v1.html(_fig_difficulty_html(), height=420)
 
     with col2:
         # Top cours par crédits
         st.markdown("### 🏆 Top 5 - Crédits")
         top_credits = df.nlargest(5, 'credits')[['code', 'nom', 'credits']]
-        for idx, row in top_credits.iterrows():
-            st.markdown(f"**{row['code']}** - {row['nom']}")
-            st.progress(row['credits'] / 10, text=f"{row['credits']} crédits")
+        st.html(render_progress_bars([
+            (f"{row.code} - {row.nom}", row.credits / 10, f"{row.credits} crédits")
+            for row in top_credits.itertuples(index=False)
+        ]))
         
         st.markdown("---")
         
         # Top cours difficiles
         st.markdown("### 🔥 Top 5 - Difficulté")
         top_diff = df.nlargest(5, 'difficulte')[['code', 'nom', 'difficulte']]
-        for idx, row in top_diff.iterrows():
-            st.markdown(f"**{row['code']}** - {row['nom']}")
-            st.progress(row['difficulte'] / 5, text=f"{row['difficulte']}/5")
+        st.html(render_progress_bars([
+            (f"{row.code} - {row.nom}", row.difficulte / 5, f"{row.difficulte}/5")
+            for row in top_diff.itertuples(index=False)
+        ]))
 
     st.markdown("---")
 
@@ -798,19 +938,17 @@ elif page == "📈 Statistiques":
     st.markdown("## 🔗 Analyse des Prérequis")
 
     # Calculer statistiques prérequis
-    prereq_count = {}
-    for target, _ in prerequisites:
-        prereq_count[target] = prereq_count.get(target, 0) + 1
+    graph_metrics = _graph_metrics()
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("### 📚 Cours avec le plus de prérequis")
-        sorted_prereqs = sorted(prereq_count.items(), key=lambda x: x[1], reverse=True)[:5]
+        sorted_prereqs = graph_metrics['prereq_count'].most_common(5)
         
         if sorted_prereqs:
             for code, count in sorted_prereqs:
-                course = backend.get_course_by_code(code)
+                course = _course_index().get(code)
                 if course:
                     st.write(f"**{code}** - {course['nom']}")
                     st.caption(f"→ {count} prérequis nécessaires")
@@ -819,13 +957,11 @@ elif page == "📈 Statistiques":
 
     with col2:
         st.markdown("### 🎯 Cours sans prérequis (Points d'entrée)")
-        courses_with_prereqs = set(prereq_count.keys())
-        all_courses = {c['code'] for c in courses}
-        no_prereqs = list(all_courses - courses_with_prereqs)[:5]
+        no_prereqs = sorted(graph_metrics['entry_points'])[:5]
         
         if no_prereqs:
             for code in no_prereqs:
-                course = backend.get_course_by_code(code)
+                course = _course_index().get(code)
                 if course:
                     st.write(f"**{code}** - {course['nom']}")
                     st.caption(f"✅ Accessible directement")
@@ -841,17 +977,17 @@ elif page == "📈 Statistiques":
 
     with col1:
         st.markdown("### Par Domaine")
-        for domaine, count in backend.get_statistics()['domains'].items():
-            percentage = (count / len(courses)) * 100
-            st.write(f"**{domaine}**")
-            st.progress(percentage / 100, text=f"{count} cours ({percentage:.1f}%)")
+        st.html(render_progress_bars([
+            (domaine, count / len(courses), f"{count} cours ({count * 100 / len(courses):.1f}%)")
+            for domaine, count in stats['domains'].items()
+        ]))
 
     with col2:
         st.markdown("### Par Niveau")
-        for niveau, count in backend.get_statistics()['levels'].items():
-            percentage = (count / len(courses)) * 100
-            st.write(f"**{niveau}**")
-            st.progress(percentage / 100, text=f"{count} cours ({percentage:.1f}%)")
+        st.html(render_progress_bars([
+            (niveau, count / len(courses), f"{count} cours ({count * 100 / len(courses):.1f}%)")
+            for niveau, count in stats['levels'].items()
+        ]))
 
     with col3:
         st.markdown("### Statistiques Globales")
@@ -868,10 +1004,9 @@ elif page == "📈 Statistiques":
 
     with col1:
         # Export CSV complet
-        csv_data = df.to_csv(index=False)
         st.download_button(
             "📊 Télécharger tous les cours (CSV)",
-            csv_data,
+            _courses_csv(),
             "all_courses.csv",
             "text/csv",
             use_container_width=True
@@ -879,11 +1014,9 @@ elif page == "📈 Statistiques":
 
     with col2:
         # Export prérequis
-        prereq_df = pd.DataFrame(prerequisites, columns=['Cours', 'Prérequis'])
-        prereq_csv = prereq_df.to_csv(index=False)
         st.download_button(
             "🔗 Télécharger les prérequis (CSV)",
-            prereq_csv,
+            _prereqs_csv(),
             "prerequisites.csv",
             "text/csv",
             use_container_width=True
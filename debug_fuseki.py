@@ -2,8 +2,88 @@
 Script de debug pour vérifier le contenu de Fuseki
 """
 
+from collections import defaultdict
+
 from src.knowledge_base import KnowledgeBase
 
+
+# Test 2 : comptage par type (regroupement nécessaire, reste en SPARQL)
+TYPES_QUERY = """
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+SELECT ?key (COUNT(*) AS ?count)
+WHERE {
+    ?s rdf:type ?key .
+}
+GROUP BY ?key
+ORDER BY DESC(?count)
+"""
+
+# Tests 1 et 5 : triplets et prédicats comptés en un seul parcours
+COUNTS_QUERY = """
+SELECT ?section ?key (COUNT(*) AS ?count)
+WHERE {
+    { BIND("triples" AS ?section) ?s ?p ?o . }
+    UNION
+    { BIND("predicates" AS ?section) ?s ?key ?o . }
+}
+GROUP BY ?section ?key
+ORDER BY ?section DESC(?count)
+"""
+
+# Tests 3, 4, 6 et 7 : tous les échantillons en une seule requête
+SAMPLES_QUERY = """
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX course: <http://www.semanticweb.org/ontologies/2024/university#>
+SELECT ?section ?s ?p ?o ?label
+WHERE {
+    {
+        SELECT ("instances" AS ?section) ?s (rdf:type AS ?p) ?o ?label
+        WHERE {
+            ?s rdf:type ?o .
+            OPTIONAL { ?s rdfs:label ?label . }
+        }
+        LIMIT 10
+    }
+    UNION
+    {
+        SELECT ("courses" AS ?section) ?s (course:codeCours AS ?p) ?o ?label
+        WHERE {
+            ?s rdf:type course:Course .
+            OPTIONAL { ?s rdfs:label ?label . }
+            OPTIONAL { ?s course:codeCours ?o . }
+        }
+        LIMIT 5
+    }
+    UNION
+    {
+        SELECT ("labels" AS ?section) ?s (rdfs:label AS ?p) ?label
+        WHERE {
+            ?s rdfs:label ?label .
+        }
+        LIMIT 10
+    }
+    UNION
+    {
+        SELECT ("triples" AS ?section) ?s ?p ?o
+        WHERE {
+            ?s ?p ?o .
+        }
+        LIMIT 10
+    }
+}
+"""
+
+
+def group_by_section(results):
+    """Regroupe les lignes de résultat par valeur de ?section"""
+    sections = defaultdict(list)
+    for row in results:
+        section = row['section']['value']
+        sections[section].append({k: v for k, v in row.items() if k != 'section'})
+    return sections
+
+
 def test_fuseki_content():
     """Teste différentes requêtes pour voir ce qu'il y a dans Fuseki"""
     
@@ -11,99 +91,37 @@ def test_fuseki_content():
     print("🔍 DEBUG : Vérification du contenu de Fuseki\n")
     print("=" * 70)
     
+    # Un seul parcours SPARQL pour les tests 1 et 5
+    counts = group_by_section(kb.execute_query(COUNTS_QUERY))
+    samples = group_by_section(kb.execute_query(SAMPLES_QUERY))
+    
     # Test 1 : Compter tous les triplets
     print("\n📊 Test 1 : Compter tous les triplets")
-    query1 = """
-    SELECT (COUNT(*) as ?count)
-    WHERE {
-        ?s ?p ?o .
-    }
-    """
-    result1 = kb.execute_query(query1)
-    print(f"Résultat : {result1}")
+    print(f"Résultat : {counts.get('triples', [])}")
     
-    # Test 2 : Lister tous les types de classes
+    # Test 2 : Lister tous les types de classes (mis en cache côté client)
     print("\n📊 Test 2 : Lister tous les types (classes)")
-    query2 = """
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    SELECT DISTINCT ?type (COUNT(?s) as ?count)
-    WHERE {
-        ?s rdf:type ?type .
-    }
-    GROUP BY ?type
-    """
-    result2 = kb.execute_query(query2)
-    print(f"Résultat : {result2}")
+    print(f"Résultat : {kb.cached_query(TYPES_QUERY)}")
     
     # Test 3 : Lister quelques instances de cours (peu importe leur type)
-    print("\n📊 Test 3 : Lister les 5 premières instances avec rdf:type")
-    query3 = """
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?subject ?type ?label
-    WHERE {
-        ?subject rdf:type ?type .
-        OPTIONAL { ?subject rdfs:label ?label . }
-    }
-    LIMIT 10
-    """
-    result3 = kb.execute_query(query3)
-    print(f"Résultat : {result3}")
+    print("\n📊 Test 3 : Lister les 10 premières instances avec rdf:type")
+    print(f"Résultat : {samples.get('instances', [])}")
     
     # Test 4 : Chercher spécifiquement course:Course
     print("\n📊 Test 4 : Chercher les cours avec type course:Course")
-    query4 = """
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX course: <http://www.semanticweb.org/ontologies/2024/university#>
-    SELECT ?course ?label ?code
-    WHERE {
-        ?course rdf:type course:Course .
-        OPTIONAL { ?course rdfs:label ?label . }
-        OPTIONAL { ?course course:codeCours ?code . }
-    }
-    LIMIT 5
-    """
-    result4 = kb.execute_query(query4)
-    print(f"Résultat : {result4}")
+    print(f"Résultat : {samples.get('courses', [])}")
     
     # Test 5 : Lister tous les prédicats utilisés
     print("\n📊 Test 5 : Lister tous les prédicats (propriétés)")
-    query5 = """
-    SELECT DISTINCT ?predicate (COUNT(?s) as ?count)
-    WHERE {
-        ?s ?predicate ?o .
-    }
-    GROUP BY ?predicate
-    ORDER BY DESC(?count)
-    """
-    result5 = kb.execute_query(query5)
-    print(f"Résultat : {result5}")
+    print(f"Résultat : {counts.get('predicates', [])}")
     
     # Test 6 : Chercher n'importe quoi avec "label"
     print("\n📊 Test 6 : Chercher tout ce qui a un label")
-    query6 = """
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT ?subject ?label
-    WHERE {
-        ?subject rdfs:label ?label .
-    }
-    LIMIT 10
-    """
-    result6 = kb.execute_query(query6)
-    print(f"Résultat : {result6}")
+    print(f"Résultat : {samples.get('labels', [])}")
     
     # Test 7 : Requête ultra simple
     print("\n📊 Test 7 : Sélectionner les 10 premiers triplets")
-    query7 = """
-    SELECT ?s ?p ?o
-    WHERE {
-        ?s ?p ?o .
-    }
-    LIMIT 10
-    """
-    result7 = kb.execute_query(query7)
-    print(f"Résultat : {result7}")
+    print(f"Résultat : {samples.get('triples', [])}")
     
     print("\n" + "=" * 70)
     print("✅ Tests de debug terminés")
@@ -114,4 +132,4 @@ def test_fuseki_content():
 
 
 if __name__ == "__main__":
-    test_fuseki_content()
\ No newline at end of file
+    test_fuseki_content()
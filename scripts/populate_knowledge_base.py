@@ -2,23 +2,330 @@
 Script pour peupler la base de connaissance avec des données de cours
 """
 import pandas as pd
+import logging
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 # Ajouter le répertoire parent au path pour importer les modules
 sys.path.append(str(Path(__file__).parent.parent))
 
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import RDF, XSD
+
+from src.csv_loader import iter_csv_chunks, load_csv
 from src.knowledge_base import KnowledgeBase
 
+logger = logging.getLogger(__name__)
+
+
+# Préfixes communs aux INSERT DATA groupés
+PREFIXES = """
+PREFIX course: <http://www.university.edu/ontology/courses#>
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+"""
+
+# En-tête et fin d'un INSERT DATA groupé, assemblés une seule fois
+INSERT_PREAMBLE = PREFIXES + "INSERT DATA {\n"
+INSERT_END = "\n}"
+
+# Mêmes préfixes en syntaxe Turtle (chargement groupé via le Graph Store Protocol)
+TURTLE_PREFIXES = """
+@prefix course: <http://www.university.edu/ontology/courses#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+"""
+
+COURSE = Namespace("http://www.university.edu/ontology/courses#")
+
+# Domaines (identifiant, nom) et niveaux créés avant les cours
+DOMAINS = [
+    ("IntelligenceArtificielle", "Intelligence Artificielle"),
+    ("DeveloppementWeb", "Développement Web"),
+    ("BaseDeDonnees", "Bases de Données"),
+    ("Informatique", "Informatique"),
+    ("Mathematiques", "Mathématiques")
+]
+LEVELS = ["Debutant", "Intermediaire", "Avance"]
+
+# Préfixe du code de cours → sous-classe de course:Course
+PREFIX_TO_TYPE = {
+    'IA': 'CourseIA',
+    'WEB': 'CourseWeb',
+    'BDD': 'CourseBDD',
+    'MATH': 'CourseMathematiques'
+}
+DEFAULT_COURSE_TYPE = 'CourseInformatique'
+
+# Table de traduction des identifiants (une seule passe C au lieu de replace enchaînés)
+SKILL_ID_TABLE = str.maketrans({' ': '_', '/': '_', '.': '_'})
+
+# Templates définis une seule fois ; seules les valeurs changent d'une ligne à l'autre
+INSERT_DOMAIN = PREFIXES + """
+INSERT DATA {
+    $uri rdf:type course:Domain ;
+        course:nomDomaine $name .
+}
+"""
+
+INSERT_LEVEL = PREFIXES + """
+INSERT DATA {
+    $uri rdf:type course:Level .
+}
+"""
+
+COURSE_TRIPLES = """
+    <{uri}> rdf:type course:Course , course:{course_type} ;
+        course:codeCours {code} ;
+        course:nomCours {nom} ;
+        course:credits {credits} ;
+        course:duree {duree} ;
+        course:difficulte {difficulte} ;
+        course:description {description} ;
+        course:appartientADomaine course:{domaine} ;
+        course:aNiveau course:{niveau} ."""
+
+SKILL_TRIPLES = """
+    <{uri}> rdf:type course:Skill ;
+        course:nomCompetence {name} ."""
+
+
+def literal(value) -> str:
+    """Littéral chaîne correctement échappé (guillemets, antislash, retours à la ligne...)"""
+    return Literal(str(value)).n3()
+
+
+def integer_literal(value) -> str:
+    """Littéral xsd:integer"""
+    return Literal(int(value), datatype=XSD.integer).n3()
+
+
+def build_graph(data_dir: Path) -> Graph:
+    """
+    Construit en mémoire le graphe complet (domaines, niveaux, cours, prérequis,
+    compétences) depuis les CSV, sans chaîne SPARQL ni accès réseau
+    
+    Args:
+        data_dir: Répertoire contenant les fichiers CSV
+        
+    Returns:
+        Graphe rdflib prêt à être sérialisé
+    """
+    g = Graph()
+    g.bind("course", COURSE)
+    
+    for domain_id, domain_name in DOMAINS:
+        g.add((COURSE[domain_id], RDF.type, COURSE.Domain))
+        g.add((COURSE[domain_id], COURSE.nomDomaine, Literal(domain_name)))
+    
+    for level in LEVELS:
+        g.add((COURSE[level], RDF.type, COURSE.Level))
+    
+    courses = load_csv(data_dir / "cours.csv")
+    courses['course_type'] = (courses['code'].str.extract(r'^([A-Z]+)')[0]
+                              .map(PREFIX_TO_TYPE)
+                              .fillna(DEFAULT_COURSE_TYPE))
+    for row in courses.itertuples(index=False):
+        course = COURSE[row.code]
+        g.add((course, RDF.type, COURSE.Course))
+        g.add((course, RDF.type, COURSE[row.course_type]))
+        g.add((course, COURSE.codeCours, Literal(row.code)))
+        g.add((course, COURSE.nomCours, Literal(str(row.nom))))
+        g.add((course, COURSE.credits, Literal(int(row.credits), datatype=XSD.integer)))
+        g.add((course, COURSE.duree, Literal(int(row.duree), datatype=XSD.integer)))
+        g.add((course, COURSE.difficulte, Literal(int(row.difficulte), datatype=XSD.integer)))
+        g.add((course, COURSE.description, Literal(str(row.description))))
+        g.add((course, COURSE.appartientADomaine, COURSE[row.domaine]))
+        g.add((course, COURSE.aNiveau, COURSE[row.niveau]))
+    
+    prereqs = load_csv(data_dir / "prerequis.csv", ['cours', 'prerequis'])
+    for cours_code, prerequis_code in prereqs[['cours', 'prerequis']].itertuples(index=False, name=None):
+        g.add((COURSE[cours_code], COURSE.aPrerequis, COURSE[prerequis_code]))
+    
+    skills = load_csv(data_dir / "competences.csv", ['cours', 'competence'])
+    skills['skill_id'] = 'Skill_' + skills['competence'].str.translate(SKILL_ID_TABLE)
+    for cours_code, skill, skill_id in skills[['cours', 'competence', 'skill_id']].itertuples(index=False, name=None):
+        g.add((COURSE[skill_id], RDF.type, COURSE.Skill))
+        g.add((COURSE[skill_id], COURSE.nomCompetence, Literal(skill)))
+        g.add((COURSE[cours_code], COURSE.enseigneCompetence, COURSE[skill_id]))
+    
+    return g
+
+
+def ship_graph(g: Graph, kb: KnowledgeBase) -> int:
+    """
+    Sérialise le graphe en N-Triples en une passe et le charge dans Fuseki
+    (Graph Store Protocol, une seule transaction)
+    
+    Returns:
+        Taille envoyée en octets, 0 en cas d'échec
+    """
+    ntriples = g.serialize(format="nt")
+    if not kb.upload_rdf(ntriples, "application/n-triples"):
+        return 0
+    return len(ntriples.encode('utf-8'))
+
 
 class KnowledgeBasePopulator:
     """
     Classe pour peupler la base de connaissance depuis des fichiers CSV
     """
     
-    def __init__(self, kb: KnowledgeBase):
+    # Taille des lots : blocs multi-prédicats pour les cours, un triplet par lien
+    COURSE_BATCH_SIZE = 500
+    LINK_BATCH_SIZE = 2000
+    
+    # Nombre de lignes CSV lues (et envoyées) à la fois
+    CSV_CHUNK_SIZE = 2000
+    
+    def __init__(self, kb: KnowledgeBase, bulk_load: bool = False,
+                 max_workers: int = None):
+        """
+        Args:
+            kb: Base de connaissance cible
+            bulk_load: Si True, les lots sont accumulés puis chargés en une
+                seule requête Turtle à la fin au lieu d'un INSERT DATA par lot
+            max_workers: Nombre de lots envoyés en parallèle au sein d'une
+                étape (défaut : variable KB_LOADER_WORKERS, sinon 8)
+        """
         self.kb = kb
+        self.bulk_load = bulk_load
+        self.max_workers = max_workers or int(os.getenv('KB_LOADER_WORKERS', 8))
         self.course_uris = {}  # Mapping code → URI
+        self._pending = []  # Blocs de triplets en attente (mode bulk_load)
+        
+        # Mesures de l'étape en cours (cf. _timed), alimentées par les threads d'envoi
+        self._span = None
+        self._span_lock = threading.Lock()
+    
+    
+    @contextmanager
+    def _timed(self, label: str):
+        """
+        Chronomètre une étape et journalise le volume envoyé
+        
+        Le temps total est comparé au temps cumulé passé dans les requêtes HTTP
+        pour distinguer une étape limitée par le client (construction des
+        chaînes) d'une étape limitée par le réseau ou par Fuseki.
+        """
+        self._span = {'requests': 0, 'blocks': 0, 'bytes': 0, 'send': 0.0}
+        start = time.perf_counter()
+        try:
+            yield self._span
+        finally:
+            elapsed = time.perf_counter() - start
+            span, self._span = self._span, None
+            logger.info(
+                f"⏱️ {label} : {elapsed * 1000:.1f} ms "
+                f"(envoi cumulé {span['send'] * 1000:.1f} ms), "
+                f"{span['requests']} requêtes, {span['blocks']} blocs, {span['bytes']} o"
+            )
+    
+    
+    def _record(self, blocks: int, size: int, send_time: float):
+        """Ajoute une requête aux mesures de l'étape en cours"""
+        with self._span_lock:
+            if self._span is not None:
+                self._span['requests'] += 1
+                self._span['blocks'] += blocks
+                self._span['bytes'] += size
+                self._span['send'] += send_time
+    
+    
+    def _flush_batch(self, triples: list) -> bool:
+        """
+        Envoie les triplets accumulés dans un seul INSERT DATA puis vide la liste
+        
+        Args:
+            triples: Blocs de triplets (chacun terminé par « . »)
+            
+        Returns:
+            True si succès (ou lot vide), False sinon
+        """
+        if not triples:
+            return True
+        
+        if self.bulk_load:
+            self._pending.extend(triples)
+            triples.clear()
+            return True
+        
+        # Une seule jointure linéaire, sans concaténation répétée sur le tampon
+        query = "".join((INSERT_PREAMBLE, "\n".join(triples), INSERT_END))
+        blocks = len(triples)
+        triples.clear()
+        
+        start = time.perf_counter()
+        ok = self.kb.execute_update(query)
+        self._record(blocks, len(query.encode('utf-8')), time.perf_counter() - start)
+        return ok
+    
+    
+    def _update_template(self, name: str, bindings: dict, template: str) -> bool:
+        """Exécute un template d'update et l'ajoute aux mesures (taille non mesurée)"""
+        start = time.perf_counter()
+        ok = self.kb.execute_update_template(name, bindings, template)
+        self._record(1, 0, time.perf_counter() - start)
+        return ok
+    
+    
+    def _read_csv_chunks(self, csv_path, columns: list):
+        """
+        Ouvre un CSV en lecture par morceaux (mémoire bornée à CSV_CHUNK_SIZE lignes)
+        
+        Args:
+            csv_path: Chemin du fichier
+            columns: Colonnes utiles (les autres ne sont pas chargées)
+            
+        Returns:
+            Itérateur de DataFrames, ou None si le fichier est introuvable
+        """
+        try:
+            return iter_csv_chunks(csv_path, columns, self.CSV_CHUNK_SIZE)
+        except FileNotFoundError:
+            print(f"  ❌ Fichier non trouvé : {csv_path}")
+            return None
+    
+    
+    def _send_in_batches(self, blocks: list, batch_size: int, label: str,
+                         offset: int = 0) -> bool:
+        """
+        Découpe les blocs en lots et les envoie en parallèle
+        
+        Les lots d'une même étape sont indépendants ; les étapes restent
+        séquentielles (les prérequis référencent les cours déjà créés).
+        
+        Args:
+            blocks: Blocs de triplets de l'étape
+            batch_size: Nombre de blocs par INSERT DATA
+            label: Libellé affiché dans la progression
+            offset: Nombre d'éléments déjà envoyés (morceaux précédents)
+            
+        Returns:
+            True si tous les lots ont réussi
+        """
+        batches = [blocks[i:i + batch_size] for i in range(0, len(blocks), batch_size)]
+        sizes = [len(batch) for batch in batches]
+        
+        if self.bulk_load or len(batches) <= 1:
+            results = [self._flush_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(self._flush_batch, batches))
+        
+        done = offset
+        for size, ok in zip(sizes, results):
+            done += size
+            if ok:
+                print(f"  ✅ {label} : {done}")
+            else:
+                print(f"  ❌ Erreur lot de {size} {label} (jusqu'à {done})")
+        return all(results)
         
     
     def populate_domains(self):
@@ -27,28 +334,12 @@ class KnowledgeBasePopulator:
         """
         print("\n📚 Création des domaines...")
         
-        domains = [
-            ("IntelligenceArtificielle", "Intelligence Artificielle"),
-            ("DeveloppementWeb", "Développement Web"),
-            ("BaseDeDonnees", "Bases de Données"),
-            ("Informatique", "Informatique"),
-            ("Mathematiques", "Mathématiques")
-        ]
-        
-        for domain_id, domain_name in domains:
+        for domain_id, domain_name in DOMAINS:
             domain_uri = f"http://www.university.edu/ontology/courses#{domain_id}"
             
-            query = f"""
-            PREFIX course: <http://www.university.edu/ontology/courses#>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            bindings = {'uri': f"<{domain_uri}>", 'name': literal(domain_name)}
             
-            INSERT DATA {{
-                <{domain_uri}> rdf:type course:Domain ;
-                    course:nomDomaine "{domain_name}" .
-            }}
-            """
-            
-            if self.kb.execute_update(query):
+            if self._update_template("insert_domain", bindings, INSERT_DOMAIN):
                 print(f"  ✅ Domaine créé : {domain_name}")
             else:
                 print(f"  ❌ Erreur création domaine : {domain_name}")
@@ -60,21 +351,10 @@ class KnowledgeBasePopulator:
         """
         print("\n📊 Création des niveaux...")
         
-        levels = ["Debutant", "Intermediaire", "Avance"]
-        
-        for level in levels:
+        for level in LEVELS:
             level_uri = f"http://www.university.edu/ontology/courses#{level}"
             
-            query = f"""
-            PREFIX course: <http://www.university.edu/ontology/courses#>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            
-            INSERT DATA {{
-                <{level_uri}> rdf:type course:Level .
-            }}
-            """
-            
-            if self.kb.execute_update(query):
+            if self._update_template("insert_level", {'uri': f"<{level_uri}>"}, INSERT_LEVEL):
                 print(f"  ✅ Niveau créé : {level}")
             else:
                 print(f"  ❌ Erreur création niveau : {level}")
@@ -89,57 +369,50 @@ class KnowledgeBasePopulator:
         """
         print("\n📘 Import des cours...")
         
-        try:
-            df = pd.read_csv(csv_path)
-            print(f"  📄 {len(df)} cours à importer")
-        except FileNotFoundError:
-            print(f"  ❌ Fichier non trouvé : {csv_path}")
+        chunks = self._read_csv_chunks(csv_path, ['code', 'nom', 'domaine', 'niveau', 'credits',
+                                                  'duree', 'difficulte', 'description'])
+        if chunks is None:
             return
         
-        for idx, row in df.iterrows():
-            code = row['code']
+        total = 0
+        for df in chunks:
+            total += self._populate_course_chunk(df, offset=total)
+        print(f"  📄 {total} cours importés")
+    
+    
+    def _populate_course_chunk(self, df: pd.DataFrame, offset: int = 0) -> int:
+        """
+        Construit et envoie les triplets d'un morceau du CSV des cours
+        
+        Returns:
+            Nombre de cours du morceau
+        """
+        # Type de cours déduit du préfixe du code (IA-301 → CourseIA)
+        df['course_type'] = (df['code'].str.extract(r'^([A-Z]+)')[0]
+                             .map(PREFIX_TO_TYPE)
+                             .fillna(DEFAULT_COURSE_TYPE))
+        
+        # Sérialiser les littéraux (échappement SPARQL/Turtle complet), colonne par colonne
+        for col in ['code', 'nom', 'description']:
+            df[col + '_n3'] = df[col].map(literal)
+        for col in ['credits', 'duree', 'difficulte']:
+            df[col] = df[col].map(integer_literal)
+        
+        blocks = []
+        for row in df.itertuples(index=False):
+            code = row.code
             course_uri = f"http://www.university.edu/ontology/courses#{code}"
             self.course_uris[code] = course_uri
             
-            # Déterminer le type de cours
-            if 'IA' in code:
-                course_type = "CourseIA"
-            elif 'WEB' in code:
-                course_type = "CourseWeb"
-            elif 'BDD' in code:
-                course_type = "CourseBDD"
-            elif 'MATH' in code:
-                course_type = "CourseMathematiques"
-            else:
-                course_type = "CourseInformatique"
-            
-            # Échapper les guillemets dans la description
-            description = str(row['description']).replace('"', '\\"')
-            nom = str(row['nom']).replace('"', '\\"')
-            
-            # Créer le cours
-            query = f"""
-            PREFIX course: <http://www.university.edu/ontology/courses#>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-            
-            INSERT DATA {{
-                <{course_uri}> rdf:type course:Course , course:{course_type} ;
-                    course:codeCours "{code}" ;
-                    course:nomCours "{nom}" ;
-                    course:credits "{row['credits']}"^^xsd:integer ;
-                    course:duree "{row['duree']}"^^xsd:integer ;
-                    course:difficulte "{row['difficulte']}"^^xsd:integer ;
-                    course:description "{description}" ;
-                    course:appartientADomaine course:{row['domaine']} ;
-                    course:aNiveau course:{row['niveau']} .
-            }}
-            """
-            
-            if self.kb.execute_update(query):
-                print(f"  ✅ Cours {idx+1}/{len(df)} : {code} - {row['nom']}")
-            else:
-                print(f"  ❌ Erreur cours : {code}")
+            # Ajouter le cours au lot courant
+            blocks.append(COURSE_TRIPLES.format(
+                uri=course_uri, course_type=row.course_type, code=row.code_n3, nom=row.nom_n3,
+                credits=row.credits, duree=row.duree, difficulte=row.difficulte,
+                description=row.description_n3, domaine=row.domaine, niveau=row.niveau
+            ))
+        
+        self._send_in_batches(blocks, self.COURSE_BATCH_SIZE, "cours importés", offset)
+        return len(blocks)
     
     
     def populate_prerequisites(self, csv_path: str):
@@ -151,29 +424,28 @@ class KnowledgeBasePopulator:
         """
         print("\n🔗 Ajout des prérequis...")
         
-        try:
-            df = pd.read_csv(csv_path)
-            print(f"  📄 {len(df)} relations de prérequis à créer")
-        except FileNotFoundError:
-            print(f"  ❌ Fichier non trouvé : {csv_path}")
+        chunks = self._read_csv_chunks(csv_path, ['cours', 'prerequis'])
+        if chunks is None:
             return
         
-        for idx, row in df.iterrows():
-            cours_code = row['cours']
-            prerequis_code = row['prerequis']
+        # Un triplet par paire, sans doublon : un seul INSERT DATA par morceau
+        seen = set()
+        total = 0
+        for df in chunks:
+            blocks = []
+            for pair in zip(df['cours'], df['prerequis']):
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                blocks.append("course:{} course:aPrerequis course:{} .".format(*pair))
             
-            query = f"""
-            PREFIX course: <http://www.university.edu/ontology/courses#>
-            
-            INSERT DATA {{
-                course:{cours_code} course:aPrerequis course:{prerequis_code} .
-            }}
-            """
-            
-            if self.kb.execute_update(query):
-                print(f"  ✅ Prérequis {idx+1}/{len(df)} : {cours_code} → {prerequis_code}")
+            size = len(blocks)
+            if self._flush_batch(blocks):
+                total += size
+                print(f"  ✅ prérequis créés : {total}")
             else:
-                print(f"  ❌ Erreur prérequis : {cours_code} → {prerequis_code}")
+                print(f"  ❌ Erreur lot de {size} prérequis (après {total})")
+        print(f"  📄 {total} relations de prérequis créées")
     
     
     def populate_skills(self, csv_path: str):
@@ -183,61 +455,67 @@ class KnowledgeBasePopulator:
         Args:
             csv_path: Chemin vers le fichier competences.csv
         """
-        print("\n🎯 Import des compétences...")
+        print("\n🎯 Import des compétences et liaison cours-compétences...")
         
-        try:
-            df = pd.read_csv(csv_path)
-        except FileNotFoundError:
-            print(f"  ❌ Fichier non trouvé : {csv_path}")
+        chunks = self._read_csv_chunks(csv_path, ['cours', 'competence'])
+        if chunks is None:
             return
         
-        # Récupérer toutes les compétences uniques
-        skills = df['competence'].unique()
-        print(f"  📄 {len(skills)} compétences uniques à créer")
-        
-        # Créer les compétences
-        for skill in skills:
-            skill_id = skill.replace(' ', '_').replace('/', '_').replace('.', '_')
-            skill_uri = f"http://www.university.edu/ontology/courses#Skill_{skill_id}"
-            
-            # Échapper les guillemets
-            skill_escaped = skill.replace('"', '\\"')
+        created_skills = set()  # Compétences déjà créées dans les morceaux précédents
+        links = 0
+        ok = True
+        for df in chunks:
+            # Créer les compétences nouvelles de ce morceau
+            blocks = []
+            for skill in df['competence'].unique():
+                if skill in created_skills:
+                    continue
+                created_skills.add(skill)
+                
+                skill_id = skill.translate(SKILL_ID_TABLE)
+                skill_uri = f"http://www.university.edu/ontology/courses#Skill_{skill_id}"
+                
+                blocks.append(SKILL_TRIPLES.format(uri=skill_uri, name=literal(skill)))
             
-            query = f"""
-            PREFIX course: <http://www.university.edu/ontology/courses#>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            self._send_in_batches(blocks, self.COURSE_BATCH_SIZE, "compétences créées",
+                                  len(created_skills) - len(blocks))
             
-            INSERT DATA {{
-                <{skill_uri}> rdf:type course:Skill ;
-                    course:nomCompetence "{skill_escaped}" .
-            }}
-            """
+            # Lier les compétences aux cours
+            df['skill_id'] = df['competence'].str.translate(SKILL_ID_TABLE)
+            blocks = [
+                f"course:{cours_code} course:enseigneCompetence course:Skill_{skill_id} ."
+                for cours_code, skill_id in df[['cours', 'skill_id']].itertuples(index=False, name=None)
+            ]
             
-            self.kb.execute_update(query)
+            ok &= self._send_in_batches(blocks, self.LINK_BATCH_SIZE, "liaisons créées", links)
+            links += len(blocks)
         
-        print(f"  ✅ {len(skills)} compétences créées")
+        print(f"  📄 {len(created_skills)} compétences uniques, {links} liaisons")
+        if ok:
+            print(f"  ✅ Toutes les liaisons cours-compétences créées")
+    
+    
+    def load_pending(self) -> bool:
+        """
+        Charge en une seule transaction tous les triplets accumulés (mode bulk_load)
         
-        # Lier les compétences aux cours
-        print("\n🔗 Liaison cours-compétences...")
-        for idx, row in df.iterrows():
-            cours_code = row['cours']
-            skill = row['competence']
-            skill_id = skill.replace(' ', '_').replace('/', '_').replace('.', '_')
-            
-            query = f"""
-            PREFIX course: <http://www.university.edu/ontology/courses#>
-            
-            INSERT DATA {{
-                course:{cours_code} course:enseigneCompetence course:Skill_{skill_id} .
-            }}
-            """
-            
-            self.kb.execute_update(query)
-            
-            if (idx + 1) % 10 == 0:
-                print(f"  ✅ {idx + 1}/{len(df)} liaisons créées...")
+        Returns:
+            True si succès (ou rien à charger), False sinon
+        """
+        if not self._pending:
+            return True
         
-        print(f"  ✅ Toutes les liaisons cours-compétences créées")
+        print(f"\n🚚 Chargement groupé de {len(self._pending)} blocs de triplets...")
+        turtle = "".join((TURTLE_PREFIXES, "\n".join(self._pending), "\n"))
+        start = time.perf_counter()
+        ok = self.kb.upload_turtle(turtle)
+        self._record(len(self._pending), len(turtle.encode('utf-8')), time.perf_counter() - start)
+        if ok:
+            print(f"  ✅ {len(turtle.encode('utf-8'))} octets chargés")
+            self._pending.clear()
+        else:
+            print("  ❌ Erreur lors du chargement groupé")
+        return ok
     
     
     def run_full_population(self, data_dir: Path):
@@ -253,17 +531,68 @@ class KnowledgeBasePopulator:
         
         try:
             # 1. Domaines et niveaux
-            self.populate_domains()
-            self.populate_levels()
+            with self._timed("Domaines"):
+                self.populate_domains()
+            with self._timed("Niveaux"):
+                self.populate_levels()
             
             # 2. Cours
-            self.populate_courses(data_dir / "cours.csv")
+            with self._timed("Cours"):
+                self.populate_courses(data_dir / "cours.csv")
             
             # 3. Prérequis
-            self.populate_prerequisites(data_dir / "prerequis.csv")
+            with self._timed("Prérequis"):
+                self.populate_prerequisites(data_dir / "prerequis.csv")
             
             # 4. Compétences
-            self.populate_skills(data_dir / "competences.csv")
+            with self._timed("Compétences"):
+                self.populate_skills(data_dir / "competences.csv")
+            
+            # 5. Chargement groupé (mode bulk_load)
+            if self.bulk_load:
+                with self._timed("Chargement groupé"):
+                    loaded = self.load_pending()
+                if not loaded:
+                    return
+            
+            print("\n" + "="*70)
+            print("✅ POPULATION TERMINÉE AVEC SUCCÈS !")
+            print("="*70)
+            
+            # Afficher des statistiques
+            self.print_statistics()
+            
+        except Exception as e:
+            print(f"\n❌ ERREUR GÉNÉRALE : {e}")
+            import traceback
+            traceback.print_exc()
+    
+    
+    def run_graph_population(self, data_dir: Path):
+        """
+        Population complète via un graphe rdflib construit en mémoire puis
+        chargé en une seule requête N-Triples
+        
+        Args:
+            data_dir: Répertoire contenant les fichiers CSV
+        """
+        print("="*70)
+        print("🚀 DÉBUT DE LA POPULATION DE LA BASE DE CONNAISSANCE (graphe en mémoire)")
+        print("="*70)
+        
+        try:
+            with self._timed("Construction du graphe"):
+                g = build_graph(data_dir)
+            print(f"\n🧱 {len(g)} triplets construits en mémoire")
+            
+            with self._timed("Chargement N-Triples"):
+                start = time.perf_counter()
+                sent = ship_graph(g, self.kb)
+                self._record(len(g), sent, time.perf_counter() - start)
+            
+            if not sent:
+                print("\n❌ Erreur lors du chargement du graphe")
+                return
             
             print("\n" + "="*70)
             print("✅ POPULATION TERMINÉE AVEC SUCCÈS !")
@@ -287,7 +616,7 @@ class KnowledgeBasePopulator:
         
         # Nombre total de triplets
         query = "SELECT (COUNT(*) as ?count) WHERE { ?s ?p ?o }"
-        results = self.kb.execute_query(query)
+        results = self.kb.cached_query(query)
         if results:
             count = results[0]['count']['value']
             print(f"  📦 Nombre total de triplets : {count}")
@@ -303,7 +632,7 @@ class KnowledgeBasePopulator:
             ?c course:aPrerequis ?p .
         }
         """
-        results = self.kb.execute_query(query)
+        results = self.kb.cached_query(query)
         if results:
             count = results[0]['count']['value']
             print(f"  🔗 Nombre de relations de prérequis : {count}")
@@ -315,7 +644,7 @@ class KnowledgeBasePopulator:
             ?s a course:Skill .
         }
         """
-        results = self.kb.execute_query(query)
+        results = self.kb.cached_query(query)
         if results:
             count = results[0]['count']['value']
             print(f"  🎯 Nombre de compétences : {count}")
@@ -327,7 +656,7 @@ class KnowledgeBasePopulator:
             ?d a course:Domain .
         }
         """
-        results = self.kb.execute_query(query)
+        results = self.kb.cached_query(query)
         if results:
             count = results[0]['count']['value']
             print(f"  📂 Nombre de domaines : {count}")
@@ -345,7 +674,7 @@ def main():
     
     # Créer la connexion à la base de connaissance
     print("🔌 Connexion à Fuseki...")
-    kb = KnowledgeBase()
+    kb = KnowledgeBase(warm=False)
     
     # Tester la connexion
     if not kb.test_connection():
@@ -378,11 +707,20 @@ def main():
     
     print("✅ Tous les fichiers CSV sont présents\n")
     
+    # Mode de chargement :
+    #   --mode=graph  (défaut) graphe rdflib en mémoire, un seul POST N-Triples
+    #   --mode=bulk   blocs SPARQL accumulés, un seul POST Turtle
+    #   --mode=legacy INSERT DATA par lots (utile pour le debug)
+    mode = next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--mode=')), 'graph')
+    
     # Créer le populator
-    populator = KnowledgeBasePopulator(kb)
+    populator = KnowledgeBasePopulator(kb, bulk_load=(mode == 'bulk'))
     
     # Lancer la population
-    populator.run_full_population(data_dir)
+    if mode == 'graph':
+        populator.run_graph_population(data_dir)
+    else:
+        populator.run_full_population(data_dir)
     
     print("\n" + "="*70)
     print("🎉 SCRIPT TERMINÉ !")
@@ -4,10 +4,15 @@ Version corrigée compatible avec students.csv
 """
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.csv_loader import iter_csv_chunks
 from src.knowledge_base import KnowledgeBase
-import csv
+from rdflib import Literal
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -15,15 +20,145 @@ logger = logging.getLogger(__name__)
 
 PREFIX = "http://www.university.edu/ontology/courses#"
 
+# Préfixes des INSERT DATA groupés
+UPDATE_PREFIXES = f"""
+PREFIX course: <{PREFIX}>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+"""
+INSERT_PREAMBLE = UPDATE_PREFIXES + "INSERT DATA {\n"
+INSERT_END = "\n}"
+
+# Nombre d'étudiants (avec tous leurs liens) par update
+STUDENT_BATCH_SIZE = 200
+
+# Nombre de lignes du CSV lues à la fois
+CSV_CHUNK_SIZE = 2000
+
+# Nombre de lots envoyés en parallèle
+LOADER_WORKERS = int(os.getenv('KB_LOADER_WORKERS', 8))
+
+# Table de nettoyage des noms d'URI (une seule passe via str.translate)
+_URI_TABLE = str.maketrans({' ': '', 'é': 'e', 'è': 'e', 'à': 'a', 'ê': 'e', 'ô': 'o'})
+
+# Colonnes du CSV contenant des listes « a,b,c »
+LIST_COLUMNS = ['interets', 'competences', 'cours_suivis']
+
 
 def clean_uri_name(text):
     """Nettoie un texte pour en faire un nom d'URI valide"""
-    return (text.replace(' ', '')
-                .replace('é', 'e')
-                .replace('è', 'e')
-                .replace('à', 'a')
-                .replace('ê', 'e')
-                .replace('ô', 'o'))
+    return text.translate(_URI_TABLE)
+
+
+def split_field(value):
+    """Découpe une cellule CSV « a,b,c » en liste nettoyée (sans éléments vides)"""
+    return [v.strip() for v in (value or '').split(',') if v.strip()]
+
+
+def literal(value, lang=None) -> str:
+    """Littéral SPARQL correctement échappé (guillemets, antislash, retours à la ligne...)"""
+    return Literal(value, lang=lang).n3()
+
+
+_span_lock = threading.Lock()
+
+
+@contextmanager
+def timed(label: str):
+    """
+    Chronomètre une phase et journalise le volume envoyé
+    
+    Le temps total est comparé au temps cumulé des requêtes HTTP pour
+    distinguer une phase limitée par le client d'une phase limitée par
+    le réseau ou par Fuseki.
+    """
+    span = {'requests': 0, 'blocks': 0, 'bytes': 0, 'send': 0.0}
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"⏱️ {label} : {elapsed * 1000:.1f} ms "
+            f"(envoi cumulé {span['send'] * 1000:.1f} ms), "
+            f"{span['requests']} requêtes, {span['blocks']} blocs, {span['bytes']} o"
+        )
+
+
+def insert_data(kb: KnowledgeBase, triples, span: dict = None) -> bool:
+    """Envoie une liste de blocs de triplets dans un seul INSERT DATA"""
+    if not triples:
+        return True
+    query = "".join((INSERT_PREAMBLE, "\n".join(triples), INSERT_END))
+    
+    start = time.perf_counter()
+    ok = kb.execute_update(query)
+    if span is not None:
+        with _span_lock:
+            span['requests'] += 1
+            span['blocks'] += len(triples)
+            span['bytes'] += len(query.encode('utf-8'))
+            span['send'] += time.perf_counter() - start
+    return ok
+
+
+def fetch_course_uris(kb: KnowledgeBase) -> dict:
+    """Récupère en une requête le mapping code de cours → URI"""
+    query = f"""
+    PREFIX course: <{PREFIX}>
+    
+    SELECT ?cours ?code
+    WHERE {{
+        ?cours course:codeCours ?code .
+    }}
+    """
+    code_to_uri = {}
+    for row in kb.execute_query(query):
+        # Premier URI rencontré par code (équivalent de l'ancien LIMIT 1)
+        code_to_uri.setdefault(row['code']['value'], row['cours']['value'])
+    return code_to_uri
+
+
+def fetch_existing_resources(kb: KnowledgeBase):
+    """
+    Récupère en une requête les domaines et compétences déjà présents
+    (créés par populate_knowledge_base ou par une exécution précédente)
+    
+    Returns:
+        Tuple (ensemble des uri_name de domaines, ensemble des uri_name de compétences)
+    """
+    query = f"""
+    PREFIX course: <{PREFIX}>
+    
+    SELECT ?resource ?type
+    WHERE {{
+        VALUES ?type {{ course:Domain course:Skill }}
+        ?resource a ?type .
+    }}
+    """
+    domains, skills = set(), set()
+    for row in kb.execute_query(query):
+        uri = row['resource']['value']
+        if not uri.startswith(PREFIX):
+            continue
+        target = domains if row['type']['value'].endswith('Domain') else skills
+        target.add(uri[len(PREFIX):])
+    return domains, skills
+
+
+def read_student_chunks(csv_file: str):
+    """
+    Lit le CSV des étudiants par morceaux de CSV_CHUNK_SIZE lignes
+    
+    Yields:
+        Liste de dictionnaires étudiants, colonnes de listes déjà découpées
+    """
+    columns = ['student_id', 'nom', 'prenom'] + LIST_COLUMNS
+    for df in iter_csv_chunks(csv_file, columns, CSV_CHUNK_SIZE):
+        for col in ['student_id', 'nom', 'prenom']:
+            df[col] = df[col].str.strip()
+        for col in LIST_COLUMNS:
+            df[col] = df[col].map(split_field)
+        yield df.to_dict('records')
 
 
 def populate_students_from_csv(kb: KnowledgeBase, csv_file: str):
@@ -43,163 +178,125 @@ def populate_students_from_csv(kb: KnowledgeBase, csv_file: str):
         return
     
     try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            students_data = list(reader)
+        # ===== 1. Index code → URI des cours (une seule requête) =====
+        with timed("Index des cours") as span:
+            code_to_uri = fetch_course_uris(kb)
+            span['requests'] += 1
         
-        print(f"📊 {len(students_data)} étudiants à ajouter\n")
+        # Domaines et compétences connus (uri_name) : l'existence est vérifiée
+        # côté client, sans FILTER NOT EXISTS évalué par Fuseki
+        with timed("Domaines et compétences existants") as span:
+            known_domains, known_skills = fetch_existing_resources(kb)
+            span['requests'] += 1
+        created_domains = created_skills = total = 0
         
-        for student in students_data:
-            student_id = student['student_id'].strip()
-            nom = student['nom'].strip()
-            prenom = student['prenom'].strip()
-            
-            # URI de l'étudiant (utiliser student_id tel quel)
-            student_uri = f"{PREFIX}{student_id}"
-            
-            # ===== 1. Créer l'étudiant =====
-            update_student = f"""
-            PREFIX course: <{PREFIX}>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+        # Lecture par morceaux : la mémoire reste bornée à CSV_CHUNK_SIZE étudiants
+        for students_data in read_student_chunks(csv_file):
+            print(f"📊 {len(students_data)} étudiants à ajouter\n")
             
-            INSERT DATA {{
-                <{student_uri}> a course:Student ;
-                    course:nomEtudiant "{nom}" ;
-                    course:prenomEtudiant "{prenom}" ;
-                    course:studentId "{student_id}" ;
-                    rdfs:label "{prenom} {nom}"@fr .
-            }}
-            """
+            # ===== 2. Domaines et compétences pas encore créés =====
+            new_domains = {}
+            new_skills = {}
+            for student in students_data:
+                for interet in student['interets']:
+                    uri_name = clean_uri_name(interet)
+                    if uri_name not in known_domains:
+                        new_domains.setdefault(uri_name, interet)
+                for comp in student['competences']:
+                    uri_name = clean_uri_name(comp)
+                    if uri_name not in known_skills:
+                        new_skills.setdefault(uri_name, comp)
             
-            if kb.execute_update(update_student):
-                print(f"✅ Étudiant créé: {prenom} {nom} ({student_id})")
+            # Ensembles déjà dédoublonnés : plus besoin de FILTER NOT EXISTS côté serveur
+            resources = [
+                f'<{PREFIX}{uri_name}> a course:Domain ; rdfs:label {literal(label, "fr")} .'
+                for uri_name, label in new_domains.items()
+            ] + [
+                f'<{PREFIX}{uri_name}> a course:Skill ; rdfs:label {literal(label, "fr")} .'
+                for uri_name, label in new_skills.items()
+            ]
+            with timed("Domaines et compétences") as span:
+                created = insert_data(kb, resources, span)
+            if created:
+                print(f"✅ {len(new_domains)} domaines et {len(new_skills)} compétences créés\n")
             else:
-                print(f"❌ Erreur pour {student_id}")
-                continue
+                logger.error("❌ Erreur lors de la création des domaines et compétences")
+            known_domains.update(new_domains)
+            known_skills.update(new_skills)
+            created_domains += len(new_domains)
+            created_skills += len(new_skills)
             
-            # ===== 2. Ajouter les intérêts (domaines) =====
-            if student.get('interets'):
-                interets = [i.strip() for i in student['interets'].split(',')]
+            # ===== 3. Étudiants et leurs liens (pas d'affichage par ligne) =====
+            build_start = time.perf_counter()
+            blocks = []
+            missing_courses = set()
+            for student in students_data:
+                student_id = student['student_id']
+                nom = student['nom']
+                prenom = student['prenom']
                 
-                for interet in interets:
-                    if not interet:
-                        continue
-                    
-                    # Nettoyer pour URI (ex: "Intelligence Artificielle" -> "IntelligenceArtificielle")
-                    interet_uri_name = clean_uri_name(interet)
-                    interet_uri = f"{PREFIX}{interet_uri_name}"
-                    
-                    # Créer le domaine s'il n'existe pas
-                    update_domain = f"""
-                    PREFIX course: <{PREFIX}>
-                    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                    
-                    INSERT {{
-                        <{interet_uri}> a course:Domain ;
-                            rdfs:label "{interet}"@fr .
-                    }}
-                    WHERE {{
-                        FILTER NOT EXISTS {{ <{interet_uri}> a course:Domain }}
-                    }}
-                    """
-                    kb.execute_update(update_domain)
-                    
-                    # Lier l'étudiant au domaine
-                    update_interet = f"""
-                    PREFIX course: <{PREFIX}>
-                    
-                    INSERT DATA {{
-                        <{student_uri}> course:intéresséPar <{interet_uri}> .
-                    }}
-                    """
-                    kb.execute_update(update_interet)
+                # URI de l'étudiant (utiliser student_id tel quel)
+                student_uri = f"{PREFIX}{student_id}"
                 
-                print(f"   📚 Intérêts: {', '.join(interets)}")
-            
-            # ===== 3. Ajouter les compétences =====
-            if student.get('competences'):
-                competences = [c.strip() for c in student['competences'].split(',')]
+                properties = [
+                    "a course:Student",
+                    f'course:nomEtudiant {literal(nom)}',
+                    f'course:prenomEtudiant {literal(prenom)}',
+                    f'course:studentId {literal(student_id)}',
+                    f'rdfs:label {literal(f"{prenom} {nom}", "fr")}'
+                ]
                 
-                for comp in competences:
-                    if not comp:
-                        continue
-                    
-                    comp_uri_name = clean_uri_name(comp)
-                    comp_uri = f"{PREFIX}{comp_uri_name}"
-                    
-                    # Créer la compétence si elle n'existe pas
-                    update_skill = f"""
-                    PREFIX course: <{PREFIX}>
-                    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                    
-                    INSERT {{
-                        <{comp_uri}> a course:Skill ;
-                            rdfs:label "{comp}"@fr .
-                    }}
-                    WHERE {{
-                        FILTER NOT EXISTS {{ <{comp_uri}> a course:Skill }}
-                    }}
-                    """
-                    kb.execute_update(update_skill)
-                    
-                    # Lier l'étudiant à la compétence
-                    update_comp = f"""
-                    PREFIX course: <{PREFIX}>
-                    
-                    INSERT DATA {{
-                        <{student_uri}> course:possèdeCompetence <{comp_uri}> .
-                    }}
-                    """
-                    kb.execute_update(update_comp)
+                # Intérêts (domaines)
+                interets = student['interets']
+                if interets:
+                    properties.append("course:intéresséPar " + ", ".join(
+                        f"<{PREFIX}{clean_uri_name(i)}>" for i in interets
+                    ))
                 
-                print(f"   🎓 Compétences: {', '.join(competences)}")
-            
-            # ===== 4. Ajouter les cours suivis =====
-            if student.get('cours_suivis'):
-                cours_list = [c.strip() for c in student['cours_suivis'].split(',')]
-                cours_ajoutes = []
+                # Compétences
+                competences = student['competences']
+                if competences:
+                    properties.append("course:possèdeCompetence " + ", ".join(
+                        f"<{PREFIX}{clean_uri_name(c)}>" for c in competences
+                    ))
                 
-                for code_cours in cours_list:
-                    if not code_cours:
-                        continue
-                    
-                    # Trouver le cours par son code
-                    query_cours = f"""
-                    PREFIX course: <{PREFIX}>
-                    
-                    SELECT ?cours
-                    WHERE {{
-                        ?cours course:codeCours "{code_cours}" .
-                    }}
-                    LIMIT 1
-                    """
-                    
-                    result = kb.execute_query(query_cours)
+                # Cours suivis
+                cours_uris = []
+                for code_cours in student['cours_suivis']:
+                    cours_uri = code_to_uri.get(code_cours)
                     
-                    if result:
-                        cours_uri = result[0]['cours']['value']
-                        
-                        # Lier l'étudiant au cours
-                        update_suivi = f"""
-                        PREFIX course: <{PREFIX}>
-                        
-                        INSERT DATA {{
-                            <{student_uri}> course:aSuivi <{cours_uri}> .
-                        }}
-                        """
-                        
-                        if kb.execute_update(update_suivi):
-                            cours_ajoutes.append(code_cours)
+                    if cours_uri:
+                        cours_uris.append(f"<{cours_uri}>")
                     else:
-                        print(f"      ⚠️ Cours {code_cours} introuvable dans la base")
+                        missing_courses.add(code_cours)
                 
-                if cours_ajoutes:
-                    print(f"   📖 Cours suivis: {', '.join(cours_ajoutes)}")
+                if cours_uris:
+                    properties.append("course:aSuivi " + ", ".join(cours_uris))
+                
+                blocks.append(f"<{student_uri}> " + " ;\n    ".join(properties) + " .")
+            
+            logger.info(f"⏱️ Construction des blocs étudiants : "
+                        f"{(time.perf_counter() - build_start) * 1000:.1f} ms")
+            
+            # Un seul avertissement par morceau pour les cours inconnus
+            if missing_courses:
+                logger.warning(f"⚠️ Cours introuvables dans la base : {', '.join(sorted(missing_courses))}")
+            
+            # ===== 4. Envoi des lots en parallèle (domaines et compétences déjà créés) =====
+            batches = [blocks[i:i + STUDENT_BATCH_SIZE] for i in range(0, len(blocks), STUDENT_BATCH_SIZE)]
+            with timed("Étudiants") as span, ThreadPoolExecutor(max_workers=LOADER_WORKERS) as executor:
+                results = list(executor.map(lambda batch: insert_data(kb, batch, span), batches))
             
+            for batch, ok in zip(batches, results):
+                total += len(batch)
+                if ok:
+                    print(f"✅ {total} étudiants enregistrés")
+                else:
+                    logger.error(f"❌ Erreur pour le lot de {len(batch)} étudiants (jusqu'à {total})")
             print()
         
         print("="*70)
-        print("✅ POPULATION TERMINÉE")
+        print(f"✅ POPULATION TERMINÉE ({total} étudiants, {created_domains} domaines et {created_skills} compétences créés)")
         print("="*70)
         
     except FileNotFoundError:
@@ -321,7 +418,7 @@ if __name__ == "__main__":
     print("="*70)
     
     # Connexion à la base
-    kb = KnowledgeBase()
+    kb = KnowledgeBase(warm=False)
     
     if not kb.test_connection():
         print("❌ Impossible de se connecter à Fuseki")
@@ -1,13 +1,83 @@
 from src.conversation_manager import ConversationManager
 import sys
 
+# Édition de ligne et historique pour input() (absent sous Windows)
+try:
+    import readline  # noqa: F401
+except ImportError:
+    readline = None
+
+
+# Commandes spéciales → nom de la méthode qui les traite (table construite une fois)
+_COMMANDS = {
+    **dict.fromkeys(['quitter', 'exit', 'quit', 'q'], '_quit'),
+    **dict.fromkeys(['aide', 'help', 'h', '?'], '_show_help'),
+    **dict.fromkeys(['historique', 'history'], '_show_history'),
+    **dict.fromkeys(['contexte', 'context'], '_show_context'),
+    **dict.fromkeys(['reset', 'clear', 'nouveau'], '_reset_conversation'),
+}
+
+
+# Message de bienvenue (contenu fixe, rendu une seule fois à l'import)
+_WELCOME = "\n".join([
+    "=" * 70,
+    "🎓 Bienvenue sur CourseGuideAI ! 🎓".center(70),
+    "=" * 70,
+    "\nJe suis votre assistant intelligent pour vous guider dans le choix de cours.",
+    "\n📚 Exemples de questions que vous pouvez me poser :",
+    "  • 'Je cherche des cours en intelligence artificielle'",
+    "  • 'Quels sont les prérequis pour IA-401 ?'",
+    "  • 'Je veux devenir expert en Machine Learning'",
+    "  • 'Montre-moi tous les cours disponibles'",
+    "\n💡 Commandes spéciales :",
+    "  • 'aide' - Afficher l'aide",
+    "  • 'historique' - Voir l'historique de conversation",
+    "  • 'contexte' - Voir le contexte actuel",
+    "  • 'reset' - Réinitialiser la conversation",
+    "  • 'quitter' - Quitter le chatbot",
+    "\n" + "=" * 70 + "\n",
+]) + "\n"
+
+# Guide d'utilisation (contenu fixe)
+_HELP = "\n".join([
+    "\n📖 GUIDE D'UTILISATION",
+    "=" * 70,
+    "\n🎯 Types de questions que je comprends :\n",
+    "1️⃣ Recherche de cours :",
+    "   • 'Je cherche des cours en [domaine]'",
+    "   • 'Montre-moi des cours de niveau [débutant/intermédiaire/avancé]'",
+    "   • 'Quels cours en intelligence artificielle ?'",
+    "\n2️⃣ Vérification de prérequis :",
+    "   • 'Quels sont les prérequis pour [CODE-COURS] ?'",
+    "   • 'Est-ce que je peux suivre IA-401 ?'",
+    "\n3️⃣ Parcours d'apprentissage :",
+    "   • 'Je veux devenir expert en [domaine]'",
+    "   • 'Par où commencer pour apprendre le Machine Learning ?'",
+    "   • 'Quel parcours pour maîtriser le développement web ?'",
+    "\n4️⃣ Informations sur un cours :",
+    "   • 'C'est quoi le cours [CODE-COURS] ?'",
+    "   • 'Donne-moi des infos sur IA-401'",
+    "\n5️⃣ Liste complète :",
+    "   • 'Montre-moi tous les cours'",
+    "   • 'Liste tous les cours disponibles'",
+    "\n💡 Commandes spéciales :",
+    "   • aide - Afficher cette aide",
+    "   • historique - Voir l'historique de conversation",
+    "   • contexte - Voir le contexte actuel",
+    "   • reset - Réinitialiser la conversation",
+    "   • quitter - Quitter le chatbot",
+    "\n" + "=" * 70,
+]) + "\n"
+
 
 class CourseGuideChatbot:
     def __init__(self):
         """Initialise le chatbot complet"""
         print("🤖 Initialisation de CourseGuideAI...\n")
-        self.conversation_manager = ConversationManager()
+        # Processus court relancé souvent : le cache disque évite de refaire les requêtes
+        self.conversation_manager = ConversationManager(disk_cache=True)
         self.is_running = False
+        self._cmd_table = {command: getattr(self, method) for command, method in _COMMANDS.items()}
         print("✅ CourseGuideAI est prêt !\n")
     
     def start(self):
@@ -27,11 +97,13 @@ class CourseGuideChatbot:
                 if self._handle_special_commands(user_input):
                     continue
                 
-                # Traiter le message
+                # Traiter le message (réponse écrite au fil des morceaux)
                 if user_input:
-                    print("\n🤖 CourseGuideAI: ", end="")
-                    response = self.conversation_manager.process_message(user_input)
-                    print(response)
+                    sys.stdout.write("\n🤖 CourseGuideAI: ")
+                    for chunk in self.conversation_manager.stream_message(user_input):
+                        sys.stdout.write(chunk)
+                    sys.stdout.write("\n")
+                    sys.stdout.flush()
                 
             except KeyboardInterrupt:
                 print("\n\n👋 Au revoir ! À bientôt !")
@@ -42,22 +114,7 @@ class CourseGuideChatbot:
     
     def _print_welcome_message(self):
         """Affiche le message de bienvenue"""
-        print("=" * 70)
-        print("🎓 Bienvenue sur CourseGuideAI ! 🎓".center(70))
-        print("=" * 70)
-        print("\nJe suis votre assistant intelligent pour vous guider dans le choix de cours.")
-        print("\n📚 Exemples de questions que vous pouvez me poser :")
-        print("  • 'Je cherche des cours en intelligence artificielle'")
-        print("  • 'Quels sont les prérequis pour IA-401 ?'")
-        print("  • 'Je veux devenir expert en Machine Learning'")
-        print("  • 'Montre-moi tous les cours disponibles'")
-        print("\n💡 Commandes spéciales :")
-        print("  • 'aide' - Afficher l'aide")
-        print("  • 'historique' - Voir l'historique de conversation")
-        print("  • 'contexte' - Voir le contexte actuel")
-        print("  • 'reset' - Réinitialiser la conversation")
-        print("  • 'quitter' - Quitter le chatbot")
-        print("\n" + "=" * 70 + "\n")
+        sys.stdout.write(_WELCOME)
     
     def _handle_special_commands(self, command: str) -> bool:
         """
@@ -69,66 +126,21 @@ class CourseGuideChatbot:
         Returns:
             True si c'est une commande spéciale, False sinon
         """
-        command_lower = command.lower()
-        
-        if command_lower in ['quitter', 'exit', 'quit', 'q']:
-            print("\n👋 Au revoir ! À bientôt !")
-            self.is_running = False
-            return True
-        
-        elif command_lower in ['aide', 'help', 'h', '?']:
-            self._show_help()
-            return True
-        
-        elif command_lower in ['historique', 'history']:
-            self._show_history()
-            return True
-        
-        elif command_lower in ['contexte', 'context']:
-            self._show_context()
-            return True
+        handler = self._cmd_table.get(command.lower())
+        if handler is None:
+            return False
         
-        elif command_lower in ['reset', 'clear', 'nouveau']:
-            self._reset_conversation()
-            return True
-        
-        return False
+        handler()
+        return True
+    
+    def _quit(self):
+        """Quitte le chatbot"""
+        print("\n👋 Au revoir ! À bientôt !")
+        self.is_running = False
     
     def _show_help(self):
         """Affiche l'aide complète"""
-        print("\n📖 GUIDE D'UTILISATION")
-        print("=" * 70)
-        print("\n🎯 Types de questions que je comprends :\n")
-        
-        print("1️⃣ Recherche de cours :")
-        print("   • 'Je cherche des cours en [domaine]'")
-        print("   • 'Montre-moi des cours de niveau [débutant/intermédiaire/avancé]'")
-        print("   • 'Quels cours en intelligence artificielle ?'")
-        
-        print("\n2️⃣ Vérification de prérequis :")
-        print("   • 'Quels sont les prérequis pour [CODE-COURS] ?'")
-        print("   • 'Est-ce que je peux suivre IA-401 ?'")
-        
-        print("\n3️⃣ Parcours d'apprentissage :")
-        print("   • 'Je veux devenir expert en [domaine]'")
-        print("   • 'Par où commencer pour apprendre le Machine Learning ?'")
-        print("   • 'Quel parcours pour maîtriser le développement web ?'")
-        
-        print("\n4️⃣ Informations sur un cours :")
-        print("   • 'C'est quoi le cours [CODE-COURS] ?'")
-        print("   • 'Donne-moi des infos sur IA-401'")
-        
-        print("\n5️⃣ Liste complète :")
-        print("   • 'Montre-moi tous les cours'")
-        print("   • 'Liste tous les cours disponibles'")
-        
-        print("\n💡 Commandes spéciales :")
-        print("   • aide - Afficher cette aide")
-        print("   • historique - Voir l'historique de conversation")
-        print("   • contexte - Voir le contexte actuel")
-        print("   • reset - Réinitialiser la conversation")
-        print("   • quitter - Quitter le chatbot")
-        print("\n" + "=" * 70)
+        sys.stdout.write(_HELP)
     
     def _show_history(self):
         """Affiche l'historique de conversation"""
@@ -138,15 +150,16 @@ class CourseGuideChatbot:
             print("\n📭 Aucun historique pour le moment.")
             return
         
-        print("\n📜 HISTORIQUE DE CONVERSATION")
-        print("=" * 70)
+        lines = ["\n📜 HISTORIQUE DE CONVERSATION", "=" * 70]
         
+        # Heure et aperçu sont précalculés par ConversationManager.process_message
         for i, exchange in enumerate(history, 1):
-            print(f"\n💬 Échange {i} - {exchange['timestamp'].strftime('%H:%M:%S')}")
-            print(f"👤 Vous: {exchange['user']}")
-            print(f"🤖 Bot: {exchange['bot'][:100]}..." if len(exchange['bot']) > 100 else f"🤖 Bot: {exchange['bot']}")
+            lines.append(f"\n💬 Échange {i} - {exchange['timestamp_str']}")
+            lines.append(f"👤 Vous: {exchange['user']}")
+            lines.append(f"🤖 Bot: {exchange['bot_preview']}")
         
-        print("\n" + "=" * 70)
+        lines.append("\n" + "=" * 70)
+        print("\n".join(lines))
     
     def _show_context(self):
         """Affiche le contexte actuel"""
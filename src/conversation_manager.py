@@ -3,29 +3,92 @@ Module de gestion de conversation avec contexte et réponses naturelles
 Membre 2 : Spécialiste NLP - Conversation Manager
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Deque, Iterator, List, Optional, Tuple
+from collections import deque
 from datetime import datetime
+from functools import partial
 from src.sparql_query_builder import SPARQLQueryBuilder
-from src.knowledge_base import KnowledgeBase
+from src.knowledge_base import Course, KnowledgeBase
+
+# Codes cités en exemple dans l'aide, donc les plus demandés
+WARM_COURSE_CODES = ('IA-401', 'WEB-301')
+
+# Longueur de l'aperçu des réponses dans l'historique
+HISTORY_PREVIEW_CHARS = 100
+
+# Nombre d'échanges conservés (les plus anciens sont oubliés au-delà)
+HISTORY_MAX_EXCHANGES = 200
+
+# Libellés des domaines, indexés par préfixe de code
+DOMAIN_NAMES = {
+    'IA': '🤖 Intelligence Artificielle',
+    'WEB': '🌐 Développement Web',
+    'BDD': '💾 Base de Données',
+    'MATH': '📊 Mathématiques',
+    'SEC': '🔒 Sécurité'
+}
+
+# Titre de section selon le premier chiffre du numéro de cours (IA-401 → '4')
+LEVEL_TITLES = {
+    '1': "**🌱 Niveau Débutant :**\n",
+    '2': "**🌱 Niveau Débutant :**\n",
+    '3': "**📈 Niveau Intermédiaire :**\n",
+    '4': "**🚀 Niveau Avancé :**\n",
+    '5': "**🚀 Niveau Avancé :**\n"
+}
+
+
+def split_course_code(code: str) -> Tuple[str, str]:
+    """Sépare un code de cours en (préfixe, numéro) : 'IA-401' → ('IA', '401')"""
+    prefix, sep, number = code.rpartition('-')
+    if not sep:
+        return 'AUTRE', ''
+    return prefix, number
+
+
+# Contexte de départ (seule source pour __init__ et clear_history)
+_INITIAL_CONTEXT = (
+    ('last_intent', None),
+    ('last_entities', {}),
+    ('last_courses', []),
+    ('user_domain', None),
+    ('user_level', None),
+)
+
+
+def _initial_context() -> Dict[str, Any]:
+    """Nouveau contexte, les valeurs mutables étant copiées"""
+    return {key: value.copy() if isinstance(value, (dict, list)) else value
+            for key, value in _INITIAL_CONTEXT}
 
 
 class ConversationManager:
-    def __init__(self):
-        """Initialise le gestionnaire de conversation"""
-        self.kb = KnowledgeBase()
+    __slots__ = ('kb', 'query_builder', 'history', 'context')
+    
+    def __init__(self, disk_cache: bool = False):
+        """
+        Initialise le gestionnaire de conversation
+        
+        Args:
+            disk_cache: Cache SPARQL persistant entre les lancements (CLI)
+        """
+        self.kb = KnowledgeBase(disk_cache=disk_cache)
         self.query_builder = SPARQLQueryBuilder(self.kb)
         
+        # Précharger les requêtes les plus fréquentes (listes des cours servies en
+        # repli de recherche_cours / info_cours, exemples de l'aide) : un repli
+        # ne coûte alors aucun aller-retour de plus vers Fuseki
+        self.kb.warm(
+            self.query_builder.list_course_names,
+            self.query_builder.list_all_courses,
+            *(partial(self.query_builder.check_prerequisites, code) for code in WARM_COURSE_CODES)
+        )
+        
         # Historique de conversation
-        self.history: List[Dict[str, Any]] = []
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_MAX_EXCHANGES)
         
         # Contexte de la conversation
-        self.context = {
-            'last_intent': None,
-            'last_entities': {},
-            'last_courses': [],
-            'user_domain': None,
-            'user_level': None
-        }
+        self.context = _initial_context()
         
         print("✅ ConversationManager initialisé")
     
@@ -39,11 +102,30 @@ class ConversationManager:
         Returns:
             Réponse formatée du chatbot
         """
-        # Ajouter à l'historique
+        return "".join(self.stream_message(user_message))
+    
+    def stream_message(self, user_message: str) -> Iterator[str]:
+        """
+        Traite un message utilisateur et produit la réponse morceau par morceau
+        
+        Le catalogue complet est émis domaine par domaine ; les autres
+        réponses arrivent en un seul morceau. L'historique est complété
+        une fois la réponse entièrement produite.
+        
+        Args:
+            user_message: Message de l'utilisateur
+            
+        Yields:
+            Morceaux de la réponse formatée
+        """
+        # Ajouter à l'historique (heure formatée une fois pour l'affichage)
+        now = datetime.now()
         self.history.append({
-            'timestamp': datetime.now(),
+            'timestamp': now,
+            'timestamp_str': now.strftime('%H:%M:%S'),
             'user': user_message,
-            'bot': None
+            'bot': None,
+            'bot_preview': ''
         })
         
         # Traiter la requête
@@ -53,12 +135,16 @@ class ConversationManager:
         self._update_context(result)
         
         # Générer une réponse naturelle
-        response = self._generate_response(result)
+        chunks = []
+        for chunk in self._iter_response(result):
+            chunks.append(chunk)
+            yield chunk
+        response = "".join(chunks)
         
-        # Ajouter la réponse à l'historique
+        # Ajouter la réponse à l'historique, avec son aperçu
         self.history[-1]['bot'] = response
-        
-        return response
+        self.history[-1]['bot_preview'] = (response[:HISTORY_PREVIEW_CHARS] + "..."
+                                           if len(response) > HISTORY_PREVIEW_CHARS else response)
     
     def _update_context(self, result: Dict[str, Any]):
         """Met à jour le contexte de conversation"""
@@ -72,6 +158,13 @@ class ConversationManager:
                 if 'domain' in result['data']:
                     self.context['user_domain'] = result['data']['domain']
     
+    def _iter_response(self, result: Dict[str, Any]) -> Iterator[str]:
+        """Réponse par morceaux (seul le catalogue complet est découpé)"""
+        if result['intent'] == 'liste_cours':
+            yield from self._iter_all_courses_response(result['data'])
+        else:
+            yield self._generate_response(result)
+    
     def _generate_response(self, result: Dict[str, Any]) -> str:
         """
         Génère une réponse naturelle selon l'intention et les données
@@ -103,7 +196,7 @@ class ConversationManager:
         else:
             return "Je n'ai pas bien compris votre demande. Pouvez-vous reformuler ?"
     
-    def _format_course_search_response(self, courses: List[Dict]) -> str:
+    def _format_course_search_response(self, courses: List[Course]) -> str:
         """Formate la réponse pour une recherche de cours"""
         if not courses or len(courses) == 0:
             return ("Je n'ai trouvé aucun cours correspondant à votre recherche. 😔\n\n"
@@ -111,22 +204,23 @@ class ConversationManager:
                     "- Essayez de chercher par domaine : 'cours en web', 'cours en IA'\n"
                     "- Ou demandez la liste complète : 'montre-moi tous les cours'")
         
-        response = f"✅ J'ai trouvé **{len(courses)} cours** pour vous !\n\n"
+        parts = [f"✅ J'ai trouvé **{len(courses)} cours** pour vous !\n\n"]
         
         for i, course in enumerate(courses, 1):
-            response += f"**{i}. {course['label']}**\n"
-            response += f"   📌 Code: {course['code']}\n"
-            response += f"   🎓 Crédits: {course['credits']}\n"
+            credits = course.credits if course.credits is not None else 'N/A'
+            parts.append(f"**{i}. {course.label}**\n"
+                         f"   📌 Code: {course.code}\n"
+                         f"   🎓 Crédits: {credits}\n")
             
-            if course.get('description'):
-                desc = course['description'][:100] + "..." if len(course['description']) > 100 else course['description']
-                response += f"   📝 {desc}\n"
+            if course.description:
+                desc = course.description[:100] + "..." if len(course.description) > 100 else course.description
+                parts.append(f"   📝 {desc}\n")
             
-            response += "\n"
+            parts.append("\n")
         
-        response += "💬 Besoin de plus d'infos ? Demandez-moi les prérequis ou plus de détails sur un cours !"
+        parts.append("💬 Besoin de plus d'infos ? Demandez-moi les prérequis ou plus de détails sur un cours !")
         
-        return response
+        return "".join(parts)
     
     def _format_prerequisites_response(self, prereqs: Dict) -> str:
         """Formate la réponse pour les prérequis"""
@@ -141,120 +235,102 @@ class ConversationManager:
                     f"Le cours **{course_name}** ({prereqs['code']}) n'a **aucun prérequis**.\n"
                     f"Vous pouvez le suivre directement ! 🚀")
         
-        response = f"📋 Prérequis pour **{course_name}** ({prereqs['code']}) :\n\n"
+        parts = [f"📋 Prérequis pour **{course_name}** ({prereqs['code']}) :\n\n"]
         
         for i, prereq in enumerate(prereq_list, 1):
-            response += f"{i}. **{prereq['label']}** ({prereq['code']})\n"
+            parts.append(f"{i}. **{prereq['label']}** ({prereq['code']})\n")
         
-        response += f"\n💡 Vous devez compléter ces {len(prereq_list)} cours avant de pouvoir suivre {course_name}."
+        parts.append(f"\n💡 Vous devez compléter ces {len(prereq_list)} cours avant de pouvoir suivre {course_name}.")
         
-        return response
+        return "".join(parts)
     
-    def _format_learning_path_response(self, courses: List[Dict]) -> str:
+    def _format_learning_path_response(self, courses: List[Course]) -> str:
         """Formate la réponse pour un parcours d'apprentissage"""
         if not courses or len(courses) == 0:
             return ("Je n'ai pas trouvé de parcours pour ce domaine. 🤔\n\n"
                     "💡 Essayez : 'parcours en Intelligence Artificielle' ou 'parcours en Web'")
         
-        response = "🎯 **Votre parcours d'apprentissage recommandé** :\n\n"
-        response += "Suivez ces cours dans l'ordre pour une progression optimale :\n\n"
-        
-        # Organiser par niveau (basé sur le code)
-        beginner = [c for c in courses if '-1' in c['code'] or '-2' in c['code']]
-        intermediate = [c for c in courses if '-3' in c['code']]
-        advanced = [c for c in courses if '-4' in c['code'] or '-5' in c['code']]
-        
-        if beginner:
-            response += "**🌱 Niveau Débutant :**\n"
-            for course in beginner:
-                response += f"  → {course['label']} ({course['code']})\n"
-            response += "\n"
+        parts = ["🎯 **Votre parcours d'apprentissage recommandé** :\n\n",
+                 "Suivez ces cours dans l'ordre pour une progression optimale :\n\n"]
         
-        if intermediate:
-            response += "**📈 Niveau Intermédiaire :**\n"
-            for course in intermediate:
-                response += f"  → {course['label']} ({course['code']})\n"
-            response += "\n"
+        # Organiser par niveau (premier chiffre du numéro de cours), en un seul passage
+        buckets = {title: [] for title in LEVEL_TITLES.values()}
+        for course in courses:
+            title = LEVEL_TITLES.get(split_course_code(course.code)[1][:1])
+            if title is not None:
+                buckets[title].append(course)
         
-        if advanced:
-            response += "**🚀 Niveau Avancé :**\n"
-            for course in advanced:
-                response += f"  → {course['label']} ({course['code']})\n"
-            response += "\n"
+        for title, level_courses in buckets.items():
+            if level_courses:
+                parts.append(title)
+                parts.extend(f"  → {course.label} ({course.code})\n" for course in level_courses)
+                parts.append("\n")
         
-        response += "💬 Voulez-vous plus d'infos sur un cours spécifique ?"
+        parts.append("💬 Voulez-vous plus d'infos sur un cours spécifique ?")
         
-        return response
+        return "".join(parts)
     
     def _format_course_info_response(self, info: Optional[Dict]) -> str:
         """Formate la réponse pour les infos détaillées d'un cours"""
         if not info:
             return "❌ Cours non trouvé. Vérifiez le code (ex: IA-401)"
         
-        response = f"📚 **{info['label']}**\n\n"
-        response += f"🔖 **Code :** {info['code']}\n"
-        response += f"🎓 **Crédits :** {info['credits']}\n\n"
+        parts = [f"📚 **{info['label']}**\n\n",
+                 f"🔖 **Code :** {info['code']}\n",
+                 f"🎓 **Crédits :** {info['credits']}\n\n"]
         
         if info.get('description'):
-            response += f"📝 **Description :**\n{info['description']}\n\n"
+            parts.append(f"📝 **Description :**\n{info['description']}\n\n")
         
         if info.get('skills'):
-            response += f"💡 **Compétences enseignées :**\n"
-            for skill in info['skills']:
-                response += f"  • {skill}\n"
-            response += "\n"
-        
-        response += "💬 Voulez-vous connaître les prérequis de ce cours ?"
+            parts.append("💡 **Compétences enseignées :**\n")
+            parts.extend(f"  • {skill}\n" for skill in info['skills'])
+            parts.append("\n")
+        
+        if 'prerequisites' not in info:
+            parts.append("💬 Voulez-vous connaître les prérequis de ce cours ?")
+        elif info['prerequisites']:
+            parts.append("📋 **Prérequis :**\n")
+            parts.extend(f"  → {prereq['label']} ({prereq['code']})\n" for prereq in info['prerequisites'])
+        else:
+            parts.append("🎉 Aucun prérequis : vous pouvez suivre ce cours directement !")
         
-        return response
+        return "".join(parts)
     
-    def _format_all_courses_response(self, courses: List[Dict]) -> str:
+    def _format_all_courses_response(self, courses: List[Course]) -> str:
         """Formate la réponse pour la liste de tous les cours"""
+        return "".join(self._iter_all_courses_response(courses))
+    
+    def _iter_all_courses_response(self, courses: List[Course]) -> Iterator[str]:
+        """Liste de tous les cours, un morceau par domaine"""
         if not courses:
-            return "❌ Aucun cours disponible dans la base de données."
+            yield "❌ Aucun cours disponible dans la base de données."
+            return
         
-        response = f"📚 **Catalogue complet : {len(courses)} cours disponibles**\n\n"
+        yield f"📚 **Catalogue complet : {len(courses)} cours disponibles**\n\n"
         
         # Grouper par domaine (basé sur le code)
         domains = {}
         for course in courses:
-            code_prefix = course['code'].split('-')[0] if '-' in course['code'] else 'AUTRE'
-            if code_prefix not in domains:
-                domains[code_prefix] = []
-            domains[code_prefix].append(course)
+            code_prefix = split_course_code(course.code)[0]
+            domains.setdefault(code_prefix, []).append(course)
         
         for domain, domain_courses in domains.items():
-            domain_names = {
-                'IA': '🤖 Intelligence Artificielle',
-                'WEB': '🌐 Développement Web',
-                'BDD': '💾 Base de Données',
-                'MATH': '📊 Mathématiques',
-                'SEC': '🔒 Sécurité'
-            }
-            
-            response += f"**{domain_names.get(domain, domain)} :**\n"
-            for course in domain_courses:
-                response += f"  • {course['label']} ({course['code']})\n"
-            response += "\n"
-        
-        response += "💬 Dites-moi quel domaine vous intéresse pour des recommandations personnalisées !"
+            parts = [f"**{DOMAIN_NAMES.get(domain, domain)} :**\n"]
+            parts.extend(f"  • {course.label} ({course.code})\n" for course in domain_courses)
+            parts.append("\n")
+            yield "".join(parts)
         
-        return response
+        yield "💬 Dites-moi quel domaine vous intéresse pour des recommandations personnalisées !"
     
     def get_conversation_history(self) -> List[Dict]:
-        """Retourne l'historique de conversation"""
-        return self.history
+        """Retourne une copie de l'historique de conversation (échanges les plus récents)"""
+        return list(self.history)
     
     def clear_history(self):
         """Efface l'historique"""
-        self.history = []
-        self.context = {
-            'last_intent': None,
-            'last_entities': {},
-            'last_courses': [],
-            'user_domain': None,
-            'user_level': None
-        }
+        self.history.clear()
+        self.context = _initial_context()
         print("✅ Historique effacé")
     
     def get_context_summary(self) -> str:
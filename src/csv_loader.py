@@ -0,0 +1,102 @@
+"""
+Lecture des CSV de données (pyarrow si disponible, sinon pandas)
+"""
+import os
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+# Parseur CSV multi-thread d'Arrow, optionnel
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+# Taille des blocs lus par pyarrow (en octets)
+ARROW_BLOCK_SIZE = 1 << 20
+
+
+def _check_exists(path):
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+
+def _arrow_options(columns: Optional[List[str]]):
+    """Options pyarrow : colonnes utiles uniquement, toutes en chaînes"""
+    if not columns:
+        return pacsv.ConvertOptions(strings_can_be_null=True)
+    return pacsv.ConvertOptions(
+        include_columns=columns,
+        include_missing_columns=True,
+        column_types={col: pa.string() for col in columns},
+        strings_can_be_null=True
+    )
+
+
+def load_csv(path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Charge un CSV complet en DataFrame de chaînes
+    
+    Args:
+        path: Chemin du fichier
+        columns: Colonnes à charger (toutes si None ; absentes → vides)
+        
+    Returns:
+        DataFrame, valeurs manquantes remplacées par ""
+    """
+    _check_exists(path)
+    if pacsv is not None:
+        df = pacsv.read_csv(str(path), convert_options=_arrow_options(columns)).to_pandas()
+    else:
+        usecols = (lambda col: col in columns) if columns else None
+        df = pd.read_csv(path, usecols=usecols, dtype=str)
+        for col in columns or []:
+            if col not in df:
+                df[col] = None
+    return df.fillna('')
+
+
+def iter_csv_chunks(path, columns: Optional[List[str]] = None,
+                    chunksize: int = 2000) -> Iterator[pd.DataFrame]:
+    """
+    Lit un CSV par morceaux (mémoire bornée)
+    
+    Avec pyarrow, les morceaux suivent les blocs du lecteur en flux
+    (open_csv) plutôt qu'un nombre exact de lignes.
+    
+    Args:
+        path: Chemin du fichier
+        columns: Colonnes à charger (toutes si None ; absentes → vides)
+        chunksize: Nombre de lignes par morceau (lecteur pandas)
+        
+    Returns:
+        Itérateur de DataFrames de chaînes, valeurs manquantes remplacées par ""
+        
+    Raises:
+        FileNotFoundError: dès l'appel, si le fichier n'existe pas
+    """
+    _check_exists(path)
+    if pacsv is not None:
+        return _iter_arrow_chunks(path, columns)
+    return _iter_pandas_chunks(path, columns, chunksize)
+
+
+def _iter_arrow_chunks(path, columns):
+    reader = pacsv.open_csv(
+        str(path),
+        read_options=pacsv.ReadOptions(block_size=ARROW_BLOCK_SIZE),
+        convert_options=_arrow_options(columns)
+    )
+    for batch in reader:
+        yield batch.to_pandas().fillna('')
+
+
+def _iter_pandas_chunks(path, columns, chunksize):
+    usecols = (lambda col: col in columns) if columns else None
+    for df in pd.read_csv(path, usecols=usecols, dtype=str, chunksize=chunksize):
+        for col in columns or []:
+            if col not in df:
+                df[col] = None
+        yield df.fillna('')
@@ -0,0 +1,124 @@
+"""
+Cache disque des résultats SPARQL, partagé entre les lancements (sqlite3)
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import List, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Emplacement par défaut (surchargeable par COURSEGUIDE_CACHE_DIR)
+DEFAULT_CACHE_DIR = Path(os.getenv('COURSEGUIDE_CACHE_DIR',
+                                   Path.home() / '.cache' / 'courseguideai'))
+
+
+class DiskCache:
+    """
+    Résultats de requêtes SELECT stockés en JSON compressé, avec expiration
+
+    Toute erreur d'accès au fichier désactive le cache pour la session :
+    on retombe alors sur Fuseki sans interrompre l'application.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = 24 * 3600):
+        """
+        Args:
+            path: Fichier sqlite (DEFAULT_CACHE_DIR/sparql.sqlite3 si None)
+            ttl: Durée de validité d'une entrée, en secondes
+        """
+        self.path = Path(path) if path else self.default_path()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=5,
+                                         check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, stored REAL NOT NULL, data BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            self._disable(e)
+
+
+    @staticmethod
+    def default_path() -> Path:
+        """Fichier partagé par tous les processus (CLI, scripts de peuplement...)"""
+        return DEFAULT_CACHE_DIR / 'sparql.sqlite3'
+    
+    
+    @classmethod
+    def clear_shared(cls, path: Optional[Path] = None):
+        """
+        Vide le cache d'un fichier existant, pour un écrivain qui ne s'en sert pas
+        lui-même (le fichier n'est pas créé s'il n'existe pas)
+        """
+        path = Path(path) if path else cls.default_path()
+        if path.exists():
+            cls(path).clear()
+    
+    
+    @staticmethod
+    def key(endpoint: str, normalized_query: str) -> str:
+        """Clé d'une requête déjà normalisée (espaces compactés), propre à son endpoint"""
+        return hashlib.sha1(f"{endpoint}\n{normalized_query}".encode('utf-8')).hexdigest()
+
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Résultats en cache et non expirés, sinon None"""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT stored, data FROM results WHERE key = ?", (key,)
+                ).fetchone()
+            if row is None or time.time() - row[0] >= self.ttl:
+                return None
+            return json.loads(zlib.decompress(row[1]))
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            self._disable(e)
+            return None
+
+
+    def set(self, key: str, results: List[Dict]):
+        """Enregistre des résultats"""
+        if self._conn is None:
+            return
+        data = zlib.compress(json.dumps(results, separators=(',', ':')).encode('utf-8'))
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, stored, data) VALUES (?, ?, ?)",
+                    (key, time.time(), data)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+
+    def clear(self):
+        """Vide le cache (après une écriture dans la base)"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM results")
+                self._conn.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+
+    def _disable(self, error: Exception):
+        logger.warning(f"⚠️  Cache disque désactivé ({self.path}) : {error}")
+        self._conn = None
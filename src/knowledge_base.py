@@ -1,26 +1,197 @@
 """
 Module de gestion de la base de connaissance RDF avec Apache Jena Fuseki
 """
-from SPARQLWrapper import SPARQLWrapper, JSON, POST
-from rdflib import Graph, Namespace, Literal, URIRef
-from rdflib.namespace import RDF, RDFS, XSD
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
-from typing import List, Dict, Optional
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+from typing import Any, Callable, Iterator, List, Dict, Optional, Sequence
+
+from src.disk_cache import DiskCache
+
+# Décodeur JSON en C, optionnel (repli sur le module json standard)
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Forme canonique d'un code de cours (IA-401, SECURITY-301...)
+COURSE_CODE_RE = re.compile(r'[A-Z]{1,10}-\d{1,4}')
+
+
+def normalize_course_code(code: str) -> str:
+    """
+    Met un code de cours sous forme canonique (espaces retirés, majuscules)
+    
+    Une même demande (" ia-401", "IA-401 ") produit ainsi le même texte de
+    requête, donc la même entrée de cache.
+    
+    Raises:
+        ValueError: si le code n'a pas la forme PRÉFIXE-NUMÉRO
+    """
+    canonical = code.strip().upper()
+    if not COURSE_CODE_RE.fullmatch(canonical):
+        raise ValueError(f"Code de cours invalide : {code!r}")
+    return canonical
+
+
+def _course_code_or_none(code: str) -> Optional[str]:
+    """Code canonique, ou None si le code est mal formé (traité comme « cours introuvable »)"""
+    try:
+        return normalize_course_code(code)
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class Course:
+    """Cours aplati depuis une ligne de résultats SPARQL (champs à plat, sans dict imbriqué)"""
+    code: str
+    label: str
+    credits: Optional[int] = None
+    description: Optional[str] = None
+    prerequisites: List[str] = field(default_factory=list)
+    
+    @classmethod
+    def from_binding(cls, binding: Dict, label_key: str = 'nomCours') -> "Course":
+        """Convertit une ligne {'var': {'type', 'value'}} en Course (une seule fois, à la frontière)"""
+        get = binding.get  # une seule résolution d'attribut pour les quatre champs
+        code = get('code')
+        label = get(label_key)
+        credits = get('credits')
+        description = get('description')
+        return cls(
+            code=code['value'] if code is not None else 'N/A',
+            label=label['value'] if label is not None else 'Inconnu',
+            credits=int(credits['value']) if credits is not None else None,
+            description=description['value'] if description is not None else None
+        )
+
+# Namespace de l'ontologie des cours
+ONTOLOGY_NS = "http://www.university.edu/ontology/courses#"
+
+
+# ==================== REQUÊTES ====================
+# Templates compilés une fois au chargement ; les valeurs ($code) sont
+# substituées par execute_bound_query sous forme de littéraux échappés.
+
+ALL_COURSES_QUERY = """
+PREFIX course: <http://www.university.edu/ontology/courses#>
+PREFIX rdfs:   <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT ?cours ?nom ?code ?credits ?duree ?description
+WHERE {
+    ?cours a ?t .
+    ?t rdfs:subClassOf* course:Course .
+
+    OPTIONAL { ?cours course:nomCours ?nom }
+    OPTIONAL { ?cours course:codeCours ?code }
+    OPTIONAL { ?cours course:credits ?credits }
+    OPTIONAL { ?cours course:duree ?duree }
+    OPTIONAL { ?cours course:description ?description }
+}
+ORDER BY ?code
+"""
+
+# Champ demandé → propriété RDF (cf. list_courses) ; ?code est toujours projeté
+COURSE_FIELDS = {
+    'nom': 'course:nomCours',
+    'credits': 'course:credits',
+    'duree': 'course:duree',
+    'description': 'course:description',
+    'difficulte': 'course:difficulte',
+}
+
+COURSE_BY_CODE_QUERY = Template("""
+PREFIX course: <http://www.university.edu/ontology/courses#>
+
+SELECT ?cours ?code ?nom ?credits ?duree ?description ?difficulte
+WHERE {
+    ?cours course:codeCours $code .
+    BIND($code AS ?code)
+    OPTIONAL { ?cours course:nomCours ?nom }
+    OPTIONAL { ?cours course:credits ?credits }
+    OPTIONAL { ?cours course:duree ?duree }
+    OPTIONAL { ?cours course:description ?description }
+    OPTIONAL { ?cours course:difficulte ?difficulte }
+}
+LIMIT 1
+""")
+
+PREREQUISITES_QUERY = Template("""
+PREFIX course: <http://www.university.edu/ontology/courses#>
+
+SELECT ?prerequis ?nomPrerequis ?codePrerequis
+WHERE {
+    ?cours course:codeCours $code .
+    ?cours course:aPrerequis ?prerequis .
+    ?prerequis course:nomCours ?nomPrerequis .
+    ?prerequis course:codeCours ?codePrerequis .
+}
+""")
+
+# Séparateurs des listes agrégées (absents des noms et des codes)
+LIST_SEPARATOR = "\u2016"
+PAIR_SEPARATOR = "\t"
+
+# Compétences et prérequis dans une UNION (les lignes s'additionnent au lieu de se
+# multiplier), puis agrégés par GROUP_CONCAT : une seule ligne par cours
+COURSE_WITH_PREREQS_QUERY = Template("""
+PREFIX course: <http://www.university.edu/ontology/courses#>
+
+SELECT ?nom ?credits ?duree ?description ?difficulte ?domaine
+       (GROUP_CONCAT(DISTINCT ?skillNom; separator="\u2016") AS ?skills)
+       (GROUP_CONCAT(DISTINCT ?prereqEntry; separator="\u2016") AS ?prereqs)
+WHERE {
+    ?cours course:codeCours $code ;
+           a course:Course .
+    OPTIONAL { ?cours course:nomCours ?nom }
+    OPTIONAL { ?cours course:credits ?credits }
+    OPTIONAL { ?cours course:duree ?duree }
+    OPTIONAL { ?cours course:description ?description }
+    OPTIONAL { ?cours course:difficulte ?difficulte }
+    OPTIONAL { ?cours course:appartientADomaine/course:nomDomaine ?domaine }
+    OPTIONAL {
+        { ?cours course:enseigneCompetence/course:nomCompetence ?skillNom }
+        UNION
+        {
+            ?cours course:aPrerequis ?prereq .
+            ?prereq course:nomCours ?prereqNom ;
+                    course:codeCours ?prereqCode .
+            BIND(CONCAT(?prereqCode, "\\t", ?prereqNom) AS ?prereqEntry)
+        }
+    }
+}
+GROUP BY ?cours ?nom ?credits ?duree ?description ?difficulte ?domaine
+""")
+
+
 class KnowledgeBase:
     """
     Classe pour interagir avec la base de connaissance RDF (Fuseki)
     """
     
+    # Requêtes simultanées au plus dans execute_queries (≤ pool_maxsize)
+    QUERY_WORKERS = 8
+    
     def __init__(self, fuseki_url: str = "http://localhost:3030", 
                  dataset_name: str = "university",
                  username: str = "admin",
-                 password: str = "admin123"):
+                 password: str = "admin123",
+                 warm: bool = True,
+                 disk_cache: bool = False):
         """
         Initialise la connexion à Fuseki
         
@@ -29,6 +200,9 @@ class KnowledgeBase:
             dataset_name: Nom du dataset dans Fuseki
             username: Nom d'utilisateur Fuseki
             password: Mot de passe Fuseki
+            warm: Précharger le catalogue dans le cache en arrière-plan
+            disk_cache: Conserver les résultats sur disque entre les lancements
+                        (processus courts comme la CLI ; désactivé par défaut)
         """
         self.fuseki_url = fuseki_url
         self.dataset_name = dataset_name
@@ -36,36 +210,168 @@ class KnowledgeBase:
         # Endpoints SPARQL
         self.query_endpoint = f"{fuseki_url}/{dataset_name}/query"
         self.update_endpoint = f"{fuseki_url}/{dataset_name}/update"
+        self.data_endpoint = f"{fuseki_url}/{dataset_name}/data"
         
-        # Configuration SPARQLWrapper pour les requêtes
-        self.sparql_query = SPARQLWrapper(self.query_endpoint)
-        self.sparql_query.setReturnFormat(JSON)
-        self.sparql_query.setCredentials(username, password)
+        # Session HTTP persistante (keep-alive) partagée par les requêtes et les updates
+        self._session = requests.Session()
+        self._session.auth = (username, password)
+        self._session.headers.update({'Connection': 'keep-alive'})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                              max_retries=Retry(total=3, backoff_factor=0.2))
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
         
-        # Configuration pour les updates
-        self.sparql_update = SPARQLWrapper(self.update_endpoint)
-        self.sparql_update.setMethod(POST)
-        self.sparql_update.setCredentials(username, password)
-            
-        # Namespace de l'ontologie
-        self.ns = Namespace("http://www.university.edu/ontology/courses#")
+        # Templates d'update compilés, indexés par nom
+        self._update_templates: Dict[str, Template] = {}
+        
+        # Cache LRU+TTL des SELECT (requête normalisée → (horodatage, résultats)),
+        # vidé après chaque écriture réussie
+        self._query_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self.query_cache_size = 512
+        self.query_cache_ttl = 60.0
+        
+        # Version des données, incrémentée à chaque vidage du cache (écritures) :
+        # les caches dérivés (ex: recommandations) l'incluent dans leurs clés
+        self.data_version = 0
+        
+        # Second niveau, persistant entre les processus (cf. src/disk_cache.py)
+        self._disk_cache = DiskCache() if disk_cache else None
+        
+        # Threads de préchauffage du cache (cf. warm / wait_warm)
+        self._warm_threads: List[threading.Thread] = []
         
         logger.info(f"✅ KnowledgeBase initialisée : {self.query_endpoint}")
+        
+        if warm:
+            self.warm()
+    
+    
+    @property
+    def ns(self):
+        """Namespace de l'ontologie (rdflib importé seulement à la première utilisation)"""
+        from rdflib import Namespace
+        return Namespace(ONTOLOGY_NS)
+    
+    
+    def warm(self, *loaders: Callable[[], Any]) -> threading.Thread:
+        """
+        Préchauffe le cache des requêtes dans un thread d'arrière-plan
+        
+        Args:
+            loaders: Fonctions à appeler (par défaut : test de connexion et catalogue)
+            
+        Returns:
+            Le thread lancé
+        """
+        loaders = loaders or (self.test_connection, self.get_all_courses)
+        thread = threading.Thread(target=self._run_warm, args=(loaders,),
+                                  name="kb-warm", daemon=True)
+        self._warm_threads.append(thread)
+        thread.start()
+        return thread
+    
+    
+    def _run_warm(self, loaders):
+        for loader in loaders:
+            try:
+                loader()
+            except Exception as e:
+                logger.warning(f"⚠️  Préchauffage du cache interrompu : {e}")
+    
+    
+    def wait_warm(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin des préchauffages lancés
+        
+        Returns:
+            True si tous sont terminés
+        """
+        for thread in list(self._warm_threads):
+            thread.join(timeout)
+        return not any(thread.is_alive() for thread in self._warm_threads)
     
     
-    def execute_query(self, sparql_query: str) -> List[Dict]:
+    def execute_query(self, sparql_query: str, ttl: Optional[float] = None) -> List[Dict]:
         """
-        Exécute une requête SPARQL SELECT
+        Exécute une requête SPARQL SELECT, via le cache LRU côté client
+        
+        Les résultats sont réutilisés pendant `ttl` secondes tant qu'aucune
+        écriture n'a eu lieu via cette instance. Les résultats vides (ou en
+        erreur) ne sont pas mis en cache.
         
         Args:
             sparql_query: La requête SPARQL
+            ttl: Durée de validité en secondes (query_cache_ttl si None, 0 = sans cache)
             
         Returns:
-            Liste de dictionnaires avec les résultats
+            Liste de dictionnaires avec les résultats (lignes partagées, à ne pas modifier)
+        """
+        return list(self._cached_rows(sparql_query, ttl))
+    
+    
+    def execute_query_iter(self, sparql_query: str, ttl: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Comme execute_query, mais parcourt directement les lignes en cache
+        sans en copier la liste (lecture seule, un seul passage)
         """
+        return iter(self._cached_rows(sparql_query, ttl))
+    
+    
+    def _cached_rows(self, sparql_query: str, ttl: Optional[float]) -> List[Dict]:
+        """Résultats d'une requête SELECT, tels que stockés dans le cache (non copiés)"""
+        if ttl is None:
+            ttl = self.query_cache_ttl
+        if ttl <= 0:
+            return self._fetch_query(sparql_query)
+        
+        # Normaliser les espaces pour que les variantes de mise en forme partagent l'entrée
+        key = " ".join(sparql_query.split())
+        now = time.monotonic()
+        
+        with self._cache_lock:
+            entry = self._query_cache.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                self._query_cache.move_to_end(key)
+                self._cache_hits += 1
+                return entry[1]
+            self._cache_misses += 1
+            # Version lue avant la requête : une écriture pendant celle-ci la rend périmée
+            version = self.data_version
+        
+        disk_key = DiskCache.key(self.query_endpoint, key) if self._disk_cache is not None else None
+        results = self._disk_cache.get(disk_key) if disk_key else None
+        from_disk = results is not None
+        if not from_disk:
+            results = self._fetch_query(sparql_query)
+        
+        if results:
+            with self._cache_lock:
+                # Écriture (clear_cache) pendant la requête : résultats rendus sans être gardés.
+                # Sous le verrou, l'écriture disque précède forcément le vidage qui suit.
+                if version != self.data_version:
+                    return results
+                if disk_key and not from_disk:
+                    self._disk_cache.set(disk_key, results)
+                self._query_cache[key] = (now, results)
+                self._query_cache.move_to_end(key)
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return results
+    
+    
+    def _fetch_query(self, sparql_query: str) -> List[Dict]:
+        """Envoie la requête SELECT à Fuseki (sans cache)"""
         try:
-            self.sparql_query.setQuery(sparql_query)
-            results = self.sparql_query.query().convert()
+            response = self._session.post(
+                self.query_endpoint,
+                data={'query': sparql_query},
+                headers={'Accept': 'application/sparql-results+json'}
+            )
+            response.raise_for_status()
+            results = json_loads(response.content)
             
             # Convertir les résultats en format simple
             bindings = results["results"]["bindings"]
@@ -76,6 +382,90 @@ class KnowledgeBase:
             return []
     
     
+    def execute_queries(self, sparql_queries: List[str], stream: bool = False) -> List:
+        """
+        Exécute plusieurs requêtes SELECT en parallèle
+        
+        Les requêtes partagent le pool de connexions de la session : leurs
+        allers-retours se recouvrent au lieu de s'enchaîner.
+        
+        Args:
+            sparql_queries: Les requêtes SPARQL
+            stream: Renvoyer des itérateurs sur les lignes en cache (cf.
+                execute_query_iter) plutôt que des listes
+            
+        Returns:
+            Les résultats de chaque requête, dans le même ordre
+        """
+        run = self.execute_query_iter if stream else self.execute_query
+        
+        if len(sparql_queries) <= 1:
+            return [run(query) for query in sparql_queries]
+        
+        workers = min(len(sparql_queries), self.QUERY_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, sparql_queries))
+    
+    
+    def cached_query(self, sparql_query: str, ttl: float = 60.0) -> List[Dict]:
+        """Exécute une requête SELECT avec une durée de cache explicite (cf. execute_query)"""
+        return self.execute_query(sparql_query, ttl)
+    
+    
+    def execute_bound_query(self, template: Template, **values) -> List[Dict]:
+        """
+        Exécute un template de requête compilé
+        
+        Chaque valeur est échappée en littéral RDF (Literal.n3) : le texte de
+        la requête est stable pour un même code, donc servi par le cache.
+        
+        Args:
+            template: Requête avec des variables $nom
+            values: Valeurs brutes des variables
+            
+        Returns:
+            Liste de dictionnaires avec les résultats
+        """
+        from rdflib import Literal  # Import différé : coûteux au démarrage de la CLI
+        
+        bindings = {name: Literal(value).n3() for name, value in values.items()}
+        return self.execute_query(template.substitute(bindings))
+    
+    
+    def clear_cache(self):
+        """Vide le cache des requêtes SELECT (mémoire et disque)"""
+        with self._cache_lock:
+            self._query_cache.clear()
+            self.data_version += 1
+        if self._disk_cache is not None:
+            self._disk_cache.clear()
+    
+    
+    def _invalidate_after_write(self):
+        """Après une écriture réussie : caches de cette instance et cache disque partagé"""
+        self.clear_cache()
+        if self._disk_cache is None:
+            # D'autres processus (CLI) lisent peut-être le cache disque partagé
+            DiskCache.clear_shared()
+    
+    
+    def cache_stats(self) -> Dict:
+        """
+        Statistiques du cache des requêtes
+        
+        Returns:
+            Dictionnaire avec hits, misses, size, maxsize et ttl
+        """
+        with self._cache_lock:
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'size': len(self._query_cache),
+                'maxsize': self.query_cache_size,
+                'ttl': self.query_cache_ttl
+            }
+    
+    
     def execute_update(self, sparql_update: str) -> bool:
         """
         Exécute une requête SPARQL UPDATE (INSERT, DELETE)
@@ -87,8 +477,12 @@ class KnowledgeBase:
             True si succès, False sinon
         """
         try:
-            self.sparql_update.setQuery(sparql_update)
-            self.sparql_update.query()
+            response = self._session.post(
+                self.update_endpoint,
+                data={'update': sparql_update}
+            )
+            response.raise_for_status()
+            self._invalidate_after_write()
             return True
             
         except Exception as e:
@@ -96,6 +490,74 @@ class KnowledgeBase:
             return False
     
     
+    def upload_rdf(self, data: str, content_type: str = "text/turtle",
+                   graph_uri: Optional[str] = None) -> bool:
+        """
+        Charge un document RDF en une seule transaction (Graph Store Protocol)
+        
+        Les triplets sont ajoutés au graphe existant (POST), sans passer par
+        le parseur SPARQL UPDATE.
+        
+        Args:
+            data: Document RDF complet (Turtle, N-Triples...)
+            content_type: Type MIME du document
+            graph_uri: Graphe nommé cible (graphe par défaut si None)
+            
+        Returns:
+            True si succès, False sinon
+        """
+        params = {'graph': graph_uri} if graph_uri else {'default': ''}
+        try:
+            response = self._session.post(
+                self.data_endpoint,
+                params=params,
+                data=data.encode('utf-8'),
+                headers={'Content-Type': f'{content_type}; charset=utf-8'}
+            )
+            response.raise_for_status()
+            self._invalidate_after_write()
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur lors du chargement RDF ({content_type}) : {e}")
+            return False
+    
+    
+    def upload_turtle(self, turtle: str, graph_uri: Optional[str] = None) -> bool:
+        """Charge un document Turtle (cf. upload_rdf)"""
+        return self.upload_rdf(turtle, "text/turtle", graph_uri)
+    
+    
+    def execute_update_template(self, template_name: str, bindings: Dict[str, str],
+                                template: Optional[str] = None) -> bool:
+        """
+        Exécute un update à partir d'un template nommé (variables $nom)
+        
+        Le template est compilé une seule fois puis réutilisé : seules les
+        valeurs sont substituées à chaque appel.
+        
+        Args:
+            template_name: Nom du template dans le cache
+            bindings: Valeurs des variables, déjà au format SPARQL (<uri>, "littéral")
+            template: Texte du template (requis au premier appel)
+            
+        Returns:
+            True si succès, False sinon
+        """
+        compiled = self._update_templates.get(template_name)
+        if compiled is None:
+            if template is None:
+                logger.error(f"❌ Template d'update inconnu : {template_name}")
+                return False
+            compiled = self._update_templates[template_name] = Template(template)
+        
+        try:
+            return self.execute_update(compiled.substitute(bindings))
+        except (KeyError, ValueError) as e:
+            logger.error(f"❌ Variable manquante pour le template {template_name} : {e}")
+            return False
+    
+    
     def get_all_courses(self) -> List[Dict]:
         """
         Récupère tous les cours de la base
@@ -103,23 +565,40 @@ class KnowledgeBase:
         Returns:
             Liste de tous les cours
         """
-        query = """
-        PREFIX course: <http://www.university.edu/ontology/courses#>
-        PREFIX rdfs:   <http://www.w3.org/2000/01/rdf-schema#>
-
-        SELECT ?cours ?nom ?code ?credits ?duree ?description
-        WHERE {
-            ?cours a ?t .
-            ?t rdfs:subClassOf* course:Course .
-
-            OPTIONAL { ?cours course:nomCours ?nom }
-            OPTIONAL { ?cours course:codeCours ?code }
-            OPTIONAL { ?cours course:credits ?credits }
-            OPTIONAL { ?cours course:duree ?duree }
-            OPTIONAL { ?cours course:description ?description }
-        }
-        ORDER BY ?code
+        return self.execute_query(ALL_COURSES_QUERY)
+    
+    
+    def list_courses(self, fields: Sequence[str] = ('code', 'nom')) -> List[Dict]:
+        """
+        Liste les cours en ne projetant que les colonnes demandées
+        
+        Les cours sans code sont écartés côté serveur (motif obligatoire).
+        
+        Args:
+            fields: Colonnes voulues parmi 'code' et COURSE_FIELDS
+            
+        Returns:
+            Liste des cours triés par code
         """
+        extra = [name for name in fields if name != 'code']
+        unknown = [name for name in extra if name not in COURSE_FIELDS]
+        if unknown:
+            raise ValueError(f"Champs de cours inconnus : {unknown}")
+        
+        optionals = "\n".join(
+            f"    OPTIONAL {{ ?cours {COURSE_FIELDS[name]} ?{name} }}" for name in extra
+        )
+        query = f"""
+PREFIX course: <http://www.university.edu/ontology/courses#>
+
+SELECT DISTINCT ?code {" ".join("?" + name for name in extra)}
+WHERE {{
+    ?cours a course:Course ;
+           course:codeCours ?code .
+{optionals}
+}}
+ORDER BY ?code
+"""
         return self.execute_query(query)
     
     
@@ -131,24 +610,12 @@ class KnowledgeBase:
             code_cours: Code du cours (ex: "IA-401")
             
         Returns:
-            Dictionnaire avec les infos du cours ou None
+            Dictionnaire avec les infos du cours ou None (aussi pour un code mal formé)
         """
-        query = f"""
-        PREFIX course: <http://www.university.edu/ontology/courses#>
-        
-        SELECT ?cours ?code ?nom ?credits ?duree ?description ?difficulte
-        WHERE {{
-            ?cours course:codeCours "{code_cours}" .
-            BIND("{code_cours}" AS ?code)
-            OPTIONAL {{ ?cours course:nomCours ?nom }}
-            OPTIONAL {{ ?cours course:credits ?credits }}
-            OPTIONAL {{ ?cours course:duree ?duree }}
-            OPTIONAL {{ ?cours course:description ?description }}
-            OPTIONAL {{ ?cours course:difficulte ?difficulte }}
-        }}
-        LIMIT 1
-        """
-        results = self.execute_query(query)
+        code_cours = _course_code_or_none(code_cours)
+        if code_cours is None:
+            return None
+        results = self.execute_bound_query(COURSE_BY_CODE_QUERY, code=code_cours)
         return results[0] if results else None
     
     
@@ -160,18 +627,78 @@ class KnowledgeBase:
             code_cours: Code du cours
             
         Returns:
-            Liste des cours prérequis
+            Liste des cours prérequis (vide pour un code mal formé)
         """
-        query = f"""
+        code_cours = _course_code_or_none(code_cours)
+        if code_cours is None:
+            return []
+        return self.execute_bound_query(PREREQUISITES_QUERY, code=code_cours)
+    
+    
+    def get_course_with_prereqs(self, code_cours: str) -> Optional[Dict]:
+        """
+        Récupère un cours, ses compétences et ses prérequis en une seule requête
+        
+        Args:
+            code_cours: Code du cours (ex: "IA-401", casse et espaces indifférents)
+            
+        Returns:
+            {'course': {...}, 'prerequisites': [{'code', 'nom'}, ...]} ou None
+        """
+        code_cours = _course_code_or_none(code_cours)
+        if code_cours is None:
+            return None
+        results = self.execute_bound_query(COURSE_WITH_PREREQS_QUERY, code=code_cours)
+        if not results:
+            return None
+        
+        def value(row, key):
+            return row[key]['value'] if key in row else None
+        
+        first = results[0]
+        course = {'code': code_cours, 'skills': []}
+        for key in ('nom', 'credits', 'duree', 'description', 'difficulte', 'domaine'):
+            course[key] = value(first, key)
+        
+        def items(row, key):
+            joined = value(row, key)
+            return joined.split(LIST_SEPARATOR) if joined else []
+        
+        # Une ligne par cours ; plusieurs seulement si un champ simple a plusieurs valeurs
+        prerequisites = []
+        seen = set()
+        seen_skills = set()
+        for row in results:
+            for skill in items(row, 'skills'):
+                if skill not in seen_skills:
+                    seen_skills.add(skill)
+                    course['skills'].append(skill)
+            for entry in items(row, 'prereqs'):
+                prereq_code, _, prereq_nom = entry.partition(PAIR_SEPARATOR)
+                if prereq_code not in seen:
+                    seen.add(prereq_code)
+                    prerequisites.append({'code': prereq_code, 'nom': prereq_nom})
+        
+        return {'course': course, 'prerequisites': prerequisites}
+    
+    
+    def get_all_prerequisite_relations(self) -> List[Dict]:
+        """
+        Récupère toutes les relations de prérequis en une seule requête
+        
+        Returns:
+            Liste des couples (codeCours, codePrerequis)
+        """
+        query = """
         PREFIX course: <http://www.university.edu/ontology/courses#>
         
-        SELECT ?prerequis ?nomPrerequis ?codePrerequis
-        WHERE {{
-            ?cours course:codeCours "{code_cours}" .
+        SELECT ?codeCours ?codePrerequis
+        WHERE {
             ?cours course:aPrerequis ?prerequis .
-            ?prerequis course:nomCours ?nomPrerequis .
+            ?cours course:codeCours ?codeCours .
             ?prerequis course:codeCours ?codePrerequis .
-        }}
+        }
+        ORDER BY ?codeCours
         """
         return self.execute_query(query)
     
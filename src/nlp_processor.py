@@ -1,17 +1,113 @@
-import spacy
 import re
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from functools import cached_property, lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Any, Optional, Tuple
+
+# Automate d'Aho-Corasick en C, optionnel (repli sur une expression régulière)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Nombre de messages dont l'analyse est conservée
+ANALYSIS_CACHE_SIZE = 1024
+
+# Code de cours : 2-4 lettres, tiret facultatif, 3 chiffres (IA-401 ou IA401)
+_COURSE_CODE_RE = re.compile(r'\b([A-Z]{2,4})-?(\d{3})\b')
+
+
+def compile_alternation(words: Iterable[str], word_end: bool = True) -> re.Pattern:
+    """
+    Alternance précompilée de mots entiers, la plus longue d'abord
+    (« développement web » l'emporte sur « web »)
+    
+    Args:
+        words: Mots ou expressions à reconnaître
+        word_end: Exiger aussi une fin de mot (sinon seul le début est ancré,
+            ce qui accepte les formes fléchies comme « débutants »)
+    """
+    return re.compile(r'\b(' + _alternation(words) + r')' + (r'\b' if word_end else ''))
+
+
+def _alternation(words: Iterable[str]) -> str:
+    """Mots échappés, du plus long au plus court, séparés par |"""
+    return "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+
+
+def _is_word_char(char: str) -> bool:
+    """Même définition que \\w des expressions régulières (Unicode)"""
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """
+    Trouve en un seul passage tous les mots-clés présents (en sous-chaîne) dans un texte
+    
+    Avec pyahocorasick, un automate d'Aho-Corasick renvoie toutes les
+    occurrences, chevauchantes comprises. Sinon, une alternance précompilée
+    dans une anticipation (?=...) retient à chaque position le plus long
+    mot-clé qui y commence ; les mots-clés qu'il contient (ex: 'trouve'
+    dans 'trouver') sont ajoutés via une table de fermeture. Dans les deux
+    cas, le résultat est exactement {kw for kw in keywords if kw in text}.
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        keywords = sorted(set(keywords), key=len, reverse=True)
+        self.keywords = frozenset(keywords)
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._regex = re.compile(
+                "(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))"
+            )
+            self._closure = {
+                kw: frozenset(other for other in keywords if other in kw)
+                for kw in keywords
+            }
+    
+    def find(self, text: str) -> FrozenSet[str]:
+        """Mots-clés présents dans le texte (comparaison sensible à la casse)"""
+        if not self.keywords:
+            return frozenset()
+        if self._automaton is not None:
+            return frozenset(keyword for _, keyword in self._automaton.iter(text))
+        
+        found = set()
+        for match in self._regex.finditer(text):
+            found |= self._closure[match.group(1)]
+        return frozenset(found)
+
 
 class NLPProcessor:
+    """
+    Détection d'intention et extraction d'entités par mots-clés
+    
+    Aucune méthode d'extraction n'utilise spaCy. Le modèle exposé par
+    `nlp` est le petit fr_core_news_sm, sans analyseur syntaxique ni
+    entités nommées, et n'est chargé qu'au premier accès. Sans modèle
+    installé, on se contente du tokenizer français de base (spacy.blank).
+    """
+    
+    # Modèle spaCy et composants inutiles ici (non chargés)
+    SPACY_MODEL = "fr_core_news_sm"
+    SPACY_EXCLUDE = ("parser", "ner", "tagger", "attribute_ruler", "lemmatizer")
+    
+    # Mots-clés de compétences courantes (ordre = ordre du résultat)
+    skill_keywords = (
+        'python', 'java', 'javascript', 'c++', 'sql',
+        'deep learning', 'neural networks', 'nlp',
+        'algorithme', 'structure de données', 'optimisation',
+        'base de données', 'réseau', 'sécurité'
+    )
+    
     def __init__(self):
-        """Initialise le modèle spaCy français"""
-        try:
-            self.nlp = spacy.load("fr_core_news_md")
-            print("✅ Modèle spaCy chargé avec succès")
-        except OSError:
-            print("❌ Erreur: Modèle spaCy non trouvé. Exécutez: python -m spacy download fr_core_news_md")
-            raise
-        
+        """Initialise les dictionnaires de mots-clés (spaCy est chargé à la demande)"""
         # Dictionnaires de mots-clés pour la détection d'intention
         self.intent_keywords = {
             'recherche_cours': [
@@ -39,6 +135,15 @@ class NLPProcessor:
             ]
         }
         
+        # Index inversé mot-clé → intentions ('apprendre', 'commencer' en ont deux)
+        self._keyword_intents: Dict[str, tuple] = {}
+        for intent, keywords in self.intent_keywords.items():
+            for keyword in keywords:
+                self._keyword_intents[keyword] = self._keyword_intents.get(keyword, ()) + (intent,)
+        
+        # Tous les mots-clés d'intention, cherchés en un seul passage
+        self._intent_matcher = KeywordMatcher(self._keyword_intents)
+        
         # Domaines connus
         self.domaines = [
             'intelligence artificielle', 'ia', 'ai',
@@ -49,136 +154,157 @@ class NLPProcessor:
             'sécurité', 'cybersécurité', 'security'
         ]
         
+        # Normalisation des domaines (mot-clé → nom affiché)
+        self.domain_names = {
+            **dict.fromkeys(['ia', 'ai', 'intelligence artificielle'], 'Intelligence Artificielle'),
+            **dict.fromkeys(['web', 'développement web', 'dev web'], 'Web'),
+            **dict.fromkeys(['machine learning', 'apprentissage automatique'], 'Machine Learning'),
+            **dict.fromkeys(['base de données', 'bdd', 'database'], 'Base de Données'),
+            **dict.fromkeys(['réseau', 'réseaux', 'network'], 'Réseaux'),
+            **dict.fromkeys(['sécurité', 'cybersécurité', 'security'], 'Sécurité'),
+        }
+        self._domain_re = compile_alternation(self.domaines)
+        
+        self._skill_matcher = KeywordMatcher(self.skill_keywords)
+        
         # Niveaux
         self.niveaux = ['débutant', 'intermédiaire', 'avancé', 'expert']
+        self._level_re = compile_alternation(self.niveaux, word_end=False)
+        
+        # Domaines, niveaux et compétences dans un seul automate (si pyahocorasick)
+        self._entity_automaton = self._build_entity_automaton()
+        
+        # Sinon, domaines et niveaux en un seul balayage (groupes nommés) ;
+        # mêmes règles d'ancrage que _domain_re et _level_re
+        self._domain_level_re = re.compile(
+            r'\b(?:(?P<domain>' + _alternation(self.domaines) + r')\b'
+            r'|(?P<level>' + _alternation(self.niveaux) + r'))'
+        )
+        
+        # Analyses déjà faites (messages répétés : relances, boutons d'exemple)
+        self._analyze = lru_cache(maxsize=ANALYSIS_CACHE_SIZE)(self._analyze_message)
     
-    def extract_intent(self, text: str) -> str:
+    @cached_property
+    def nlp(self):
+        """Pipeline spaCy français allégé, chargé au premier accès seulement"""
+        import spacy
+        
+        try:
+            nlp = spacy.load(self.SPACY_MODEL, exclude=list(self.SPACY_EXCLUDE))
+            print("✅ Modèle spaCy chargé avec succès")
+        except OSError:
+            print(f"⚠️  Modèle spaCy {self.SPACY_MODEL} non trouvé, tokenizer de base utilisé "
+                  f"(python -m spacy download {self.SPACY_MODEL})")
+            nlp = spacy.blank("fr")
+        return nlp
+    
+    def extract_intent(self, text: str, text_lower: Optional[str] = None) -> str:
         """
         Extrait l'intention principale du message utilisateur
         
         Args:
             text: Message de l'utilisateur
+            text_lower: Le même message déjà en minuscules (calculé si absent)
             
         Returns:
             Intention détectée (str)
         """
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         
-        # Calculer les scores pour chaque intention
-        intent_scores = {}
-        for intent, keywords in self.intent_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                intent_scores[intent] = score
+        # Mots-clés présents, en un seul passage sur le texte
+        found = self._intent_matcher.find(text_lower)
+        
+        # Calculer les scores pour chaque intention (ordre de déclaration conservé
+        # pour départager les ex aequo)
+        intent_scores = Counter(dict.fromkeys(self.intent_keywords, 0))
+        for keyword in found:
+            intent_scores.update(self._keyword_intents[keyword])
         
         # Retourner l'intention avec le score le plus élevé
-        if intent_scores:
-            return max(intent_scores, key=intent_scores.get)
+        best, score = intent_scores.most_common(1)[0]
+        if score > 0:
+            return best
         
         # Intention par défaut
         return 'recherche_cours'
     
-    def extract_course_code(self, text: str) -> Optional[str]:
+    def extract_course_code(self, text: str, text_upper: Optional[str] = None) -> Optional[str]:
         """
         Extrait le code de cours (ex: IA-401, WEB-301)
         
         Args:
             text: Message de l'utilisateur
+            text_upper: Le même message déjà en majuscules (calculé si absent)
             
         Returns:
             Code du cours ou None
         """
-        # Pattern: 2-4 lettres majuscules, tiret, 3 chiffres
-        pattern = r'\b([A-Z]{2,4}-\d{3})\b'
-        match = re.search(pattern, text.upper())
+        if text_upper is None:
+            text_upper = text.upper()
         
-        if match:
-            return match.group(1)
-        
-        # Chercher aussi sans tiret (ex: IA401 -> IA-401)
-        pattern_no_dash = r'\b([A-Z]{2,4})(\d{3})\b'
-        match = re.search(pattern_no_dash, text.upper())
+        # Avec ou sans tiret (ex: IA401 -> IA-401), en un seul passage
+        match = _COURSE_CODE_RE.search(text_upper)
         
         if match:
             return f"{match.group(1)}-{match.group(2)}"
         
         return None
     
-    def extract_domain(self, text: str) -> Optional[str]:
+    def extract_domain(self, text: str, text_lower: Optional[str] = None) -> Optional[str]:
         """
         Extrait le domaine d'étude mentionné
         
         Args:
             text: Message de l'utilisateur
+            text_lower: Le même message déjà en minuscules (calculé si absent)
             
         Returns:
             Domaine ou None
         """
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         
-        for domaine in self.domaines:
-            if domaine in text_lower:
-                # Normaliser le domaine
-                if domaine in ['ia', 'ai', 'intelligence artificielle']:
-                    return 'Intelligence Artificielle'
-                elif domaine in ['web', 'développement web', 'dev web']:
-                    return 'Web'
-                elif domaine in ['machine learning', 'apprentissage automatique']:
-                    return 'Machine Learning'
-                elif domaine in ['base de données', 'bdd', 'database']:
-                    return 'Base de Données'
-                elif domaine in ['réseau', 'réseaux', 'network']:
-                    return 'Réseaux'
-                elif domaine in ['sécurité', 'cybersécurité', 'security']:
-                    return 'Sécurité'
+        # Premier domaine cité (mot entier : « ai » ne correspond plus dans « mais »)
+        match = self._domain_re.search(text_lower)
         
-        return None
+        return self.domain_names[match.group(1)] if match else None
     
-    def extract_level(self, text: str) -> Optional[str]:
+    def extract_level(self, text: str, text_lower: Optional[str] = None) -> Optional[str]:
         """
         Extrait le niveau mentionné
         
         Args:
             text: Message de l'utilisateur
+            text_lower: Le même message déjà en minuscules (calculé si absent)
             
         Returns:
             Niveau ou None
         """
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         
-        for niveau in self.niveaux:
-            if niveau in text_lower:
-                return niveau.capitalize()
+        match = self._level_re.search(text_lower)
         
-        return None
+        return match.group(1).capitalize() if match else None
     
-    def extract_skills(self, text: str) -> List[str]:
+    def extract_skills(self, text: str, text_lower: Optional[str] = None) -> List[str]:
         """
         Extrait les compétences mentionnées
         
         Args:
             text: Message de l'utilisateur
+            text_lower: Le même message déjà en minuscules (calculé si absent)
             
         Returns:
             Liste des compétences
         """
-        doc = self.nlp(text)
-        skills = []
-        
-        # Mots-clés de compétences courantes
-        skill_keywords = [
-            'python', 'java', 'javascript', 'c++', 'sql',
-            'deep learning', 'neural networks', 'nlp',
-            'algorithme', 'structure de données', 'optimisation',
-            'base de données', 'réseau', 'sécurité'
-        ]
+        if text_lower is None:
+            text_lower = text.lower()
         
-        text_lower = text.lower()
-        for skill in skill_keywords:
-            if skill in text_lower:
-                skills.append(skill.capitalize())
+        found = self._skill_matcher.find(text_lower)
         
-        return skills
+        return [skill.capitalize() for skill in self.skill_keywords if skill in found]
     
     def process_message(self, text: str) -> Dict[str, Any]:
         """
@@ -190,19 +316,108 @@ class NLPProcessor:
         Returns:
             Dictionnaire avec intention et entités extraites
         """
+        intent, course_code, domain, level, skills = self._analyze(text)
+        
+        # Dictionnaire neuf à chaque appel : l'appelant peut le modifier sans toucher au cache
         result = {
             'text': text,
-            'intent': self.extract_intent(text),
+            'intent': intent,
             'entities': {
-                'course_code': self.extract_course_code(text),
-                'domain': self.extract_domain(text),
-                'level': self.extract_level(text),
-                'skills': self.extract_skills(text)
+                'course_code': course_code,
+                'domain': domain,
+                'level': level,
+                'skills': list(skills)
             }
         }
         
         return result
     
+    def _analyze_message(self, text: str) -> Tuple:
+        """Intention et entités d'un message, sous forme immuable (mise en cache)"""
+        # Casse normalisée une seule fois pour tous les extracteurs
+        text_lower = text.lower()
+        
+        if self._entity_automaton is not None:
+            domain, level, skills = self._scan_entities(text_lower)
+        else:
+            domain, level = self._scan_domain_level(text_lower)
+            skills = self.extract_skills(text, text_lower)
+        
+        return (
+            self.extract_intent(text, text_lower),
+            self.extract_course_code(text, text.upper()),
+            domain,
+            level,
+            tuple(skills),
+        )
+    
+    def _scan_domain_level(self, text_lower: str) -> Tuple[Optional[str], Optional[str]]:
+        """Premier domaine et premier niveau cités, en un seul balayage"""
+        domain = level = None
+        
+        for match in self._domain_level_re.finditer(text_lower):
+            if match.lastgroup == 'domain':
+                domain = domain or self.domain_names[match.group('domain')]
+            else:
+                level = level or match.group('level').capitalize()
+            if domain and level:
+                break
+        
+        return domain, level
+    
+    def _build_entity_automaton(self):
+        """Automate mot-clé → (mot-clé, types) ; None sans pyahocorasick"""
+        if ahocorasick is None:
+            return None
+        
+        # Un même mot-clé peut être domaine et compétence (ex: 'sécurité')
+        kinds: Dict[str, tuple] = {}
+        for kind, keywords in (('domain', self.domaines),
+                               ('level', self.niveaux),
+                               ('skill', self.skill_keywords)):
+            for keyword in keywords:
+                kinds[keyword] = kinds.get(keyword, ()) + (kind,)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, keyword_kinds in kinds.items():
+            automaton.add_word(keyword, (keyword, keyword_kinds))
+        automaton.make_automaton()
+        return automaton
+    
+    def _scan_entities(self, text_lower: str) -> Tuple[Optional[str], Optional[str], List[str]]:
+        """
+        Domaine, niveau et compétences en un seul passage de l'automate
+        
+        Mêmes résultats que extract_domain, extract_level et extract_skills :
+        domaine = premier mot entier (le plus long à position égale), niveau =
+        premier mot ancré en début de mot, compétences = toutes les sous-chaînes.
+        """
+        domain = level = None  # (position, -longueur, mot-clé) du meilleur candidat
+        skills = set()
+        
+        for end, (keyword, kinds) in self._entity_automaton.iter(text_lower):
+            start = end - len(keyword) + 1
+            word_start = start == 0 or not _is_word_char(text_lower[start - 1])
+            
+            for kind in kinds:
+                if kind == 'skill':
+                    skills.add(keyword)
+                    continue
+                if not word_start:
+                    continue
+                
+                candidate = (start, -len(keyword), keyword)
+                if kind == 'level':
+                    level = min(level, candidate) if level else candidate
+                elif end + 1 == len(text_lower) or not _is_word_char(text_lower[end + 1]):
+                    domain = min(domain, candidate) if domain else candidate
+        
+        return (
+            self.domain_names[domain[2]] if domain else None,
+            level[2].capitalize() if level else None,
+            [skill.capitalize() for skill in self.skill_keywords if skill in skills],
+        )
+    
     def intent_to_sparql_type(self, intent: str) -> str:
         """
         Mappe une intention vers un type de requête SPARQL
@@ -3,9 +3,9 @@ Moniteur de performance pour le système de recommandation
 """
 
 import logging
+import threading
 import time
-from typing import Dict, List
-from datetime import datetime
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +15,25 @@ class PerformanceMonitor:
     Moniteur de performance pour tracer les métriques système
     """
     
+    # Compteurs en attributs à emplacement fixe (pas de dictionnaire par accès)
+    __slots__ = ('_lock', 'total_queries', 'cache_hits', 'cache_misses',
+                 'total_query_time_ns', 'recommendations_generated', 'start_time')
+    
     def __init__(self):
         """Initialise le moniteur"""
-        self.metrics = {
-            'total_queries': 0,
-            'cache_hits': 0,
-            'cache_misses': 0,
-            'total_query_time': 0.0,
-            'recommendations_generated': 0,
-            'start_time': datetime.now()
-        }
+        # Les compteurs sont incrémentés depuis plusieurs requêtes concurrentes
+        self._lock = threading.Lock()
+        self.total_queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.total_query_time_ns = 0
+        self.recommendations_generated = 0
+        self.start_time = time.perf_counter()
+    
+    
+    def start(self):
+        """Démarre la mesure (l'uptime part de cet instant)"""
+        self.start_time = time.perf_counter()
         logger.info("📊 PerformanceMonitor initialisé")
     
     
@@ -33,21 +42,38 @@ class PerformanceMonitor:
         Enregistre une requête
         
         Args:
-            query_time: Temps d'exécution
+            query_time: Temps d'exécution (secondes)
             from_cache: Si résultat du cache
         """
-        self.metrics['total_queries'] += 1
-        self.metrics['total_query_time'] += query_time
+        query_time_ns = int(query_time * 1e9)
         
-        if from_cache:
-            self.metrics['cache_hits'] += 1
-        else:
-            self.metrics['cache_misses'] += 1
+        with self._lock:
+            self.total_queries += 1
+            self.total_query_time_ns += query_time_ns
+            
+            if from_cache:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
     
     
     def record_recommendation(self):
         """Enregistre une recommandation générée"""
-        self.metrics['recommendations_generated'] += 1
+        with self._lock:
+            self.recommendations_generated += 1
+    
+    
+    def to_dict(self) -> Dict:
+        """Instantané cohérent des compteurs bruts"""
+        with self._lock:
+            return {
+                'total_queries': self.total_queries,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'total_query_time_ns': self.total_query_time_ns,
+                'recommendations_generated': self.recommendations_generated,
+                'start_time': self.start_time
+            }
     
     
     def get_report(self) -> Dict:
@@ -57,25 +83,28 @@ class PerformanceMonitor:
         Returns:
             Rapport avec toutes les métriques
         """
-        uptime = (datetime.now() - self.metrics['start_time']).total_seconds()
+        # Calculs faits hors du verrou, sur un instantané
+        metrics = self.to_dict()
+        
+        uptime = time.perf_counter() - metrics['start_time']
         
         cache_hit_rate = 0
-        if self.metrics['total_queries'] > 0:
-            cache_hit_rate = (self.metrics['cache_hits'] / 
-                            self.metrics['total_queries'] * 100)
+        if metrics['total_queries'] > 0:
+            cache_hit_rate = (metrics['cache_hits'] / 
+                            metrics['total_queries'] * 100)
         
         avg_query_time = 0
-        if self.metrics['total_queries'] > 0:
-            avg_query_time = (self.metrics['total_query_time'] / 
-                            self.metrics['total_queries'])
+        if metrics['total_queries'] > 0:
+            avg_query_time = (metrics['total_query_time_ns'] / 1e9 /
+                            metrics['total_queries'])
         
         return {
             'uptime_seconds': uptime,
-            'total_queries': self.metrics['total_queries'],
+            'total_queries': metrics['total_queries'],
             'cache_hit_rate': f"{cache_hit_rate:.1f}%",
             'avg_query_time': f"{avg_query_time:.3f}s",
-            'recommendations_generated': self.metrics['recommendations_generated'],
-            'queries_per_second': self.metrics['total_queries'] / uptime if uptime > 0 else 0
+            'recommendations_generated': metrics['recommendations_generated'],
+            'queries_per_second': metrics['total_queries'] / uptime if uptime > 0 else 0
         }
     
     
@@ -95,10 +124,18 @@ class PerformanceMonitor:
         print("="*60)
 
 
-# Instance globale
-_monitor = PerformanceMonitor()
+# Instance globale, créée au premier appel de get_monitor (import sans effet de bord)
+_monitor: Optional[PerformanceMonitor] = None
+_monitor_lock = threading.Lock()
 
 
 def get_monitor() -> PerformanceMonitor:
     """Retourne l'instance globale du moniteur"""
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                monitor = PerformanceMonitor()
+                monitor.start()
+                _monitor = monitor
     return _monitor
\ No newline at end of file
@@ -3,8 +3,13 @@ Agent de recommandation intelligent
 Génère des recommandations personnalisées basées sur le profil étudiant
 """
 
+from collections import OrderedDict
 from typing import List, Dict, Optional, Set
 import logging
+import threading
+import time
+
+import numpy as np
 
 # Import avec gestion des erreurs
 try:
@@ -22,6 +27,9 @@ class RecommendationAgent:
     Agent IA pour générer des recommandations de cours personnalisées
     """
     
+    # Nombre de profils dont les recommandations sont conservées
+    RECOMMENDATION_CACHE_SIZE = 128
+    
     def __init__(self, kb: KnowledgeBase):
         """
         Initialise l'agent avec une connexion KB
@@ -31,6 +39,10 @@ class RecommendationAgent:
         """
         self.kb = kb
         self.reasoner = SPARQLReasoner(kb)
+        
+        # Cache LRU (étudiant, version des données, max_results) → (horodatage, recommandations)
+        self._rec_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._rec_lock = threading.Lock()
         logger.info("✅ RecommendationAgent initialisé")
     
     
@@ -49,6 +61,15 @@ class RecommendationAgent:
         Returns:
             Liste de cours recommandés avec score
         """
+        # Même profil, données inchangées (et cache SPARQL encore valide) : résultat réutilisé
+        cache_key = (student_id, self.kb.data_version, max_results)
+        with self._rec_lock:
+            entry = self._rec_cache.get(cache_key)
+            if entry is not None and time.monotonic() - entry[0] < self.kb.query_cache_ttl:
+                self._rec_cache.move_to_end(cache_key)
+                logger.info(f"📦 Recommandations en cache pour {student_id}")
+                return [dict(rec) for rec in entry[1]]
+        
         logger.info(f"🔍 Génération de recommandations pour {student_id}")
         
         # 1. Récupérer le profil de l'étudiant
@@ -75,119 +96,158 @@ class RecommendationAgent:
         }}
         """
         
-        profile = self.kb.execute_query(profile_query)
+        # 2. Cours candidats : non suivis, prérequis (transitifs) tous validés,
+        #    avec le domaine d'intérêt éventuel — jointure faite par Fuseki
+        candidates_query = f"""
+        PREFIX course: <http://www.university.edu/ontology/courses#>
+        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+        
+        SELECT ?cours ?nom ?code ?credits ?description ?interestLabel
+        WHERE {{
+            ?cours a ?t .
+            ?t rdfs:subClassOf* course:Course .
+            ?cours course:codeCours ?code .
+            
+            FILTER NOT EXISTS {{ <{student_id}> course:aSuivi ?cours }}
+            FILTER NOT EXISTS {{
+                ?cours course:aPrerequis+ ?prereq .
+                FILTER NOT EXISTS {{ <{student_id}> course:aSuivi ?prereq }}
+            }}
+            
+            OPTIONAL {{ ?cours course:nomCours ?nom }}
+            OPTIONAL {{ ?cours course:credits ?credits }}
+            OPTIONAL {{ ?cours course:description ?description }}
+            OPTIONAL {{
+                ?cours course:appartientADomaine ?interest .
+                <{student_id}> course:aInteretPour ?interest .
+                ?interest rdfs:label ?interestLabel .
+            }}
+        }}
+        ORDER BY ?code
+        """
+        
+        # Les deux requêtes partent en parallèle ; leurs lignes sont parcourues
+        # une seule fois, directement dans le cache
+        profile, candidates = self.kb.execute_queries(
+            [profile_query, candidates_query], stream=True
+        )
         
-        # Extraire intérêts, compétences et cours complétés
+        # Extraire intérêts, compétences et cours complétés (un seul passage)
         interests = set()
         skills = set()
         completed = set()
+        add_interest, add_skill, add_completed = interests.add, skills.add, completed.add
         
         for row in profile:
-            if 'domainLabel' in row:
-                interests.add(row['domainLabel']['value'])
-            if 'skillLabel' in row:
-                skills.add(row['skillLabel']['value'])
-            if 'coursCode' in row:
-                completed.add(row['coursCode']['value'])
+            if (domain := row.get('domainLabel')) is not None:
+                add_interest(domain['value'])
+            if (skill := row.get('skillLabel')) is not None:
+                add_skill(skill['value'])
+            if (code := row.get('coursCode')) is not None:
+                add_completed(code['value'])
         
         logger.info(f"📊 Profil: {len(interests)} intérêts, {len(skills)} compétences, {len(completed)} cours suivis")
         
-        # 2. Trouver des cours correspondants
-        recommendations = []
-        
-        # Cours dans les domaines d'intérêt
-        for interest in interests:
-            courses = self.reasoner.get_courses_by_domain(interest)
-            for course in courses:
-                code = course['code']['value']
-                if code not in completed:
-                    # Vérifier éligibilité
-                    eligibility = self.reasoner.check_student_eligibility(
-                        student_id, code
-                    )
-                    
-                    if eligibility['eligible']:
-                        score = self._calculate_relevance_score(
-                            course, interests, skills
-                        )
-                        recommendations.append({
-                            'course': course,
-                            'score': score,
-                            'reason': f"Correspond à votre intérêt : {interest}",
-                            'eligible': True
-                        })
+        # 3. Cours dans les domaines d'intérêt (un seul par cours), les autres en réserve
+        matched = []
+        general = []
+        seen = set()
+        
+        for row in candidates:
+            code = row['code']['value']
+            if code in seen:
+                continue
+            seen.add(code)
+            
+            course = {key: value for key, value in row.items() if key != 'interestLabel'}
+            if 'interestLabel' in row:
+                matched.append((course, row['interestLabel']['value']))
+            else:
+                general.append(course)
+        
+        # Scores calculés en un seul lot
+        scores = self._calculate_relevance_scores(
+            [course for course, _ in matched], interests, skills
+        )
+        recommendations = [
+            {
+                'course': course,
+                'score': score,
+                'reason': f"Correspond à votre intérêt : {interest}",
+                'eligible': True
+            }
+            for (course, interest), score in zip(matched, scores)
+        ]
         
         # Si pas assez de recommandations, ajouter des cours généraux
         if len(recommendations) < max_results:
             logger.info("📚 Ajout de cours généraux...")
-            all_courses = self.kb.get_all_courses()
-            
-            for course in all_courses:
-                if 'code' not in course:
-                    continue
-                    
-                code = course['code']['value']
-                if code not in completed:
-                    # Vérifier si déjà dans les recommandations
-                    already_recommended = any(
-                        r['course']['code']['value'] == code 
-                        for r in recommendations
-                    )
-                    
-                    if not already_recommended:
-                        eligibility = self.reasoner.check_student_eligibility(
-                            student_id, code
-                        )
-                        
-                        if eligibility['eligible']:
-                            recommendations.append({
-                                'course': course,
-                                'score': 0.5,  # Score neutre
-                                'reason': "Cours accessible avec vos prérequis",
-                                'eligible': True
-                            })
+            for course in general:
+                recommendations.append({
+                    'course': course,
+                    'score': 0.5,  # Score neutre
+                    'reason': "Cours accessible avec vos prérequis",
+                    'eligible': True
+                })
         
         # Trier par score et limiter
         recommendations.sort(key=lambda x: x['score'], reverse=True)
         
+        recommendations = recommendations[:max_results]
+        
+        with self._rec_lock:
+            self._rec_cache[cache_key] = (time.monotonic(), recommendations)
+            self._rec_cache.move_to_end(cache_key)
+            while len(self._rec_cache) > self.RECOMMENDATION_CACHE_SIZE:
+                self._rec_cache.popitem(last=False)
+        
         logger.info(f"✅ {len(recommendations)} recommandations générées")
-        return recommendations[:max_results]
+        return [dict(rec) for rec in recommendations]
     
     
-    def _calculate_relevance_score(self, course: Dict, 
-                                   interests: Set[str], 
-                                   skills: Set[str]) -> float:
+    def _calculate_relevance_scores(self, courses: List[Dict], 
+                                    interests: Set[str], 
+                                    skills: Set[str]) -> List[float]:
         """
-        Calcule un score de pertinence pour un cours
-        Score entre 0 et 1
+        Calcule les scores de pertinence d'un lot de cours en une passe vectorisée
         
         Args:
-            course: Dictionnaire du cours
+            courses: Dictionnaires des cours
             interests: Set d'intérêts de l'étudiant
             skills: Set de compétences de l'étudiant
             
         Returns:
-            Score de pertinence (0.0 - 1.0)
+            Scores de pertinence (0.0 - 1.0), dans l'ordre des cours
         """
-        score = 0.5  # Score de base
+        count = len(courses)
+        has_description = np.fromiter(
+            (bool(course.get('description')) for course in courses), dtype=bool, count=count
+        )
+        credits = self._credits_array(courses)
         
-        # Bonus si le cours a une description
-        if 'description' in course and course['description']:
-            score += 0.1
-        
-        # Bonus pour nombre de crédits (valoriser les cours substantiels)
-        if 'credits' in course:
-            try:
-                credits = int(course['credits']['value'])
-                if credits >= 5:
-                    score += 0.1
-            except:
-                pass
+        scores = np.full(count, 0.5)          # Score de base
+        scores += 0.1 * has_description       # Bonus si le cours a une description
+        scores += 0.1 * (credits >= 5)        # Bonus pour les cours substantiels
         
         # Bonus si niveau approprié (à adapter selon vos données)
         # score += 0.2 si niveau correspond
         
-        return min(1.0, score)
+        return np.minimum(scores, 1.0).tolist()
+    
+    
+    @staticmethod
+    def _credits_array(courses: List[Dict]) -> np.ndarray:
+        """
+        Crédits des cours en un tableau d'entiers (0 si absents ou illisibles)
+        
+        La validité est testée (isdecimal) au lieu d'intercepter une
+        exception par cours.
+        """
+        values = (course.get('credits', {}).get('value', '').strip() for course in courses)
+        return np.fromiter(
+            (int(value) if value.isdecimal() else 0 for value in values),
+            dtype=np.int32, count=len(courses)
+        )
     
     
     def recommend_for_goal(self, student_id: str, 
@@ -208,18 +268,7 @@ class RecommendationAgent:
         full_path = self.reasoner.compute_learning_path(goal_course_code)
         
         # 2. Vérifier quels cours sont déjà complétés
-        query = f"""
-        PREFIX course: <http://www.university.edu/ontology/courses#>
-        
-        SELECT ?coursCode
-        WHERE {{
-            <{student_id}> course:aSuivi ?cours .
-            ?cours course:codeCours ?coursCode .
-        }}
-        """
-        
-        completed = self.kb.execute_query(query)
-        completed_codes = {c['coursCode']['value'] for c in completed}
+        completed_codes = self.reasoner.get_completed_codes(student_id)
         
         # 3. Filtrer pour ne garder que les cours restants
         remaining_path = [
@@ -227,29 +276,25 @@ class RecommendationAgent:
             if course.get('code', {}).get('value') not in completed_codes
         ]
         
-        # 4. Identifier le(s) prochain(s) cours à suivre
+        # 4. Identifier le(s) prochain(s) cours à suivre (prérequis de tout le
+        #    parcours lus en une requête, puis comparés aux cours suivis)
+        path_courses = [course for course in remaining_path if 'code' in course]
+        prereqs_by_code = self.reasoner.get_prerequisites_map(
+            [course['code']['value'] for course in path_courses]
+        )
+        
         next_courses = []
-        for course in remaining_path:
-            if 'code' not in course:
-                continue
-                
+        for course in path_courses:
             code = course['code']['value']
-            eligibility = self.reasoner.check_student_eligibility(student_id, code)
             
-            if eligibility['eligible']:
+            if completed_codes.issuperset(prereqs_by_code[code]):
                 next_courses.append({
                     'course': course,
                     'reason': 'Prérequis validés'
                 })
         
         # 5. Calculer statistiques
-        total_credits = 0
-        for course in remaining_path:
-            if 'credits' in course:
-                try:
-                    total_credits += int(course['credits']['value'])
-                except:
-                    pass
+        total_credits = int(self._credits_array(remaining_path).sum())
         
         estimated_semesters = max(1, len(remaining_path) // 4)
         
@@ -5,11 +5,18 @@ Améliore les performances des requêtes complexes
 
 from typing import Dict, List
 import logging
+import re
 import time
 from functools import wraps
 
 logger = logging.getLogger(__name__)
 
+# Mots-clés cherchés sans distinction de casse, sans copie .upper() de la requête
+_LIMIT_RE = re.compile(r'\blimit\b', re.I)
+_COUNT_RE = re.compile(r'\bcount\b', re.I)
+_FILTER_RE = re.compile(r'\bfilter\b', re.I)
+_CONTAINS_RE = re.compile(r'\bcontains\b', re.I)
+
 
 class SPARQLOptimizer:
     """
@@ -34,7 +41,7 @@ class SPARQLOptimizer:
         Returns:
             Requête optimisée
         """
-        if 'LIMIT' not in query.upper() and 'COUNT' not in query.upper():
+        if not _LIMIT_RE.search(query) and not _COUNT_RE.search(query):
             query = query.strip() + f'\nLIMIT {default_limit}'
         
         return query
@@ -77,17 +84,25 @@ class SPARQLOptimizer:
         # Simple optimisation : déplacer les FILTER CONTAINS vers la fin
         # car ils sont généralement plus coûteux
         
-        lines = query.split('\n')
-        filter_lines = [l for l in lines if 'FILTER' in l.upper()]
-        other_lines = [l for l in lines if 'FILTER' not in l.upper()]
-        
-        # Réorganiser : filtres simples d'abord, CONTAINS à la fin
-        simple_filters = [f for f in filter_lines if 'CONTAINS' not in f.upper()]
-        complex_filters = [f for f in filter_lines if 'CONTAINS' in f.upper()]
-        
-        optimized_lines = other_lines[:-1] + simple_filters + complex_filters + [other_lines[-1]]
-        
-        return '\n'.join(optimized_lines)
+        # Une seule passe, sans copie en majuscules de chaque ligne
+        other_lines = []
+        simple_filters = []
+        complex_filters = []
+        for line in query.split('\n'):
+            if not _FILTER_RE.search(line):
+                other_lines.append(line)
+            elif _CONTAINS_RE.search(line):
+                complex_filters.append(line)
+            else:
+                simple_filters.append(line)
+        
+        # Réorganiser : filtres simples d'abord, CONTAINS à la fin (avant la dernière ligne)
+        last_line = other_lines.pop()
+        other_lines += simple_filters
+        other_lines += complex_filters
+        other_lines.append(last_line)
+        
+        return '\n'.join(other_lines)
     
     
     @staticmethod
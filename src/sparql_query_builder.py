@@ -3,12 +3,184 @@ Module pour construire des requêtes SPARQL à partir des intentions NLP
 Membre 2 : Spécialiste NLP - VERSION CORRIGÉE avec bon namespace
 """
 
-from typing import Dict, Any, List, Optional
-from src.knowledge_base import KnowledgeBase
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from string import Template
+from typing import Dict, Any, Callable, List, Optional
+from src.knowledge_base import Course, KnowledgeBase
 from src.nlp_processor import NLPProcessor
 
 
+# ==================== REQUÊTES ====================
+# Squelettes assemblés une fois à l'import, préfixes compris : le texte est
+# identique d'un appel à l'autre (cache de KnowledgeBase). Les valeurs sont
+# liées par KnowledgeBase.execute_bound_query (littéraux échappés).
+
+PREFIXES = """
+PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX course: <http://www.university.edu/ontology/courses#>
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+"""
+
+# Motifs communs aux recherches (nomCours au lieu de rdfs:label), du plus
+# sélectif au moins sélectif : rdf:type (toutes les instances) en dernier
+_SEARCH_HEAD = """
+SELECT DISTINCT ?course ?nomCours ?code ?credits ?description
+WHERE {"""
+
+_SEARCH_PATTERNS = """
+    ?course course:codeCours ?code .
+    ?course course:nomCours ?nomCours .
+    ?course rdf:type course:Course .
+    OPTIONAL { ?course course:credits ?credits . }
+    OPTIONAL { ?course course:description ?description . }
+"""
+
+_SEARCH_SELECT = _SEARCH_HEAD + _SEARCH_PATTERNS
+
+# Code exact lié d'entrée : recherche par l'index des littéraux, sans parcourir tous les codes
+SEARCH_BY_CODE_QUERY = Template(PREFIXES + _SEARCH_HEAD + """
+    VALUES ?code { $code }
+""" + _SEARCH_PATTERNS + """
+}
+LIMIT 10
+""")
+
+# Domaine (tel que normalisé par NLPProcessor) → individu course:Domain de la base
+DOMAIN_IRIS = {
+    'Intelligence Artificielle': 'IntelligenceArtificielle',
+    'Machine Learning': 'IntelligenceArtificielle',
+    'Web': 'DeveloppementWeb',
+    'Base de Données': 'BaseDeDonnees',
+    'Mathématiques': 'Mathematiques',
+    'Informatique': 'Informatique'
+}
+
+# Domaine sans individu course:Domain → motif REGEX cherché dans le nom ou le code
+DOMAIN_PATTERNS = {
+    'Sécurité': 'SECURITY|sécurité',
+    'Réseaux': 'réseau|network'
+}
+
+# Niveau → chiffre attendu dans le code du cours
+LEVEL_DIGITS = {'débutant': '1', 'intermédiaire': '2', 'avancé': '3', 'expert': '4'}
+
+
+def _bind_domains(query: str) -> Dict[str, Template]:
+    """Une requête par domaine connu, l'IRI du domaine ($domain) déjà liée"""
+    return {
+        domain: Template(Template(query).safe_substitute(domain=f'course:{name}'))
+        for domain, name in DOMAIN_IRIS.items()
+    }
+
+
+# Domaine connu : jointure sur course:appartientADomaine, IRI liée d'entrée
+# (accès indexé, au lieu d'un REGEX évalué sur chaque nom et chaque code)
+_IN_DOMAIN = """
+    ?course course:appartientADomaine $domain ."""
+
+SEARCH_IN_DOMAIN_QUERIES = _bind_domains(PREFIXES + _SEARCH_HEAD + _IN_DOMAIN + _SEARCH_PATTERNS + """
+}
+LIMIT 10
+""")
+
+SEARCH_IN_DOMAIN_LEVEL_QUERIES = _bind_domains(PREFIXES + _SEARCH_HEAD + _IN_DOMAIN + _SEARCH_PATTERNS + """
+    FILTER(CONTAINS(?code, $level))
+}
+LIMIT 10
+""")
+
+# Repli pour un domaine absent de DOMAIN_IRIS : motif (DOMAIN_PATTERNS) sur le nom ou le code
+SEARCH_BY_DOMAIN_QUERY = Template(PREFIXES + _SEARCH_SELECT + """
+    FILTER(REGEX(?nomCours, $pattern, "i") || REGEX(?code, $pattern, "i"))
+}
+LIMIT 10
+""")
+
+SEARCH_BY_DOMAIN_LEVEL_QUERY = Template(PREFIXES + _SEARCH_SELECT + """
+    FILTER(REGEX(?nomCours, $pattern, "i") || REGEX(?code, $pattern, "i"))
+    FILTER(CONTAINS(?code, $level))
+}
+LIMIT 10
+""")
+
+SEARCH_ALL_QUERY = PREFIXES + _SEARCH_SELECT + """
+}
+ORDER BY ?code
+LIMIT 15
+"""
+
+_LEARNING_PATH_HEAD = """
+SELECT DISTINCT ?course ?nomCours ?code ?prereq ?prereqCode
+WHERE {"""
+
+_LEARNING_PATH_PATTERNS = """
+    ?course course:codeCours ?code .
+    ?course course:nomCours ?nomCours .
+    ?course rdf:type course:Course .
+"""
+
+_LEARNING_PATH_TAIL = """
+    OPTIONAL {
+        ?course course:aPrerequis ?prereq .
+        ?prereq course:codeCours ?prereqCode .
+    }
+}
+ORDER BY ?code
+"""
+
+LEARNING_PATH_IN_DOMAIN_QUERIES = _bind_domains(
+    PREFIXES + _LEARNING_PATH_HEAD + _IN_DOMAIN + _LEARNING_PATH_PATTERNS + _LEARNING_PATH_TAIL
+)
+
+LEARNING_PATH_QUERY = Template(PREFIXES + _LEARNING_PATH_HEAD + _LEARNING_PATH_PATTERNS + """
+    FILTER(REGEX(?nomCours, $pattern, "i") || REGEX(?code, $pattern, "i"))
+""" + _LEARNING_PATH_TAIL)
+
+LIST_ALL_COURSES_QUERY = PREFIXES + """
+SELECT DISTINCT ?course ?nomCours ?code ?credits
+WHERE {
+    ?course course:codeCours ?code .
+    ?course course:nomCours ?nomCours .
+    ?course rdf:type course:Course .
+    OPTIONAL { ?course course:credits ?credits . }
+}
+ORDER BY ?code
+"""
+
+
+def _copy(value):
+    """Copie superficielle d'un résultat mémorisé (l'appelant peut la modifier)"""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def _memoized(key: Callable[..., tuple]):
+    """
+    Mémorise le résultat d'une méthode du builder (cf. SPARQLQueryBuilder._cached)
+    
+    Args:
+        key: Calcule la clé à partir des arguments de la méthode
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args):
+            return self._cached((method.__name__, *key(*args)), lambda: method(self, *args))
+        return wrapper
+    return decorator
+
+
 class SPARQLQueryBuilder:
+    # Résultats mis en forme conservés (entrées, secondes)
+    RESULT_CACHE_SIZE = 512
+    RESULT_CACHE_TTL = 60
+    
     def __init__(self, knowledge_base: KnowledgeBase):
         """
         Initialise le builder de requêtes SPARQL
@@ -19,15 +191,43 @@ class SPARQLQueryBuilder:
         self.kb = knowledge_base
         self.nlp = NLPProcessor()
         
-        # Préfixes SPARQL CORRIGÉS
-        self.prefixes = """
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX course: <http://www.university.edu/ontology/courses#>
-        PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
-        """
+        # Préfixes SPARQL CORRIGÉS (déjà inclus dans les requêtes du module)
+        self.prefixes = PREFIXES
+        
+        # Cache LRU (méthode, arguments, version des données) → (horodatage, résultat)
+        self._results: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._results_lock = threading.Lock()
     
-    def search_courses(self, entities: Dict[str, Any]) -> List[Dict]:
+    def invalidate_cache(self):
+        """Oublie les résultats mémorisés (après une mise à jour de la base)"""
+        with self._results_lock:
+            self._results.clear()
+    
+    def _cached(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """Résultat mémorisé pour key s'il a moins de RESULT_CACHE_TTL secondes, sinon compute()"""
+        # La version des données change à chaque écriture (clear_cache) : pas de résultat périmé
+        key += (self.kb.data_version,)
+        with self._results_lock:
+            entry = self._results.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.RESULT_CACHE_TTL:
+                self._results.move_to_end(key)
+                return _copy(entry[1])
+        
+        value = compute()
+        if not value:
+            # Résultat vide ou None (cours inconnu, Fuseki injoignable) : pas mémorisé,
+            # comme dans KnowledgeBase._cached_rows
+            return value
+        
+        with self._results_lock:
+            self._results[key] = (time.monotonic(), value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return _copy(value)
+    
+    @_memoized(lambda entities: (entities.get('domain'), entities.get('level'), entities.get('course_code')))
+    def search_courses(self, entities: Dict[str, Any]) -> List[Course]:
         """
         Recherche des cours selon les entités extraites
         
@@ -41,59 +241,37 @@ class SPARQLQueryBuilder:
         level = entities.get('level')
         course_code = entities.get('course_code')
         
-        # Requête de base utilisant nomCours au lieu de rdfs:label
-        base_query = """
-        SELECT DISTINCT ?course ?nomCours ?code ?credits ?description
-        WHERE {
-            ?course rdf:type course:Course .
-            ?course course:nomCours ?nomCours .
-            ?course course:codeCours ?code .
-            OPTIONAL { ?course course:credits ?credits . }
-            OPTIONAL { ?course course:description ?description . }
-        """
-        
         # Si un code spécifique est demandé
         if course_code:
-            query = self.prefixes + base_query + f"""
-            FILTER(CONTAINS(UCASE(?code), "{course_code.upper()}"))
-            }}
-            LIMIT 10
-            """
+            results = self.kb.execute_bound_query(SEARCH_BY_CODE_QUERY, code=course_code.strip().upper())
         
-        # Si un domaine est spécifié
+        # Si un domaine est spécifié (avec filtre de niveau éventuel)
         elif domain:
-            # Mapper les domaines
-            domain_map = {
-                'Intelligence Artificielle': 'IA',
-                'Web': 'WEB',
-                'Machine Learning': 'IA',
-                'Base de Données': 'BDD',
-                'Mathématiques': 'MATH',
-                'Informatique': 'INFO|PROG'
-            }
+            digit = LEVEL_DIGITS.get(level.lower()) if level else None
             
-            pattern = domain_map.get(domain, domain)
-            
-            query = self.prefixes + base_query + f"""
-            FILTER(REGEX(?nomCours, "{pattern}", "i") || REGEX(?code, "{pattern}", "i"))
-            """
-            
-            # Filtre de niveau
-            if level:
-                level_map = {'débutant': '1', 'intermédiaire': '2', 'avancé': '3', 'expert': '4'}
-                if level.lower() in level_map:
-                    num = level_map[level.lower()]
-                    query += f" FILTER(CONTAINS(?code, '{num}'))"
-            
-            query += "} LIMIT 10"
+            if domain in DOMAIN_IRIS:
+                if digit:
+                    results = self.kb.execute_bound_query(
+                        SEARCH_IN_DOMAIN_LEVEL_QUERIES[domain], level=digit
+                    )
+                else:
+                    results = self.kb.execute_bound_query(SEARCH_IN_DOMAIN_QUERIES[domain])
+            elif digit:
+                results = self.kb.execute_bound_query(
+                    SEARCH_BY_DOMAIN_LEVEL_QUERY, pattern=DOMAIN_PATTERNS.get(domain, domain), level=digit
+                )
+            else:
+                results = self.kb.execute_bound_query(
+                    SEARCH_BY_DOMAIN_QUERY, pattern=DOMAIN_PATTERNS.get(domain, domain)
+                )
         
         else:
             # Tous les cours
-            query = self.prefixes + base_query + "} ORDER BY ?code LIMIT 15"
+            results = self.kb.execute_query(SEARCH_ALL_QUERY)
         
-        results = self.kb.execute_query(query)
         return self._format_course_results(results)
     
+    @_memoized(lambda course_code: (course_code.strip().upper(),))
     def check_prerequisites(self, course_code: str) -> Dict[str, Any]:
         """
         Vérifie les prérequis d'un cours
@@ -105,48 +283,25 @@ class SPARQLQueryBuilder:
             Dictionnaire avec le cours et ses prérequis
         """
         course_code = course_code.strip().upper()
+        found = self.kb.get_course_with_prereqs(course_code)
         
-        query = self.prefixes + f"""
-        SELECT ?course ?nomCours ?code ?prereq ?prereqNom ?prereqCode
-        WHERE {{
-            ?course rdf:type course:Course .
-            ?course course:nomCours ?nomCours .
-            ?course course:codeCours ?code .
-            FILTER(CONTAINS(UCASE(?code), "{course_code}"))
-            
-            OPTIONAL {{
-                ?course course:aPrerequis ?prereq .
-                ?prereq course:nomCours ?prereqNom .
-                ?prereq course:codeCours ?prereqCode .
-            }}
-        }}
-        """
-        
-        results = self.kb.execute_query(query)
-        
-        if not results or len(results) == 0:
+        if not found:
             return {
                 'course': None,
                 'prerequisites': [],
                 'message': f"Aucun cours trouvé avec le code '{course_code}'"
             }
         
-        course_info = {
-            'course': results[0].get('nomCours', {}).get('value', 'Cours inconnu'),
-            'code': results[0].get('code', {}).get('value', course_code),
-            'prerequisites': []
+        return {
+            'course': found['course']['nom'] or 'Cours inconnu',
+            'code': course_code,
+            'prerequisites': [
+                {'label': prereq['nom'], 'code': prereq['code']}
+                for prereq in found['prerequisites']
+            ]
         }
-        
-        for result in results:
-            if 'prereqNom' in result:
-                course_info['prerequisites'].append({
-                    'label': result['prereqNom']['value'],
-                    'code': result['prereqCode']['value']
-                })
-        
-        return course_info
     
-    def get_learning_path(self, domain: str, target_level: str = 'expert') -> List[Dict]:
+    def get_learning_path(self, domain: str, target_level: str = 'expert') -> List[Course]:
         """
         Construit un parcours d'apprentissage pour un domaine
         
@@ -157,43 +312,22 @@ class SPARQLQueryBuilder:
         Returns:
             Liste ordonnée de cours
         """
-        domain_map = {
-            'Intelligence Artificielle': 'IA',
-            'Machine Learning': 'IA',
-            'Web': 'WEB',
-            'Base de Données': 'BDD',
-            'Mathématiques': 'MATH',
-            'Informatique': 'INFO|PROG'
-        }
-        
-        pattern = domain_map.get(domain, domain)
-        
-        query = self.prefixes + f"""
-        SELECT DISTINCT ?course ?nomCours ?code ?prereq ?prereqCode
-        WHERE {{
-            ?course rdf:type course:Course .
-            ?course course:nomCours ?nomCours .
-            ?course course:codeCours ?code .
-            FILTER(REGEX(?nomCours, "{pattern}", "i") || REGEX(?code, "{pattern}", "i"))
-            
-            OPTIONAL {{
-                ?course course:aPrerequis ?prereq .
-                ?prereq course:codeCours ?prereqCode .
-            }}
-        }}
-        ORDER BY ?code
-        """
-        
-        results = self.kb.execute_query(query)
+        if domain in DOMAIN_IRIS:
+            results = self.kb.execute_bound_query(LEARNING_PATH_IN_DOMAIN_QUERIES[domain])
+        else:
+            results = self.kb.execute_bound_query(
+                LEARNING_PATH_QUERY, pattern=DOMAIN_PATTERNS.get(domain, domain)
+            )
         
         if not results or len(results) == 0:
             return self.list_all_courses()
         
         return self._organize_by_level(results)
     
+    @_memoized(lambda course_code: (course_code.strip().upper(),))
     def get_course_info(self, course_code: str) -> Optional[Dict]:
         """
-        Récupère les informations détaillées d'un cours
+        Récupère les informations détaillées d'un cours (prérequis compris)
         
         Args:
             course_code: Code du cours
@@ -202,72 +336,38 @@ class SPARQLQueryBuilder:
             Dictionnaire avec toutes les infos du cours
         """
         course_code = course_code.strip().upper()
+        found = self.kb.get_course_with_prereqs(course_code)
         
-        query = self.prefixes + f"""
-        SELECT ?course ?nomCours ?code ?credits ?description ?duree ?difficulte 
-               ?skill ?skillNom ?domain ?domainNom
-        WHERE {{
-            ?course rdf:type course:Course .
-            ?course course:nomCours ?nomCours .
-            ?course course:codeCours ?code .
-            FILTER(CONTAINS(UCASE(?code), "{course_code}"))
-            
-            OPTIONAL {{ ?course course:credits ?credits . }}
-            OPTIONAL {{ ?course course:description ?description . }}
-            OPTIONAL {{ ?course course:duree ?duree . }}
-            OPTIONAL {{ ?course course:difficulte ?difficulte . }}
-            OPTIONAL {{
-                ?course course:enseigneCompetence ?skill .
-                ?skill course:nomCompetence ?skillNom .
-            }}
-            OPTIONAL {{
-                ?course course:appartientADomaine ?domain .
-                ?domain course:nomDomaine ?domainNom .
-            }}
-        }}
-        """
-        
-        results = self.kb.execute_query(query)
-        
-        if not results or len(results) == 0:
+        if not found:
             return None
         
-        first = results[0]
-        course_info = {
-            'label': first.get('nomCours', {}).get('value', 'Inconnu'),
-            'code': first.get('code', {}).get('value', course_code),
-            'credits': first.get('credits', {}).get('value', 'N/A'),
-            'description': first.get('description', {}).get('value', 'Pas de description'),
-            'duree': first.get('duree', {}).get('value', 'N/A'),
-            'difficulte': first.get('difficulte', {}).get('value', 'N/A'),
-            'domain': first.get('domainNom', {}).get('value', 'N/A'),
-            'skills': []
+        course = found['course']
+        return {
+            'label': course['nom'] or 'Inconnu',
+            'code': course_code,
+            'credits': course['credits'] or 'N/A',
+            'description': course['description'] or 'Pas de description',
+            'duree': course['duree'] or 'N/A',
+            'difficulte': course['difficulte'] or 'N/A',
+            'domain': course['domaine'] or 'N/A',
+            'skills': course['skills'],
+            'prerequisites': [
+                {'label': prereq['nom'], 'code': prereq['code']}
+                for prereq in found['prerequisites']
+            ]
         }
-        
-        for result in results:
-            if 'skillNom' in result:
-                skill = result['skillNom']['value']
-                if skill not in course_info['skills']:
-                    course_info['skills'].append(skill)
-        
-        return course_info
     
-    def list_all_courses(self) -> List[Dict]:
+    @_memoized(lambda: ())
+    def list_all_courses(self) -> List[Course]:
         """Liste tous les cours disponibles"""
-        query = self.prefixes + """
-        SELECT DISTINCT ?course ?nomCours ?code ?credits
-        WHERE {
-            ?course rdf:type course:Course .
-            ?course course:nomCours ?nomCours .
-            ?course course:codeCours ?code .
-            OPTIONAL { ?course course:credits ?credits . }
-        }
-        ORDER BY ?code
-        """
-        
-        results = self.kb.execute_query(query)
+        results = self.kb.execute_query(LIST_ALL_COURSES_QUERY)
         return self._format_course_results(results)
     
+    def list_course_names(self) -> List[Course]:
+        """Liste tous les cours, code et nom seulement (réponse « catalogue »)"""
+        results = self.kb.list_courses(('code', 'nom'))
+        return [Course.from_binding(result, label_key='nom') for result in results]
+    
     def process_user_query(self, user_message: str) -> Dict[str, Any]:
         """Traite une requête utilisateur complète"""
         nlp_result = self.nlp.process_message(user_message)
@@ -308,7 +408,7 @@ class SPARQLQueryBuilder:
             }
         
         elif intent == 'parcours_apprentissage':
-            domain = entities.get('domain', 'Intelligence Artificielle')
+            domain = entities.get('domain') or 'Intelligence Artificielle'
             path = self.get_learning_path(domain)
             return {
                 'intent': intent,
@@ -328,7 +428,7 @@ class SPARQLQueryBuilder:
             info = self.get_course_info(course_code)
             
             if not info:
-                all_courses = self.list_all_courses()
+                all_courses = self.list_course_names()
                 return {
                     'intent': 'liste_cours',
                     'data': all_courses,
@@ -342,7 +442,7 @@ class SPARQLQueryBuilder:
             }
         
         else:
-            courses = self.list_all_courses()
+            courses = self.list_course_names()
             return {
                 'intent': 'liste_cours',
                 'data': courses,
@@ -351,36 +451,30 @@ class SPARQLQueryBuilder:
     
     # Méthodes utilitaires
     
-    def _format_course_results(self, results: List[Dict]) -> List[Dict]:
+    def _format_course_results(self, results: List[Dict]) -> List[Course]:
         """Formate les résultats de cours"""
-        courses = []
-        for result in results:
-            courses.append({
-                'label': result.get('nomCours', {}).get('value', 'Inconnu'),
-                'code': result.get('code', {}).get('value', 'N/A'),
-                'credits': result.get('credits', {}).get('value', 'N/A'),
-                'description': result.get('description', {}).get('value', '')
-            })
-        return courses
+        return [Course.from_binding(result) for result in results]
     
-    def _organize_by_level(self, results: List[Dict]) -> List[Dict]:
+    def _organize_by_level(self, results: List[Dict]) -> List[Course]:
         """Organise les cours par niveau"""
         courses = {}
+        seen = {}  # code → prérequis déjà ajoutés (test en O(1) au lieu de parcourir la liste)
+        get_course = courses.get
         for result in results:
-            code = result.get('code', {}).get('value', '')
-            if code not in courses:
-                courses[code] = {
-                    'label': result.get('nomCours', {}).get('value', ''),
-                    'code': code,
-                    'prerequisites': []
-                }
+            code = result['code']['value']
+            course = get_course(code)
+            if course is None:
+                course = courses[code] = Course.from_binding(result)
+                seen[code] = set()
             
-            if 'prereqCode' in result:
-                prereq = result['prereqCode']['value']
-                if prereq not in courses[code]['prerequisites']:
-                    courses[code]['prerequisites'].append(prereq)
-        
-        return sorted(courses.values(), key=lambda x: x['code'])
+            prereq = result.get('prereqCode')
+            if prereq is not None:
+                prereq = prereq['value']
+                if prereq not in seen[code]:
+                    seen[code].add(prereq)
+                    course.prerequisites.append(prereq)
+        
+        return sorted(courses.values(), key=lambda course: course.code)
     
     def _format_prerequisites_message(self, prereqs: Dict) -> str:
         """Formate le message des prérequis"""
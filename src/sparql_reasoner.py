@@ -2,14 +2,14 @@
 Module de raisonnement SPARQL pour le chatbot universitaire
 Version optimisée avec inférence RDF et debugging amélioré
 """
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple
 from collections import deque
 import logging
 
 try:
-    from .knowledge_base import KnowledgeBase
+    from .knowledge_base import KnowledgeBase, normalize_course_code
 except ImportError:
-    from knowledge_base import KnowledgeBase
+    from knowledge_base import KnowledgeBase, normalize_course_code
 
 logger = logging.getLogger(__name__)
 
@@ -159,6 +159,8 @@ class SPARQLReasoner:
         self.kb = kb
         self.inference_engine = RDFInferenceEngine(kb)
         self.cache = {}
+        # Version des données (kb.data_version) des prérequis mis en cache
+        self._prereqs_version = kb.data_version
         logger.info("✅ SPARQLReasoner initialisé avec inférence RDF")
     
     
@@ -293,12 +295,15 @@ class SPARQLReasoner:
         """
         
         direct_prereqs = self.kb.execute_query(query)
-        all_prereqs = list(direct_prereqs)
+        all_prereqs = []
         
         for prereq in direct_prereqs:
             code_prereq = prereq['codePrerequis']['value']
-            indirect_prereqs = self.get_all_prerequisites_recursive(code_prereq, visited)
-            all_prereqs.extend(indirect_prereqs)
+            # Déjà listé (atteint par un autre chemin) : test O(1) sur visited
+            if code_prereq in visited:
+                continue
+            all_prereqs.append(prereq)
+            all_prereqs.extend(self.get_all_prerequisites_recursive(code_prereq, visited))
         
         return all_prereqs
     
@@ -366,12 +371,16 @@ class SPARQLReasoner:
         return results
     
     
-    def check_student_eligibility(self, student_id: str, code_cours: str) -> Dict:
+    def check_student_eligibility(self, student_id: str, code_cours: str,
+                                  completed_codes: Optional[Set[str]] = None) -> Dict:
         """
         Vérifie l'éligibilité (avec inférence RDF)
+        
+        completed_codes évite de relire les cours suivis quand l'appelant
+        les connaît déjà (vérification de plusieurs cours d'affilée).
         """
-        # Utiliser l'inférence pour les prérequis transitifs
-        all_prereq_codes = self.inference_engine.infer_transitive_prerequisites(code_cours)
+        # Prérequis transitifs, inférés une seule fois par cours
+        all_prereq_codes = self._prereqs_of(code_cours)
         
         if not all_prereq_codes:
             return {
@@ -380,19 +389,8 @@ class SPARQLReasoner:
                 'message': f"Aucun prérequis pour {code_cours}"
             }
         
-        # Cours suivis par l'étudiant
-        query_student = f"""
-        PREFIX course: <http://www.university.edu/ontology/courses#>
-        
-        SELECT ?coursCode
-        WHERE {{
-            <{student_id}> course:aSuivi ?cours .
-            ?cours course:codeCours ?coursCode .
-        }}
-        """
-        
-        completed_courses = self.kb.execute_query(query_student)
-        completed_codes = {c['coursCode']['value'] for c in completed_courses}
+        if completed_codes is None:
+            completed_codes = self.get_completed_codes(student_id)
         
         missing = [code for code in all_prereq_codes if code not in completed_codes]
         
@@ -410,6 +408,107 @@ class SPARQLReasoner:
             }
     
     
+    def get_completed_codes(self, student_id: str) -> Set[str]:
+        """Codes des cours suivis par l'étudiant"""
+        query_student = f"""
+        PREFIX course: <http://www.university.edu/ontology/courses#>
+        
+        SELECT ?coursCode
+        WHERE {{
+            <{student_id}> course:aSuivi ?cours .
+            ?cours course:codeCours ?coursCode .
+        }}
+        """
+        
+        return {c['coursCode']['value'] for c in self.kb.execute_query_iter(query_student)}
+    
+    
+    def get_prerequisites_map(self, codes: List[str]) -> Dict[str, Tuple[str, ...]]:
+        """
+        Prérequis transitifs de plusieurs cours, en une seule requête
+        
+        Les résultats alimentent aussi le cache de _prereqs_of.
+        
+        Args:
+            codes: Codes des cours
+            
+        Returns:
+            Dictionnaire code → codes des prérequis (tuple vide si aucun)
+        """
+        # Une seule lecture de version : le résultat est construit à partir de cet
+        # instantané et de la requête, sans relire un cache qu'une écriture peut purger
+        self._drop_stale_prereqs()
+        known = {}
+        missing = []
+        for code in dict.fromkeys(codes):
+            cached = self.cache.get(f"prereqs_{code}")
+            if cached is None:
+                missing.append(code)
+            else:
+                known[code] = cached
+        
+        if missing:
+            from rdflib import Literal  # Import différé, comme KnowledgeBase.execute_bound_query
+            
+            # Code canonique → code demandé ; un code mal formé n'a aucun prérequis
+            canonical = {}
+            for code in missing:
+                try:
+                    canonical[normalize_course_code(code)] = code
+                except ValueError:
+                    pass
+            values = " ".join(Literal(code).n3() for code in canonical)
+            query = f"""
+            PREFIX course: <http://www.university.edu/ontology/courses#>
+            
+            SELECT DISTINCT ?code ?prereqCode
+            WHERE {{
+                VALUES ?code {{ {values} }}
+                ?cours course:codeCours ?code .
+                OPTIONAL {{
+                    ?cours course:aPrerequis+ ?prereq .
+                    ?prereq course:codeCours ?prereqCode .
+                }}
+            }}
+            """
+            
+            found = {code: [] for code in missing}
+            rows = self.kb.execute_query(query) if canonical else []
+            for row in rows:
+                if 'prereqCode' in row:
+                    found[canonical[row['code']['value']]].append(row['prereqCode']['value'])
+            
+            for code, prereq_codes in found.items():
+                known[code] = self.cache[f"prereqs_{code}"] = tuple(prereq_codes)
+        
+        return {code: known[code] for code in codes}
+    
+    
+    def _prereqs_of(self, code_cours: str) -> Tuple[str, ...]:
+        """Prérequis transitifs d'un cours, mis en cache jusqu'à la prochaine écriture"""
+        cache_key = self._prereqs_key(code_cours)
+        if cache_key not in self.cache:
+            self.cache[cache_key] = tuple(
+                self.inference_engine.infer_transitive_prerequisites(code_cours)
+            )
+        return self.cache[cache_key]
+    
+    
+    def _prereqs_key(self, code_cours: str) -> str:
+        """Clé de cache des prérequis ; purge ceux d'une version antérieure des données"""
+        self._drop_stale_prereqs()
+        return f"prereqs_{code_cours}"
+    
+    
+    def _drop_stale_prereqs(self):
+        """Oublie les prérequis mis en cache si kb.data_version a changé depuis"""
+        version = self.kb.data_version
+        if version != self._prereqs_version:
+            for key in [key for key in self.cache if key.startswith("prereqs_")]:
+                del self.cache[key]
+            self._prereqs_version = version
+    
+    
     def compute_learning_path(self, target_course: str) -> List[Dict]:
         """
         Calcule le parcours optimal (inchangé, fonctionne)
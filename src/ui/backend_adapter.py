@@ -142,12 +142,12 @@ class BackendAdapter:
             # Formatter les résultats
             formatted = []
             for result in results:
-                code = result.get('code', '')
+                code = result.code
                 formatted.append({
                     'code': code,
-                    'nom': result.get('label', ''),
-                    'credits': int(result.get('credits', 0)),
-                    'description': result.get('description', ''),
+                    'nom': result.label,
+                    'credits': result.credits or 0,
+                    'description': result.description or '',
                     'domaine': self._extract_domain(code),
                     'niveau': self._extract_level(3)  # Default
                 })
@@ -163,15 +163,12 @@ class BackendAdapter:
     def get_all_prerequisites(self) -> List[tuple]:
         """Récupère toutes les relations de prérequis"""
         try:
-            all_courses = self.get_all_courses()
-            prerequisites = []
+            relations = self.kb.get_all_prerequisite_relations()
             
-            for course in all_courses:
-                prereqs = self.get_prerequisites_for_course(course['code'])
-                for prereq in prereqs:
-                    prerequisites.append((course['code'], prereq['code']))
-            
-            return prerequisites
+            return [
+                (r['codeCours']['value'], r['codePrerequis']['value'])
+                for r in relations
+            ]
             
         except Exception as e:
             logger.error(f"Erreur get_all_prerequisites: {e}")
@@ -257,7 +254,7 @@ class BackendAdapter:
         """
         try:
             import time
-            start_time = time.time()
+            start_time = time.perf_counter()
         
             # Utiliser le query_builder directement
             result = self.query_builder.process_user_query(user_message)
@@ -268,7 +265,7 @@ class BackendAdapter:
             intent = nlp_result.get('intent', 'unknown')
             
             # Enregistrer la performance
-            query_time = time.time() - start_time
+            query_time = time.perf_counter() - start_time
             self.monitor.record_query(query_time, from_cache=False)
             
             return {
@@ -392,7 +389,7 @@ class BackendAdapter:
     def get_conversation_history(self) -> List[Dict]:
         """Récupère l'historique de conversation"""
         try:
-            return self.conv_manager.get_history()
+            return self.conv_manager.get_conversation_history()
         except Exception as e:
             logger.error(f"Erreur get_conversation_history: {e}")
             return []
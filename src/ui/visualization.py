@@ -226,11 +226,12 @@ def create_credits_distribution(courses: List[Dict]) -> go.Figure:
     """Histogramme de distribution des crédits"""
     df = pd.DataFrame(courses)
     
+    # Bins fixes d'un crédit : pas d'autobinning côté navigateur
     fig = go.Figure(data=[
         go.Histogram(
             x=df['credits'],
             marker_color='#2196F3',
-            nbinsx=10,
+            xbins=dict(start=-0.5, end=float(df['credits'].max()) + 0.5, size=1),
             hovertemplate='Crédits: %{x}<br>Nombre de cours: %{y}<extra></extra>'
         )
     ])
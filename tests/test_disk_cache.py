@@ -0,0 +1,96 @@
+"""
+Tests pour le cache disque des résultats SPARQL
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src import disk_cache
+from src.disk_cache import DiskCache
+from src.knowledge_base import KnowledgeBase
+
+ROWS = [{'code': {'type': 'literal', 'value': 'IA-401'}}]
+QUERY = 'SELECT ?code WHERE { ?c <http://www.university.edu/ontology/courses#codeCours> ?code }'
+
+
+class _OkResponse:
+    """Réponse HTTP réussie minimale (écritures simulées)"""
+    def raise_for_status(self):
+        pass
+
+
+def test_set_get(tmp_path):
+    """Test 1: Une entrée enregistrée est relue à l'identique"""
+    cache = DiskCache(tmp_path / 'sparql.sqlite3')
+    key = DiskCache.key('http://localhost:3030/university/query', 'SELECT ?s WHERE { ?s ?p ?o }')
+    assert cache.get(key) is None
+    cache.set(key, ROWS)
+    assert cache.get(key) == ROWS
+
+
+def test_key_depends_on_endpoint():
+    """Test 2: Même requête sur deux datasets = deux clés"""
+    query = 'SELECT ?s WHERE { ?s ?p ?o }'
+    assert DiskCache.key('http://a/ds1/query', query) != DiskCache.key('http://a/ds2/query', query)
+
+
+def test_expiry(tmp_path, monkeypatch):
+    """Test 3: Une entrée plus vieille que le TTL n'est plus servie"""
+    cache = DiskCache(tmp_path / 'sparql.sqlite3', ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(disk_cache.time, 'time', lambda: now[0])
+    cache.set('k', ROWS)
+    now[0] += 9
+    assert cache.get('k') == ROWS
+    now[0] += 1
+    assert cache.get('k') is None
+
+
+def test_clear(tmp_path):
+    """Test 4: clear vide le cache"""
+    cache = DiskCache(tmp_path / 'sparql.sqlite3')
+    cache.set('k', ROWS)
+    cache.clear()
+    assert cache.get('k') is None
+
+
+def test_unusable_path_disables_cache(tmp_path):
+    """Test 5: Fichier inaccessible = cache désactivé, sans exception"""
+    blocker = tmp_path / 'fichier'
+    blocker.write_text('')
+    cache = DiskCache(blocker / 'sparql.sqlite3')
+    cache.set('k', ROWS)
+    assert cache.get('k') is None
+
+
+def test_write_from_other_kb_clears_shared_cache(tmp_path, monkeypatch):
+    """Test 6: Une écriture via une KB sans cache disque vide celui des autres (CLI)"""
+    monkeypatch.setattr(disk_cache, 'DEFAULT_CACHE_DIR', tmp_path)
+    fetches = []
+
+    def fetch(query):
+        fetches.append(query)
+        return ROWS
+
+    reader = KnowledgeBase(warm=False, disk_cache=True)
+    monkeypatch.setattr(reader, '_fetch_query', fetch)
+    assert reader.execute_query(QUERY) == ROWS
+    disk_key = DiskCache.key(reader.query_endpoint, " ".join(QUERY.split()))
+    assert DiskCache(tmp_path / 'sparql.sqlite3').get(disk_key) == ROWS
+
+    writer = KnowledgeBase(warm=False)
+    monkeypatch.setattr(writer._session, 'post', lambda *args, **kwargs: _OkResponse())
+    assert writer.execute_update('INSERT DATA { }')
+    assert DiskCache(tmp_path / 'sparql.sqlite3').get(disk_key) is None
+
+    # Nouveau lancement de la CLI : la requête repart vers Fuseki
+    relaunched = KnowledgeBase(warm=False, disk_cache=True)
+    monkeypatch.setattr(relaunched, '_fetch_query', fetch)
+    relaunched.execute_query(QUERY)
+    assert len(fetches) == 2
+
+
+def test_clear_shared_does_not_create_file(tmp_path):
+    """Test 7: clear_shared sans fichier existant ne crée rien"""
+    DiskCache.clear_shared(tmp_path / 'absent' / 'sparql.sqlite3')
+    assert not (tmp_path / 'absent').exists()
@@ -5,7 +5,9 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.knowledge_base import KnowledgeBase
+import pytest
+
+from src.knowledge_base import KnowledgeBase, normalize_course_code
 
 
 def test_connection():
@@ -59,6 +61,23 @@ def test_get_prerequisites():
         print(f"   - {code}: {nom}")
 
 
+def test_normalize_course_code():
+    """Test 5: Forme canonique des codes de cours (sans Fuseki)"""
+    assert normalize_course_code(" ia-401 ") == "IA-401"
+    assert normalize_course_code("Security-301") == "SECURITY-301"
+    for invalid in ("IA401", "IA-", "", 'IA-401" } DROP', "IA 401"):
+        with pytest.raises(ValueError):
+            normalize_course_code(invalid)
+
+
+def test_invalid_code_is_not_found():
+    """Test 6: Code mal formé = cours introuvable, sans requête ni exception"""
+    kb = KnowledgeBase(warm=False)
+    assert kb.get_course_by_code("pas un code") is None
+    assert kb.get_prerequisites("pas un code") == []
+    assert kb.get_course_with_prereqs("pas un code") is None
+
+
 def run_all_tests():
     """Lance tous les tests"""
     print("="*70)
@@ -69,7 +88,9 @@ def run_all_tests():
         test_connection,
         test_get_all_courses,
         test_get_course_by_code,
-        test_get_prerequisites
+        test_get_prerequisites,
+        test_normalize_course_code,
+        test_invalid_code_is_not_found
     ]
     
     passed = 0
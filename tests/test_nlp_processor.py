@@ -0,0 +1,112 @@
+"""
+Tests pour le NLPProcessor : les balayages en un seul passage doivent
+donner exactement les résultats des extracteurs séparés
+"""
+import random
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src import nlp_processor
+from src.nlp_processor import KeywordMatcher, NLPProcessor
+
+
+# Chevauchements délicats : préfixes, mots contenus dans d'autres, codes collés
+OVERLAP_MESSAGES = [
+    "je connais java et javascript",
+    "javascript seulement",
+    "cours de réseau ou de réseaux ?",
+    "les réseaux avancés",
+    "prérequis de ia-401",
+    "ia401 ou ia-401 en intelligence artificielle",
+    "mais pas d'ai",
+    "cybersécurité et sécurité",
+    "développement web débutants",
+    "dev web intermédiaire puis expert",
+    "base de données et bdd",
+    "je veux trouver un cours, trouve-moi ça",
+    "",
+]
+
+# Vocabulaire des messages aléatoires (mots-clés, fragments et mots neutres)
+VOCABULARY = [
+    'java', 'javascript', 'python', 'c++', 'sql', 'nlp', 'deep learning',
+    'réseau', 'réseaux', 'network', 'sécurité', 'cybersécurité', 'security',
+    'ia', 'ai', 'ia-401', 'web', 'dev web', 'développement web', 'bdd',
+    'base de données', 'machine learning', 'débutant', 'débutants',
+    'intermédiaire', 'avancé', 'avancée', 'expert', 'experts', 'mais', 'via',
+    'cours', 'trouver', 'trouve', 'quels cours', 'apprendre', 'le', 'de',
+]
+SEPARATORS = [' ', ' ', ', ', '-', '', '?', "'"]
+
+
+def random_messages(count, seed=0):
+    """Messages aléatoires reproductibles, collages sans séparateur compris"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.choices(VOCABULARY, k=rng.randint(0, 8))
+        yield "".join(word + rng.choice(SEPARATORS) for word in words)
+
+
+def all_messages():
+    return OVERLAP_MESSAGES + list(random_messages(3000))
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return NLPProcessor()
+
+
+def test_keyword_matcher_regex_fallback(monkeypatch):
+    """Test 1: KeywordMatcher sans pyahocorasick = sous-chaînes présentes"""
+    monkeypatch.setattr(nlp_processor, 'ahocorasick', None)
+    keywords = NLPProcessor.skill_keywords + ('trouve', 'trouver', 'réseaux')
+    matcher = KeywordMatcher(keywords)
+
+    for text in all_messages():
+        assert matcher.find(text) == {kw for kw in keywords if kw in text}, text
+
+
+def test_keyword_matcher_automaton():
+    """Test 2: KeywordMatcher avec pyahocorasick = sous-chaînes présentes"""
+    pytest.importorskip("ahocorasick")
+    keywords = NLPProcessor.skill_keywords + ('trouve', 'trouver', 'réseaux')
+    matcher = KeywordMatcher(keywords)
+
+    for text in all_messages():
+        assert matcher.find(text) == {kw for kw in keywords if kw in text}, text
+
+
+def test_scan_domain_level(processor):
+    """Test 3: _scan_domain_level = extract_domain + extract_level"""
+    for text in all_messages():
+        expected = (processor.extract_domain(text, text), processor.extract_level(text, text))
+        assert processor._scan_domain_level(text) == expected, text
+
+
+def test_scan_entities(processor):
+    """Test 4: _scan_entities = extract_domain + extract_level + extract_skills"""
+    if processor._entity_automaton is None:
+        pytest.skip("pyahocorasick non installé")
+
+    for text in all_messages():
+        expected = (
+            processor.extract_domain(text, text),
+            processor.extract_level(text, text),
+            processor.extract_skills(text, text),
+        )
+        assert processor._scan_entities(text) == expected, text
+
+
+def test_overlap_cases(processor):
+    """Test 5: Résultats attendus sur les chevauchements connus"""
+    # Compétences en sous-chaîne (comportement d'origine) : 'java' est dans 'javascript'
+    assert processor.extract_skills("javascript") == ['Java', 'Javascript']
+    assert processor.extract_skills("java et javascript") == ['Java', 'Javascript']
+    assert processor.extract_domain("les réseaux") == 'Réseaux'
+    assert processor.extract_domain("mais pas ça") is None
+    assert processor.extract_domain("prérequis de ia-401") == 'Intelligence Artificielle'
+    assert processor.extract_course_code("prérequis de ia401") == 'IA-401'
+    assert processor.extract_level("cours débutants") == 'Débutant'
@@ -0,0 +1,92 @@
+"""
+Tests pour le cache LRU+TTL des requêtes SELECT de KnowledgeBase (sans Fuseki)
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from src import knowledge_base
+from src.knowledge_base import KnowledgeBase
+
+ROWS = [{'code': {'type': 'literal', 'value': 'IA-401'}}]
+
+
+@pytest.fixture
+def kb(monkeypatch):
+    """KB sans préchauffage ni cache disque, dont les requêtes sont comptées"""
+    kb = KnowledgeBase(warm=False)
+    kb.fetches = []
+
+    def fetch(query):
+        kb.fetches.append(query)
+        return kb.rows
+
+    kb.rows = ROWS
+    monkeypatch.setattr(kb, '_fetch_query', fetch)
+    return kb
+
+
+def test_cache_hit(kb):
+    """Test 1: Même requête (mise en forme différente) = une seule requête HTTP"""
+    assert kb.execute_query("SELECT ?s WHERE { ?s ?p ?o }") == ROWS
+    assert kb.execute_query("SELECT ?s\n  WHERE {  ?s ?p ?o }") == ROWS
+    assert len(kb.fetches) == 1
+    assert kb.cache_stats()['hits'] == 1
+
+
+def test_ttl_expiry(kb, monkeypatch):
+    """Test 2: Une entrée plus vieille que query_cache_ttl est redemandée"""
+    now = [100.0]
+    monkeypatch.setattr(knowledge_base.time, 'monotonic', lambda: now[0])
+    kb.execute_query("Q")
+    now[0] += kb.query_cache_ttl - 1
+    kb.execute_query("Q")
+    assert len(kb.fetches) == 1
+    now[0] += 1
+    kb.execute_query("Q")
+    assert len(kb.fetches) == 2
+
+
+def test_lru_eviction(kb):
+    """Test 3: Au-delà de query_cache_size, l'entrée la moins récente est évincée"""
+    kb.query_cache_size = 2
+    kb.execute_query("Q1")
+    kb.execute_query("Q2")
+    kb.execute_query("Q1")  # Q1 redevient la plus récente
+    kb.execute_query("Q3")  # évince Q2
+    kb.execute_query("Q1")
+    assert kb.fetches == ["Q1", "Q2", "Q3"]
+    kb.execute_query("Q2")
+    assert kb.fetches == ["Q1", "Q2", "Q3", "Q2"]
+
+
+def test_empty_results_not_cached(kb):
+    """Test 4: Résultat vide (ou erreur HTTP) jamais mis en cache"""
+    kb.rows = []
+    kb.execute_query("Q")
+    kb.execute_query("Q")
+    assert len(kb.fetches) == 2
+
+
+def test_clear_cache_bumps_version(kb):
+    """Test 5: clear_cache vide le cache et incrémente data_version"""
+    kb.execute_query("Q")
+    version = kb.data_version
+    kb.clear_cache()
+    assert kb.data_version == version + 1
+    kb.execute_query("Q")
+    assert len(kb.fetches) == 2
+
+
+def test_write_during_fetch_not_cached(kb, monkeypatch):
+    """Test 6: Résultats obtenus avant une écriture concurrente : rendus, pas gardés"""
+    def fetch_then_write(query):
+        kb.fetches.append(query)
+        kb.clear_cache()  # écriture survenue pendant la requête
+        return ROWS
+
+    monkeypatch.setattr(kb, '_fetch_query', fetch_then_write)
+    assert kb.execute_query("Q") == ROWS
+    assert kb.cache_stats()['size'] == 0
@@ -0,0 +1,34 @@
+"""
+Tests pour l'optimiseur de requêtes SPARQL
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.sparql_optimizer import SPARQLOptimizer
+
+
+def test_add_limit_if_missing():
+    """Test 1: LIMIT ajouté sauf si LIMIT ou COUNT présents (mots entiers, toute casse)"""
+    assert SPARQLOptimizer.add_limit_if_missing("SELECT ?s WHERE { ?s ?p ?o }").endswith("LIMIT 1000")
+    assert SPARQLOptimizer.add_limit_if_missing("SELECT ?s WHERE { ?s ?p ?o } limit 5").endswith("limit 5")
+    assert SPARQLOptimizer.add_limit_if_missing("SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }").endswith("}")
+    assert SPARQLOptimizer.add_limit_if_missing("SELECT ?limitValue WHERE { ?s ?p ?limitValue }").endswith("LIMIT 1000")
+
+
+def test_reorder_filters():
+    """Test 2: Filtres simples puis CONTAINS, avant la dernière ligne (toute casse)"""
+    query = "\n".join([
+        "SELECT * WHERE {",
+        '    FILTER(CONTAINS(?nom, "IA"))',
+        "    ?c course:nomCours ?nom .",
+        "    filter(?credits > 3)",
+        "}",
+    ])
+    assert SPARQLOptimizer.reorder_filters(query).split("\n") == [
+        "SELECT * WHERE {",
+        "    ?c course:nomCours ?nom .",
+        "    filter(?credits > 3)",
+        '    FILTER(CONTAINS(?nom, "IA"))',
+        "}",
+    ]
@@ -0,0 +1,38 @@
+"""
+Tests pour les requêtes prêtes à l'emploi du SPARQLQueryBuilder (sans Fuseki)
+"""
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src import sparql_query_builder as builder
+
+
+def _query_texts():
+    """Texte de toutes les requêtes du module (templates compris)"""
+    queries = [
+        builder.SEARCH_BY_CODE_QUERY, builder.SEARCH_BY_DOMAIN_QUERY,
+        builder.SEARCH_BY_DOMAIN_LEVEL_QUERY, builder.SEARCH_ALL_QUERY,
+        builder.LEARNING_PATH_QUERY, builder.LIST_ALL_COURSES_QUERY,
+        *builder.SEARCH_IN_DOMAIN_QUERIES.values(),
+        *builder.SEARCH_IN_DOMAIN_LEVEL_QUERIES.values(),
+        *builder.LEARNING_PATH_IN_DOMAIN_QUERIES.values(),
+    ]
+    return [getattr(query, 'template', query) for query in queries]
+
+
+def test_type_constraint_last():
+    """Test 1: rdf:type (le motif le moins sélectif) après le code et le nom"""
+    for query in _query_texts():
+        type_at = query.index('?course rdf:type course:Course')
+        assert query.index('?course course:codeCours ?code') < type_at, query
+        assert query.index('?course course:nomCours ?nomCours') < type_at, query
+
+
+def test_selective_binding_first():
+    """Test 2: Code exact ou domaine lié avant tout autre motif"""
+    code_query = builder.SEARCH_BY_CODE_QUERY.template
+    assert code_query.index('VALUES ?code') < code_query.index('?course course:codeCours')
+    for query in builder.SEARCH_IN_DOMAIN_QUERIES.values():
+        text = query.template
+        assert text.index('course:appartientADomaine') < text.index('?course course:codeCours')